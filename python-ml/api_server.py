@@ -1,14 +1,106 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from attrition_model import AttritionPredictor
+from contextlib import asynccontextmanager
+from functools import partial
+from attrition_model import AttritionPredictor, MODEL_FAMILIES, CHUNKABLE_FAMILIES
+from batching import MicroBatcher
+from training_jobs import TrainingJobManager
+from model_registry import ModelRegistry
+from streaming import UploadStreamingResponse, MalformedRecord, iter_records, iter_chunks
+from instrumentation import metrics, MetricsMiddleware
+from profiling import ProfilingRoute, profiling_active, run_profiled
+from batch_formats import (
+    ARROW_STREAM_TYPE, UnsupportedBody, arrow_available, dumps, parse_batch_body, to_arrow_ipc
+)
 import pandas as pd
 import json
 import os
+import threading
+import time
 import uvicorn
 
-app = FastAPI(title="HR Attrition Prediction API", version="1.0.0")
+# Micro-batching of concurrent /predict calls
+BATCH_MAX_SIZE = int(os.environ.get('PREDICT_BATCH_MAX_SIZE', 32))
+BATCH_MAX_DELAY_MS = float(os.environ.get('PREDICT_BATCH_MAX_DELAY_MS', 5))
+
+# Rows scored per model call on /predict/stream
+STREAM_CHUNK_SIZE = int(os.environ.get('PREDICT_STREAM_CHUNK_SIZE', 1000))
+
+def _predict_records(records, explain='importance', current=None):
+    """Score a list of records with current (default: the served predictor), always returning a list"""
+    results = (current or predictor).predict(records, explain=explain)
+    return results if isinstance(results, list) else [results]
+
+def _predict_each(records, current):
+    """Score records one at a time, returning each result or the exception it raised"""
+    results = []
+    for record in records:
+        try:
+            results.append(current.predict(record))
+        except Exception as e:
+            results.append(e)
+    return results
+
+# One batcher per explain mode, so a batch is scored and explained the same way
+batchers = {
+    mode: MicroBatcher(partial(_predict_records, explain=mode), BATCH_MAX_SIZE, BATCH_MAX_DELAY_MS)
+    for mode in AttritionPredictor.EXPLAIN_MODES
+}
+
+def _check_explain(explain):
+    if explain not in AttritionPredictor.EXPLAIN_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"explain must be one of: {', '.join(AttritionPredictor.EXPLAIN_MODES)}"
+        )
+
+def _check_model_explain(current, explain):
+    if not current.supports_explain(explain):
+        raise HTTPException(
+            status_code=400,
+            detail=f'explain={explain} is not available for the {type(current.model).__name__} model, '
+                   f'only random forest and extra trees models support SHAP'
+        )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for batcher in batchers.values():
+        await batcher.start()
+    if predictor.is_loaded:
+        # A predictor installed before startup (e.g. by a test harness) is served as is
+        model_ready.set()
+    else:
+        # Load in the background: liveness is answered meanwhile, readiness once warmed up
+        threading.Thread(target=load_initial_model, daemon=True).start()
+    watch_stop = threading.Event()
+    if MODEL_WATCH_INTERVAL > 0:
+        threading.Thread(target=_watch_registry, args=(watch_stop,), daemon=True).start()
+    yield
+    watch_stop.set()
+    for batcher in batchers.values():
+        await batcher.stop()
+    training_jobs.shutdown()
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when available, timed as the 'serialize' stage"""
+    def render(self, content):
+        with metrics.stage('serialize'):
+            return dumps(content)
+
+app = FastAPI(
+    title="HR Attrition Prediction API", version="1.0.0", lifespan=lifespan,
+    default_response_class=TimedJSONResponse
+)
+
+# Any endpoint can be profiled with ?profile=1|file or an X-Profile header
+app.router.route_class = ProfilingRoute
+
+# Request counts, errors and latency per route, exposed at /metrics
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 # Add CORS middleware
 app.add_middleware(
@@ -19,16 +111,150 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize model
-predictor = AttritionPredictor()
+# Prediction cache, invalidated whenever the model is retrained or reloaded
+CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+CACHE_TTL_SECONDS = float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', 300))
+
+# Empty until the lifespan hook has loaded the registry's current version
+predictor = AttritionPredictor(cache_size=CACHE_SIZE, cache_ttl=CACHE_TTL_SECONDS)
 
-# Try to load existing model, otherwise train new one
 MODEL_DIR = 'models'
-if os.path.exists(f'{MODEL_DIR}/attrition_model.pkl'):
+registry = ModelRegistry(MODEL_DIR)
+
+# Seconds between checks of the registry for a newly promoted version (0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+
+# Synthetic rows scored by every newly loaded model before it serves (0 disables)
+WARMUP_ROWS = int(os.environ.get('MODEL_WARMUP_ROWS', 64))
+
+# Set once a model is loaded and warmed up; /health/ready reports it
+model_ready = threading.Event()
+startup_state = {'phase': 'starting', 'error': None}
+
+# Held across loading a model and recording it in the registry; reentrant for _swap_predictor
+_reload_lock = threading.RLock()
+
+def _warm_up(new_predictor):
+    """Run synthetic rows through scoring, rules and serialization; returns the seconds taken"""
+    if WARMUP_ROWS <= 0:
+        return 0.0
+    from synthetic_data import generate_records
+    
+    start = time.perf_counter()
+    records = generate_records(WARMUP_ROWS, seed=0)
+    results = new_predictor.warmup(records)
+    dumps({'success': True, 'data': results})
+    return time.perf_counter() - start
+
+def _swap_predictor(model_path):
+    """Load and warm up a model in a fresh predictor, then swap it in"""
+    global predictor
+    with _reload_lock:
+        start = time.perf_counter()
+        new_predictor = AttritionPredictor(cache_size=CACHE_SIZE, cache_ttl=CACHE_TTL_SECONDS)
+        new_predictor.load_model(model_path)
+        load_seconds = time.perf_counter() - start
+        warmup_seconds = _warm_up(new_predictor)
+        # Single reference assignment: requests see either the old or the new model, never a mix
+        predictor = new_predictor
+    startup_state.update(
+        phase='ready', error=None, load_seconds=load_seconds, warmup_seconds=warmup_seconds
+    )
+    model_ready.set()
+    return new_predictor
+
+def load_initial_model():
+    """Load and warm up the registry's current version, if there is one"""
+    model_path = registry.current_path()
+    if model_path is None:
+        print("No existing model found. Please train the model first.")
+        startup_state['phase'] = 'no_model'
+        return
+    
     print("Loading existing model...")
-    predictor.load_model(MODEL_DIR)
-else:
-    print("No existing model found. Please train the model first.")
+    startup_state['phase'] = 'loading'
+    try:
+        _swap_predictor(model_path)
+    except Exception as e:
+        print(f"Model load failed: {e}")
+        startup_state.update(phase='failed', error=str(e))
+
+def _reload_current_model():
+    """Load the registry's current version if it differs from the serving one"""
+    with _reload_lock:
+        version = registry.current_version()
+        if version is None or version == predictor.model_version:
+            return False
+        _swap_predictor(registry.version_path(version))
+        return True
+
+def _swap_and_record(model_path, record):
+    """Swap in the model at model_path, then call record() to update the registry
+    
+    Loading first means a broken artifact is never made current. Both steps run
+    under _reload_lock; if record() fails (e.g. another process changed the
+    registry), the registry's current version is swapped back in before the
+    error is raised, so the served model always matches registry.json.
+    """
+    with _reload_lock:
+        _swap_predictor(model_path)
+        try:
+            return record()
+        except Exception:
+            current_path = registry.current_path()
+            if current_path is not None:
+                _swap_predictor(current_path)
+            raise
+
+def _install_trained_model(job):
+    """Swap in a finished job's model, then promote it in the registry"""
+    _swap_and_record(job.output_dir, lambda: registry.promote(job.version))
+
+def _watch_registry(stop_event):
+    """Poll the registry and hot-reload when another process promotes a version"""
+    last_mtime = registry.state_mtime()
+    while not stop_event.wait(MODEL_WATCH_INTERVAL):
+        mtime = registry.state_mtime()
+        if mtime == last_mtime:
+            continue
+        last_mtime = mtime
+        try:
+            _reload_current_model()
+        except Exception as e:
+            print(f"Model reload failed: {e}")
+
+training_jobs = TrainingJobManager(_install_trained_model, registry)
+
+def _collect_serving_metrics():
+    """Model, micro-batching and prediction cache state as metric families"""
+    current = predictor
+    yield ('attrition_model_loaded', 'gauge', 'Whether a model is loaded for scoring',
+           [('attrition_model_loaded', {}, current.is_loaded)])
+    if current.model_version is not None:
+        yield ('attrition_model_info', 'gauge', 'Model version being served',
+               [('attrition_model_info', {'version': current.model_version}, 1)])
+    
+    sizes, failures = [], []
+    for mode, batcher in batchers.items():
+        total = 0
+        for bucket, count in batcher.size_histogram.items():
+            total += count
+            sizes.append(('attrition_batch_size_bucket', {'explain': mode, 'le': str(bucket)}, total))
+        sizes.append(('attrition_batch_size_sum', {'explain': mode}, batcher.requests))
+        sizes.append(('attrition_batch_size_count', {'explain': mode}, batcher.batches))
+        failures.append(('attrition_batch_failures_total', {'explain': mode}, batcher.failures))
+    yield ('attrition_batch_size', 'histogram', 'Requests per micro-batch on /predict', sizes)
+    yield ('attrition_batch_failures_total', 'counter', 'Micro-batched requests that failed', failures)
+    
+    cache = current.cache.stats()
+    yield ('attrition_cache_lookups_total', 'counter', 'Prediction cache lookups by result', [
+        ('attrition_cache_lookups_total', {'result': 'hit'}, cache['hits']),
+        ('attrition_cache_lookups_total', {'result': 'miss'}, cache['misses'])
+    ])
+    yield ('attrition_cache_entries', 'gauge', 'Entries in the prediction cache',
+           [('attrition_cache_entries', {}, cache['size'])])
+
+metrics.add_collector(_collect_serving_metrics)
 
 # Pydantic models for request validation
 class BatchPredictRequest(BaseModel):
@@ -37,32 +263,104 @@ class BatchPredictRequest(BaseModel):
 class TrainRequest(BaseModel):
     csv_path: str = '../data/employee_data.csv'
     test_size: float = 0.2
+    # Stream the CSV in chunks of this many rows instead of loading it whole
+    chunk_size: Optional[int] = None
+    model_family: str = 'random_forest'
+    model_params: Optional[Dict[str, Any]] = None
+    # Also train the baseline forest and report both side by side
+    compare: bool = False
+    # Reuse the encoded matrix of a CSV trained on before instead of parsing it again
+    use_feature_cache: bool = True
+    # Search families and hyperparameters first, then train the best candidate
+    tune: bool = False
+    tune_families: Optional[List[str]] = None
+    tune_candidates: int = 24
+    tune_workers: Optional[int] = None
+    # Drop trees and subtrees within a held-out accuracy budget before saving
+    compact: bool = False
+
+# /predict/batch reads its body itself; this documents the accepted formats
+BATCH_REQUEST_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'application/json': {'schema': {
+                'type': 'object',
+                'properties': {
+                    'employees': {'type': 'array', 'items': {'type': 'object'}},
+                    'columns': {'type': 'object', 'additionalProperties': {'type': 'array'}}
+                }
+            }},
+            'text/csv': {'schema': {'type': 'string'}},
+            ARROW_STREAM_TYPE: {'schema': {'type': 'string', 'format': 'binary'}}
+        }
+    }
+}
+
+BATCH_RESPONSE_FORMATS = ('rows', 'columnar', 'arrow')
 
 class RetentionRequest(BaseModel):
     employee: Dict[str, Any]
     risk_score: float = 0
 
+class RetentionBatchRequest(BaseModel):
+    employees: List[Dict[str, Any]]
+    risk_scores: Optional[List[float]] = None
+
 @app.get('/health')
 def health_check():
     """Health check endpoint"""
     return {
-        'status': 'healthy',
-        'model_loaded': predictor.model is not None
+        'status': 'healthy' if model_ready.is_set() else startup_state['phase'],
+        'ready': model_ready.is_set(),
+        'model_loaded': predictor.is_loaded,
+        'batching': {mode: batcher.stats() for mode, batcher in batchers.items()},
+        'cache': predictor.cache.stats()
     }
 
+@app.get('/health/live')
+def liveness():
+    """Liveness probe: the process is up and serving HTTP, whether or not a model is loaded"""
+    return {'status': 'alive'}
+
+@app.get('/health/ready')
+def readiness():
+    """Readiness probe: 200 once a model is loaded and warmed up, 503 until then"""
+    if not model_ready.is_set():
+        return TimedJSONResponse({'status': 'not_ready', **startup_state}, status_code=503)
+    return {'status': 'ready', 'model_version': predictor.model_version, **startup_state}
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus metrics: per-route and per-stage latency histograms, request,
+    error and batch-size counts, cache counters and the served model version
+    """
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.post('/predict')
-def predict_attrition(employee_data: Dict[str, Any]):
+async def predict_attrition(employee_data: Dict[str, Any], explain: str = 'importance'):
     """
     Predict attrition for a single employee
+    
+    Concurrent calls are queued and scored together in micro-batches
+    (profiled requests are scored on their own).
+    With explain=shap, top_factors carry exact SHAP values.
     """
     try:
         if not employee_data:
             raise HTTPException(status_code=400, detail='No data provided')
+        _check_explain(explain)
         
-        if predictor.model is None:
+        if not predictor.is_loaded:
             raise HTTPException(status_code=500, detail='Model not loaded')
+        _check_model_explain(predictor, explain)
         
-        result = predictor.predict(employee_data)
+        if profiling_active():
+            # Score outside the micro-batcher so the profile covers this request's model call
+            result = (await run_profiled(_predict_records, [employee_data], explain))[0]
+        else:
+            result = await batchers[explain].submit(employee_data)
         
         return {
             'success': True,
@@ -74,33 +372,120 @@ def predict_attrition(employee_data: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post('/predict/batch')
-def predict_batch(request: BatchPredictRequest):
+def _score_batch(body, content_type, explain, response_format):
+    """Parse a /predict/batch body, score it and build the response"""
+    current = predictor
+    try:
+        with metrics.stage('parse'):
+            parsed = parse_batch_body(body, content_type, current.FEATURE_COLUMNS)
+    except UnsupportedBody as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if parsed[0] == 'records':
+        employees = parsed[1]
+        if not employees:
+            raise HTTPException(status_code=400, detail='No employee data provided')
+        if response_format == 'rows':
+            results = current.predict(employees, explain=explain)
+            return TimedJSONResponse({'success': True, 'count': len(employees), 'data': results})
+        n_rows = len(employees)
+        columns = {col: [e.get(col) for e in employees] for col in current.FEATURE_COLUMNS}
+    else:
+        _, columns, n_rows = parsed
+        if n_rows == 0:
+            raise HTTPException(status_code=400, detail='No employee data provided')
+        if response_format == 'rows':
+            results = current.predict(pd.DataFrame(columns), explain=explain)
+            return TimedJSONResponse({'success': True, 'count': n_rows, 'data': results})
+    
+    result = current.predict_columns(columns, n_rows, explain=explain)
+    if response_format == 'arrow':
+        with metrics.stage('serialize'):
+            return Response(to_arrow_ipc(result), media_type=ARROW_STREAM_TYPE)
+    return TimedJSONResponse({'success': True, 'count': n_rows, 'data': result})
+
+@app.post('/predict/batch', openapi_extra=BATCH_REQUEST_BODY)
+async def predict_batch(request: Request, explain: str = 'importance', response_format: str = 'rows'):
     """
     Predict attrition for multiple employees
+    
+    The body is JSON ({"employees": [...]} or {"columns": {"age": [...], ...}}),
+    CSV (text/csv) or an Arrow IPC stream. response_format=columnar returns one
+    array per output field and top factors as index/contribution matrices;
+    response_format=arrow returns those columns as an Arrow IPC stream.
     """
     try:
-        employees = request.employees
+        _check_explain(explain)
+        if response_format not in BATCH_RESPONSE_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"response_format must be one of: {', '.join(BATCH_RESPONSE_FORMATS)}"
+            )
+        if response_format == 'arrow' and not arrow_available():
+            raise HTTPException(status_code=400, detail='Arrow responses require pyarrow')
         
-        if not employees:
-            raise HTTPException(status_code=400, detail='No employee data provided')
-        
-        if predictor.model is None:
+        if not predictor.is_loaded:
             raise HTTPException(status_code=500, detail='Model not loaded')
+        _check_model_explain(predictor, explain)
         
-        results = predictor.predict(employees)
-        
-        return {
-            'success': True,
-            'count': len(employees),
-            'data': results
-        }
+        body = await request.body()
+        content_type = request.headers.get('content-type', '')
+        return await run_profiled(_score_batch, body, content_type, explain, response_format)
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post('/predict/stream', response_class=UploadStreamingResponse)
+async def predict_stream(request: Request, format: Optional[str] = None):
+    """
+    Score an NDJSON or CSV upload chunk by chunk, streaming NDJSON results back
+    
+    The format is taken from the `format` query parameter or the Content-Type
+    (text/csv, otherwise NDJSON). Each output line carries the input `row` index.
+    The whole stream is scored by the model served when it started.
+    """
+    current = predictor
+    if not current.is_loaded:
+        raise HTTPException(status_code=500, detail='Model not loaded')
+    
+    if format is None:
+        content_type = request.headers.get('content-type', '')
+        format = 'csv' if 'csv' in content_type else 'ndjson'
+    if format not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=400, detail=f'Unsupported format: {format}')
+    
+    async def score_chunks():
+        row = 0
+        records = iter_records(request.stream(), format)
+        async for chunk in iter_chunks(records, STREAM_CHUNK_SIZE):
+            valid = [record for record in chunk if not isinstance(record, MalformedRecord)]
+            try:
+                results = await run_in_threadpool(_predict_records, valid, 'importance', current) if valid else []
+            except Exception:
+                # Score the failing chunk row by row to report the bad rows
+                results = await run_in_threadpool(_predict_each, valid, current)
+            results = iter(results)
+            
+            lines = []
+            for i, record in enumerate(chunk):
+                if isinstance(record, MalformedRecord):
+                    lines.append(json.dumps({'row': row + i, 'error': record.error}))
+                    continue
+                result = next(results)
+                if isinstance(result, Exception):
+                    lines.append(json.dumps({'row': row + i, 'error': str(result)}))
+                else:
+                    lines.append(json.dumps({'row': row + i, **result}))
+            
+            row += len(chunk)
+            yield '\n'.join(lines) + '\n'
+    
+    return UploadStreamingResponse(score_chunks(), media_type='application/x-ndjson')
+
 @app.post('/analyze/leave-reasons')
 def analyze_leave_reasons(employee_data: Dict[str, Any]):
     """
@@ -122,11 +507,35 @@ def analyze_leave_reasons(employee_data: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post('/analyze/leave-reasons/batch')
+def analyze_leave_reasons_batch(request: BatchPredictRequest):
+    """
+    Analyze leave reasons for many employees in one vectorized pass
+    """
+    try:
+        employees = request.employees
+        
+        if not employees:
+            raise HTTPException(status_code=400, detail='No employee data provided')
+        
+        analyses = predictor.analyze_leave_reasons_batch(employees)
+        
+        return {
+            'success': True,
+            'count': len(employees),
+            'data': analyses
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get('/model/info')
 def model_info():
     """Get model information and feature importance"""
     try:
-        if predictor.model is None:
+        if not predictor.is_loaded:
             raise HTTPException(status_code=500, detail='Model not loaded')
         
         sorted_features = sorted(
@@ -153,25 +562,147 @@ def model_info():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post('/train')
+@app.get('/model/versions')
+def model_versions():
+    """List registered model versions with their manifests"""
+    return {
+        'success': True,
+        'current': registry.current_version(),
+        'serving': predictor.model_version,
+        'data': registry.list_versions()
+    }
+
+@app.post('/model/reload')
+def reload_model():
+    """
+    Load the registry's current version and swap it in without a restart
+    
+    Requests keep being served by the old model while the new one loads.
+    """
+    try:
+        reloaded = _reload_current_model()
+        return {
+            'success': True,
+            'reloaded': reloaded,
+            'version': predictor.model_version
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/model/promote/{version}')
+def promote_model(version: str):
+    """Promote a registered version and start serving it"""
+    try:
+        if not any(v['version'] == version for v in registry.list_versions()):
+            raise HTTPException(status_code=404, detail=f'Model version not found: {version}')
+        
+        _swap_and_record(registry.version_path(version), lambda: registry.promote(version))
+        
+        return {
+            'success': True,
+            'version': version
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/model/rollback')
+def rollback_model():
+    """Return to the previously promoted version"""
+    try:
+        try:
+            version = registry.previous_version()
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        def record():
+            try:
+                registry.rollback(expected=version)
+            except ValueError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+        
+        _swap_and_record(registry.version_path(version), record)
+        
+        return {
+            'success': True,
+            'version': version
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/train', status_code=202)
 def train_model(request: TrainRequest):
     """
-    Train or retrain the model
+    Start training a new model in a background process
+    
+    Poll GET /train/{job_id} for progress. The new model replaces the
+    serving one atomically once training succeeds.
     """
     try:
         csv_path = request.csv_path
         test_size = request.test_size
+        chunk_size = request.chunk_size
         
         if not os.path.exists(csv_path):
             raise HTTPException(status_code=404, detail=f'Data file not found: {csv_path}')
+        if chunk_size is not None and chunk_size < 1:
+            raise HTTPException(status_code=400, detail='chunk_size must be positive')
+        
+        # tuning pulls in sklearn, which the serving path otherwise never imports
+        from tuning import SEARCH_SPACES
+        known = SEARCH_SPACES if request.tune else MODEL_FAMILIES
+        families = request.tune_families if request.tune else [request.model_family]
+        unknown = [f for f in families or [] if f not in known]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown model family: {', '.join(unknown)}. "
+                       f"Choose from: {', '.join(known)}"
+            )
         
-        results = predictor.train(csv_path, test_size=test_size)
-        predictor.save_model(MODEL_DIR)
+        if request.tune:
+            if chunk_size is not None:
+                raise HTTPException(status_code=400, detail='tune does not support chunk_size')
+            if request.tune_candidates < 1:
+                raise HTTPException(status_code=400, detail='tune_candidates must be positive')
+            options = {'tune': {
+                'families': request.tune_families,
+                'n_candidates': request.tune_candidates,
+                'n_workers': request.tune_workers
+            }, 'use_feature_cache': request.use_feature_cache, 'compact': request.compact}
+        else:
+            if chunk_size is not None and request.model_family not in CHUNKABLE_FAMILIES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"chunk_size supports: {', '.join(CHUNKABLE_FAMILIES)}"
+                )
+            if chunk_size is not None and request.compare:
+                raise HTTPException(status_code=400, detail='compare does not support chunk_size')
+            options = {
+                'chunk_size': chunk_size,
+                'model_family': request.model_family,
+                'model_params': request.model_params,
+                'compare': request.compare,
+                'use_feature_cache': request.use_feature_cache,
+                'compact': request.compact
+            }
+        
+        try:
+            job = training_jobs.submit(csv_path, test_size=test_size, **options)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         
         return {
             'success': True,
-            'message': 'Model trained successfully',
-            'metrics': results
+            'message': 'Training started',
+            'job_id': job.id,
+            'data': job.to_dict()
         }
     
     except HTTPException:
@@ -179,6 +710,42 @@ def train_model(request: TrainRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/train/jobs')
+def list_training_jobs():
+    """List training jobs"""
+    return {
+        'success': True,
+        'data': training_jobs.list()
+    }
+
+@app.get('/train/{job_id}')
+def training_job_status(job_id: str):
+    """Get status and progress of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Training job not found: {job_id}')
+    
+    return {
+        'success': True,
+        'data': job.to_dict()
+    }
+
+@app.delete('/train/{job_id}')
+def cancel_training_job(job_id: str):
+    """Cancel a running training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Training job not found: {job_id}')
+    
+    if not training_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f'Training job already {job.status}')
+    
+    return {
+        'success': True,
+        'message': 'Cancellation requested',
+        'data': job.to_dict()
+    }
+
 @app.post('/retention/strategies')
 def generate_retention_strategies(request: RetentionRequest):
     """
@@ -191,77 +758,49 @@ def generate_retention_strategies(request: RetentionRequest):
         if not employee:
             raise HTTPException(status_code=400, detail='No employee data provided')
         
-        strategies = []
-        
-        # Compensation Strategy
-        if employee.get('monthlyIncome', 0) < 5000:
-            strategies.append({
-                'category': 'Compensation',
-                'action': 'Salary review and adjustment (+10-15% market rate comparison)',
-                'timeline': 'Immediate (1-2 weeks)',
-                'impact': 'high',
-                'cost': 'high',
-                'priority': 1
-            })
-        
-        # Work-Life Balance
-        if employee.get('overTime') == 'Yes' or employee.get('workLifeBalance', 3) <= 2:
-            strategies.append({
-                'category': 'Work-Life Balance',
-                'action': 'Reduce overtime, implement flexible schedule, remote work options',
-                'timeline': 'Short-term (2-4 weeks)',
-                'impact': 'high',
-                'cost': 'low',
-                'priority': 1
-            })
+        plan = predictor.retention_strategies([employee], [risk_score])[0]
         
-        # Career Development
-        if employee.get('trainingTimesLastYear', 1) == 0 or employee.get('yearsAtCompany', 0) >= 5:
-            strategies.append({
-                'category': 'Career Development',
-                'action': 'Create personalized development plan, assign mentor, discuss promotion path',
-                'timeline': 'Medium-term (1-3 months)',
-                'impact': 'high',
-                'cost': 'medium',
-                'priority': 2
-            })
-        
-        # Job Satisfaction
-        if employee.get('jobSatisfaction', 3) <= 2:
-            strategies.append({
-                'category': 'Job Redesign',
-                'action': 'One-on-one discussion, role adjustment, task variety increase',
-                'timeline': 'Short-term (2-4 weeks)',
-                'impact': 'high',
-                'cost': 'low',
-                'priority': 1
-            })
-        
-        # Recognition
-        if employee.get('performanceRating', 3) >= 3:
-            strategies.append({
-                'category': 'Recognition & Rewards',
-                'action': 'Employee recognition program, spot bonuses, public acknowledgment',
-                'timeline': 'Immediate (1 week)',
-                'impact': 'medium',
-                'cost': 'low',
-                'priority': 2
-            })
+        return {
+            'success': True,
+            'data': {
+                'risk_score': plan['risk_score'],
+                'risk_level': plan['risk_level'],
+                'strategies': plan['strategies'],
+                'estimated_effectiveness': plan['estimated_effectiveness'],
+                'total_strategies': plan['total_strategies']
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/retention/strategies/batch')
+def generate_retention_strategies_batch(request: RetentionBatchRequest):
+    """
+    Generate retention strategies for multiple employees in one pass
+    """
+    try:
+        employees = request.employees
+        risk_scores = request.risk_scores
         
-        strategies.sort(key=lambda x: (x['priority'], x['impact'] == 'high'), reverse=True)
+        if not employees:
+            raise HTTPException(status_code=400, detail='No employee data provided')
+        if risk_scores is None:
+            risk_scores = [0] * len(employees)
+        elif len(risk_scores) != len(employees):
+            raise HTTPException(
+                status_code=400,
+                detail=f'Got {len(risk_scores)} risk scores for {len(employees)} employees'
+            )
         
-        high_impact = sum(1 for s in strategies if s['impact'] == 'high')
-        effectiveness = min(high_impact * 25 + len(strategies) * 10, 95)
+        plans = predictor.retention_strategies(employees, risk_scores)
         
         return {
             'success': True,
-            'data': {
-                'risk_score': risk_score,
-                'risk_level': predictor._get_risk_level(risk_score),
-                'strategies': strategies[:5],
-                'estimated_effectiveness': effectiveness,
-                'total_strategies': len(strategies)
-            }
+            'data': plans,
+            'count': len(plans)
         }
     
     except HTTPException:
@@ -277,10 +816,19 @@ if __name__ == '__main__':
     print("  GET  /health                      - Health check")
     print("  POST /predict                     - Single prediction")
     print("  POST /predict/batch               - Batch predictions")
+    print("  POST /predict/stream              - Streamed NDJSON/CSV batch scoring")
     print("  POST /analyze/leave-reasons       - Analyze leave reasons")
+    print("  POST /analyze/leave-reasons/batch - Analyze leave reasons for many employees")
     print("  POST /retention/strategies        - Generate retention strategies")
+    print("  POST /retention/strategies/batch  - Retention strategies for many employees")
     print("  GET  /model/info                  - Model information")
-    print("  POST /train                       - Train/retrain model")
+    print("  GET  /model/versions              - Registered model versions")
+    print("  POST /model/reload                - Hot-reload the promoted version")
+    print("  POST /model/promote/{version}     - Promote and serve a version")
+    print("  POST /model/rollback              - Roll back to the previous version")
+    print("  POST /train                       - Start background training job")
+    print("  GET  /train/{job_id}              - Training job status")
+    print("  DELETE /train/{job_id}            - Cancel training job")
     print("\nStarting server on http://localhost:5000")
     print("API Documentation: http://localhost:5000/docs")
     print("="*60 + "\n")
@@ -1,46 +1,190 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
-import joblib
+import importlib
 import json
+import os
+import threading
+import time
 import warnings
+from collections import Counter
+from datetime import datetime
+from forest_compaction import ACCURACY_TOLERANCE, ROC_AUC_TOLERANCE, compact_forest, print_compaction, skip_reason
+from forest_engine import CompiledForest
+from feature_encoder import FeatureEncoder
+from prediction_cache import PredictionCache
+from tree_shap import TreeShapExplainer
+from rules import LeaveReasonEngine, RetentionStrategyEngine
+from data_ingestion import read_employee_csv
+from instrumentation import metrics
 warnings.filterwarnings('ignore')
 
+# sklearn and joblib are imported where training or unpickling needs them, so a server
+# scoring with a memory-mapped compiled forest starts without loading them
+
+# Selectable model families: sklearn.ensemble estimator class name and default hyperparameters
+MODEL_FAMILIES = {
+    'random_forest': ('RandomForestClassifier', {
+        'n_estimators': 200,
+        'max_depth': 15,
+        'min_samples_split': 10,
+        'min_samples_leaf': 4,
+        'n_jobs': -1
+    }),
+    'extra_trees': ('ExtraTreesClassifier', {
+        'n_estimators': 200,
+        'max_depth': 15,
+        'min_samples_split': 10,
+        'min_samples_leaf': 4,
+        'n_jobs': -1
+    }),
+    'gradient_boosting': ('GradientBoostingClassifier', {
+        'n_estimators': 200,
+        'learning_rate': 0.1,
+        'max_depth': 3
+    }),
+    'hist_gradient_boosting': ('HistGradientBoostingClassifier', {
+        'max_iter': 200,
+        'learning_rate': 0.05,
+        'max_depth': 3,
+        'min_samples_leaf': 20,
+        'l2_regularization': 1.0
+    })
+}
+
+# Families whose trees can be trained per chunk and joined into one model
+CHUNKABLE_FAMILIES = ('random_forest', 'extra_trees')
+
+# Families fitted on raw values with native categorical splits, skipping label encoding and scaling
+NATIVE_CATEGORICAL_FAMILIES = ('hist_gradient_boosting',)
+
 class AttritionPredictor:
-    def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
+    # How top_factors contributions are computed: scaled value x global importance, or exact TreeSHAP
+    EXPLAIN_MODES = ('importance', 'shap')
+    
+    # Largest batch scored by the compiled engine. Its (rows x trees) gather wins on
+    # small batches; above ~400 rows (200 trees, depth 15, 1 CPU) sklearn's per-tree
+    # traversal is faster, so larger batches go to the sklearn forest
+    ENGINE_MAX_ROWS = 384
+    
+    # Label-encoded before training
+    CATEGORICAL_COLUMNS = [
+        'businessTravel', 'department', 'educationField', 
+        'gender', 'jobRole', 'maritalStatus', 'overTime'
+    ]
+    
+    # Model features, in column order
+    FEATURE_COLUMNS = [
+        'age', 'businessTravel', 'department', 'distanceFromHome',
+        'education', 'educationField', 'environmentSatisfaction',
+        'gender', 'jobInvolvement', 'jobLevel', 'jobRole',
+        'jobSatisfaction', 'maritalStatus', 'monthlyIncome',
+        'numCompaniesWorked', 'overTime', 'performanceRating',
+        'relationshipSatisfaction', 'stockOptionLevel',
+        'trainingTimesLastYear', 'workLifeBalance', 'yearsAtCompany',
+        'yearsInCurrentRole', 'yearsSinceLastPromotion', 'yearsWithCurrManager'
+    ]
+    
+    def __init__(self, cache_size=4096, cache_ttl=300):
+        self._model = None
+        self._model_path = None
+        self._scaler = None
+        self._scaler_path = None
+        self._label_encoders = {}
+        self._label_encoders_path = None
+        # 'scaled': label codes and numerics standardized; 'native': category codes and raw values
+        self.encoding = 'scaled'
+        self.categories = {}
+        self.feature_stats = None
         self.feature_names = []
         self.feature_importance = {}
+        self.engine = None
+        self.encoder = None
+        self.model_version = None
+        # Held-out (X, y) from the last training run, consumed by compact()
+        self._holdout = None
+        self.compaction = None
+        self.cache = PredictionCache(cache_size, cache_ttl)
+        self.leave_reason_engine = LeaveReasonEngine()
+        self.retention_engine = RetentionStrategyEngine()
+        self.explainer = None
+        self.explainer_version = None
+        self._explainer_lock = threading.Lock()
         
+    @property
+    def model(self):
+        """The sklearn estimator, deserialized on first access when serving from mmapped arrays"""
+        if self._model is None and self._model_path is not None:
+            import joblib
+            self._model = joblib.load(self._model_path)
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._model_path = None
+    
+    @property
+    def scaler(self):
+        """The StandardScaler: unpickled on first access after load_model, a fresh one before training"""
+        if self._scaler is None:
+            if self._scaler_path is not None:
+                import joblib
+                self._scaler = joblib.load(self._scaler_path)
+            else:
+                from sklearn.preprocessing import StandardScaler
+                self._scaler = StandardScaler()
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        # None resets to a fresh scaler on next access
+        self._scaler = value
+        self._scaler_path = None
+    
+    @property
+    def label_encoders(self):
+        """LabelEncoders by column, unpickled on first access after load_model"""
+        if self._label_encoders is None:
+            import joblib
+            self._label_encoders = joblib.load(self._label_encoders_path)
+        return self._label_encoders
+    
+    @label_encoders.setter
+    def label_encoders(self, value):
+        self._label_encoders = value
+        self._label_encoders_path = None
+    
+    @property
+    def is_loaded(self):
+        """Whether a model is available for scoring, without forcing it to be deserialized"""
+        return self.engine is not None or self._model is not None or self._model_path is not None
+    
     def load_data(self, csv_path):
-        """Load employee data from CSV"""
-        df = pd.read_csv(csv_path)
+        """Load employee data from CSV, with camelCase or raw IBM export headers"""
+        df = read_employee_csv(csv_path)
         return df
     
     def preprocess_data(self, df, is_training=True):
         """Preprocess the data for modeling"""
-        df_processed = df.copy()
+        from sklearn.preprocessing import LabelEncoder
         
-        # Convert categorical variables
-        categorical_cols = [
-            'businessTravel', 'department', 'educationField', 
-            'gender', 'jobRole', 'maritalStatus', 'overTime'
-        ]
+        df_processed = df.copy()
         
-        for col in categorical_cols:
+        # Convert categorical variables; missing values stay NaN, like missing numbers
+        for col in self.CATEGORICAL_COLUMNS:
             if col in df_processed.columns:
+                present = df_processed[col].notna().to_numpy()
+                values = df_processed[col].astype(str)[present]
                 if is_training:
-                    le = LabelEncoder()
-                    df_processed[col] = le.fit_transform(df_processed[col].astype(str))
+                    le = LabelEncoder().fit(values)
                     self.label_encoders[col] = le
+                elif col in self.label_encoders:
+                    le = self.label_encoders[col]
                 else:
-                    if col in self.label_encoders:
-                        df_processed[col] = self.label_encoders[col].transform(df_processed[col].astype(str))
+                    continue
+                codes = np.full(len(df_processed), np.nan)
+                codes[present] = le.transform(values)
+                df_processed[col] = codes
         
         # Convert attrition to binary if present
         if 'attrition' in df_processed.columns:
@@ -50,20 +194,8 @@ class AttritionPredictor:
     
     def prepare_features(self, df):
         """Prepare feature matrix and target variable"""
-        # Define feature columns
-        feature_cols = [
-            'age', 'businessTravel', 'department', 'distanceFromHome',
-            'education', 'educationField', 'environmentSatisfaction',
-            'gender', 'jobInvolvement', 'jobLevel', 'jobRole',
-            'jobSatisfaction', 'maritalStatus', 'monthlyIncome',
-            'numCompaniesWorked', 'overTime', 'performanceRating',
-            'relationshipSatisfaction', 'stockOptionLevel',
-            'trainingTimesLastYear', 'workLifeBalance', 'yearsAtCompany',
-            'yearsInCurrentRole', 'yearsSinceLastPromotion', 'yearsWithCurrManager'
-        ]
-        
         # Filter available columns
-        available_cols = [col for col in feature_cols if col in df.columns]
+        available_cols = [col for col in self.FEATURE_COLUMNS if col in df.columns]
         self.feature_names = available_cols
         
         X = df[available_cols]
@@ -71,45 +203,188 @@ class AttritionPredictor:
         
         return X, y
     
-    def train(self, csv_path, test_size=0.2, random_state=42):
-        """Train the attrition prediction model"""
-        print("Loading data...")
-        df = self.load_data(csv_path)
+    @staticmethod
+    def build_model(model_family='random_forest', model_params=None, random_state=42):
+        """Unfitted estimator of a model family, model_params overriding its defaults"""
+        if model_family not in MODEL_FAMILIES:
+            raise ValueError(
+                f"Unknown model family '{model_family}', expected one of: {', '.join(MODEL_FAMILIES)}"
+            )
+        class_name, defaults = MODEL_FAMILIES[model_family]
+        model_class = getattr(importlib.import_module('sklearn.ensemble'), class_name)
+        return model_class(**{**defaults, **(model_params or {}), 'random_state': random_state})
+    
+    def train(self, csv_path, test_size=0.2, random_state=42, progress=None, chunk_size=None,
+              model_family='random_forest', model_params=None, feature_cache=None):
+        """Train the attrition prediction model
+        
+        progress, if given, is called as progress(stage, fraction) as training advances.
+        With chunk_size, the CSV is streamed instead of loaded (see train_chunked).
+        model_family and model_params select the estimator (see MODEL_FAMILIES).
+        feature_cache, a FeatureCache, skips parsing and encoding a CSV seen before.
+        """
+        if chunk_size:
+            return self.train_chunked(
+                csv_path, chunk_size, test_size, random_state, progress, model_family, model_params
+            )
         
-        print("Preprocessing data...")
-        df_processed = self.preprocess_data(df, is_training=True)
+        from sklearn.model_selection import train_test_split
         
-        print("Preparing features...")
-        X, y = self.prepare_features(df_processed)
+        report = progress or (lambda stage, fraction: None)
         
-        print(f"Training with {len(X)} samples and {len(X.columns)} features")
+        report('loading', 0.05)
+        native = model_family in NATIVE_CATEGORICAL_FAMILIES
+        X, y = self.load_features(csv_path, 'native' if native else 'scaled', feature_cache)
+        report('preprocessing', 0.15)
+        
+        print(f"Training with {len(X)} samples and {len(self.feature_names)} features")
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train Random Forest model
-        print("Training Random Forest model...")
-        self.model = RandomForestClassifier(
-            n_estimators=200,
-            max_depth=15,
-            min_samples_split=10,
-            min_samples_leaf=4,
-            random_state=random_state,
-            n_jobs=-1
-        )
+        if native:
+            # Trees on raw values need no scaling; the statistics only standardize importance contributions
+            X_train_scaled, X_test_scaled = X_train, X_test
+            std = np.nanstd(X_train, axis=0)
+            self.feature_stats = (np.nanmean(X_train, axis=0), np.where(std > 0, std, 1.0))
+        else:
+            # Scale features
+            X_train_scaled = self.scaler.fit_transform(X_train)
+            X_test_scaled = self.scaler.transform(X_test)
+            # Missing values take the encoder's unknown value (the training mean), as at serving time
+            X_train_scaled = np.where(np.isnan(X_train_scaled), 0.0, X_train_scaled)
+            X_test_scaled = np.where(np.isnan(X_test_scaled), 0.0, X_test_scaled)
+        
+        # Train model
+        report('fitting', 0.3)
+        print(f"Training {model_family} model...")
+        self.model = self.build_model(model_family, model_params, random_state)
+        if native:
+            self.model.set_params(
+                categorical_features=[col in self.categories for col in self.feature_names]
+            )
         
+        fit_start = time.perf_counter()
         self.model.fit(X_train_scaled, y_train)
+        fit_seconds = time.perf_counter() - fit_start
         
         # Evaluate
+        report('evaluating', 0.85)
         y_pred = self.model.predict(X_test_scaled)
         y_pred_proba = self.model.predict_proba(X_test_scaled)[:, 1]
         
+        return self._finish_training(y_test, y_pred, y_pred_proba, X_test_scaled, fit_seconds)
+    
+    def _feature_schema(self, encoding):
+        """Everything besides the data itself that determines the encoded matrix"""
+        return {
+            'encoding': encoding,
+            'features': self.FEATURE_COLUMNS,
+            'categorical': self.CATEGORICAL_COLUMNS
+        }
+    
+    def load_features(self, csv_path, encoding='scaled', feature_cache=None):
+        """Encoded feature matrix and target of a training CSV, fitting the category vocabularies
+        
+        'scaled' gives label codes and numeric values before scaling, 'native' the
+        matrix of _encode_native. A FeatureCache hit memory-maps both instead of
+        parsing the CSV.
+        """
+        key = None
+        if feature_cache is not None:
+            key = feature_cache.key(csv_path, self._feature_schema(encoding))
+            cached = feature_cache.load(key)
+            if cached is not None:
+                X, y, meta = cached
+                print(f"Loaded encoded features from cache ({len(X)} rows)")
+                self._restore_vocabularies(encoding, meta['feature_names'], meta['categories'])
+                return X, y
+        
+        print("Loading data...")
+        df = self.load_data(csv_path)
+        
+        if encoding == 'native':
+            print("Encoding categories for native categorical splits...")
+            X, y = self._encode_native(df)
+            categories = self.categories
+        else:
+            print("Preprocessing data...")
+            self.encoding = 'scaled'
+            df_processed = self.preprocess_data(df, is_training=True)
+            
+            print("Preparing features...")
+            X, y = self.prepare_features(df_processed)
+            # Blank numeric cells come in as pd.NA and stay missing until scaling
+            X, y = X.to_numpy(dtype=np.float64, na_value=np.nan), y.to_numpy()
+            categories = {
+                col: [str(c) for c in le.classes_] for col, le in self.label_encoders.items()
+            }
+        
+        if feature_cache is not None:
+            feature_cache.save(key, X, y, {'feature_names': self.feature_names, 'categories': categories})
+        return X, y
+    
+    def _restore_vocabularies(self, encoding, feature_names, categories):
+        """Rebuild the fitted category state that load_features would have produced"""
+        self.encoding = encoding
+        self.feature_names = list(feature_names)
+        if encoding == 'native':
+            self.label_encoders = {}
+            self.scaler = None
+            self.categories = categories
+        else:
+            from sklearn.preprocessing import LabelEncoder
+            
+            self.label_encoders = {}
+            for col, classes in categories.items():
+                le = LabelEncoder()
+                le.classes_ = np.array(classes, dtype=object)
+                self.label_encoders[col] = le
+    
+    def _encode_native(self, df):
+        """Category codes and raw numeric values for native categorical models, NaN when missing"""
+        self.encoding = 'native'
+        self.label_encoders = {}
+        self.scaler = None
+        self.feature_names = [col for col in self.FEATURE_COLUMNS if col in df.columns]
+        self.categories = {}
+        
+        X = np.empty((len(df), len(self.feature_names)), dtype=np.float32)
+        for j, col in enumerate(self.feature_names):
+            if col in self.CATEGORICAL_COLUMNS:
+                # Sorted like LabelEncoder, so codes match the serving encoder's lookup tables
+                values = df[col].astype(str).where(df[col].notna())
+                self.categories[col] = sorted(values.dropna().unique())
+                codes = pd.Categorical(values, categories=self.categories[col]).codes
+                X[:, j] = np.where(codes < 0, np.nan, codes)
+            else:
+                X[:, j] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+        
+        y = df['attrition'].map({'Yes': 1, 'No': 0}).to_numpy()
+        return X, y
+    
+    def _compute_feature_importance(self, X, y, max_rows=2000):
+        """Impurity importances, or permutation importances for models without them"""
+        if hasattr(self.model, 'feature_importances_'):
+            return self.model.feature_importances_
+        
+        from sklearn.inspection import permutation_importance
+        
+        # Histogram boosting has none; use the held-out ROC-AUC drop, normalized like impurity importances
+        result = permutation_importance(
+            self.model, X[:max_rows], np.asarray(y)[:max_rows],
+            scoring='roc_auc', n_repeats=5, random_state=0
+        )
+        importances = np.clip(result.importances_mean, 0, None)
+        total = importances.sum()
+        return importances / total if total > 0 else importances
+    
+    def _finish_training(self, y_test, y_pred, y_pred_proba, X_check, fit_seconds):
+        """Report metrics, record importances and compile the serving artifacts"""
+        from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
+        
         accuracy = accuracy_score(y_test, y_pred)
         roc_auc = roc_auc_score(y_test, y_pred_proba)
         
@@ -118,15 +393,26 @@ class AttritionPredictor:
         print(f"{'='*50}")
         print(f"Accuracy: {accuracy:.4f}")
         print(f"ROC-AUC Score: {roc_auc:.4f}")
+        print(f"Fit time: {fit_seconds:.2f}s")
         print(f"\nClassification Report:")
         print(classification_report(y_test, y_pred, target_names=['Stay', 'Leave']))
         
         # Feature importance
         self.feature_importance = dict(zip(
             self.feature_names,
-            self.model.feature_importances_
+            self._compute_feature_importance(X_check, np.asarray(y_test)[:len(X_check)])
         ))
         
+        self.model_version = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.cache.invalidate(self.model_version)
+        self.explainer = None
+        self._holdout = (X_check, np.asarray(y_test)[:len(X_check)])
+        self.compaction = None
+        
+        # Compile encoder and forest for serving and verify them against sklearn
+        self._compile_encoder()
+        self._compile_engine(X_check)
+        
         print(f"\nTop 10 Important Features:")
         sorted_features = sorted(self.feature_importance.items(), key=lambda x: x[1], reverse=True)[:10]
         for feat, imp in sorted_features:
@@ -135,54 +421,435 @@ class AttritionPredictor:
         return {
             'accuracy': float(accuracy),
             'roc_auc': float(roc_auc),
+            'fit_seconds': float(fit_seconds),
             'feature_importance': self.feature_importance
         }
     
-    def predict(self, employee_data):
-        """Predict attrition probability for a single employee or batch"""
-        if isinstance(employee_data, dict):
-            df = pd.DataFrame([employee_data])
-        else:
-            df = pd.DataFrame(employee_data)
+    def _iter_csv_chunks(self, csv_path, chunk_size, test_size, random_state):
+        """Stream (chunk, y, test_mask) from a CSV, reading only the needed columns
         
-        # Preprocess
-        df_processed = self.preprocess_data(df, is_training=False)
-        X, _ = self.prepare_features(df_processed)
+        The held-out rows come from a draw seeded per chunk, so every pass over
+        the file selects the same ones.
+        """
+        columns = self.FEATURE_COLUMNS + ['attrition']
+        reader = read_employee_csv(csv_path, columns=columns, chunksize=chunk_size)
+        for i, chunk in enumerate(reader):
+            y = chunk['attrition'].map({'Yes': 1, 'No': 0}).to_numpy()
+            test_mask = np.random.default_rng([random_state, i]).random(len(chunk)) < test_size
+            yield chunk, y, test_mask
+    
+    def _encode_chunk(self, chunk, mask):
+        """Encode and scale the masked rows of a chunk"""
+        return self.encoder.transform_columns(
+            {col: chunk[col].to_numpy()[mask] for col in self.feature_names}, int(mask.sum())
+        )
+    
+    def _fit_preprocessors_chunked(self, csv_path, chunk_size, test_size, random_state):
+        """First pass: fit label encoders on all rows and scaler statistics on training rows"""
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
         
-        # Scale
-        X_scaled = self.scaler.transform(X)
+        categories = None
+        train_counts = None
+        numeric_scaler = StandardScaler()
+        n_rows = n_train = 0
         
-        # Predict
-        predictions = self.model.predict(X_scaled)
-        probabilities = self.model.predict_proba(X_scaled)[:, 1]
+        for chunk, y, test_mask in self._iter_csv_chunks(csv_path, chunk_size, test_size, random_state):
+            if categories is None:
+                self.feature_names = [col for col in self.FEATURE_COLUMNS if col in chunk.columns]
+                categorical = [col for col in self.CATEGORICAL_COLUMNS if col in self.feature_names]
+                numeric = [col for col in self.feature_names if col not in categorical]
+                categories = {col: set() for col in categorical}
+                train_counts = {col: Counter() for col in categorical}
+            
+            train_mask = ~test_mask
+            for col in categorical:
+                values = chunk[col].astype(str).where(chunk[col].notna())
+                categories[col].update(values.dropna().unique())
+                train_counts[col].update(values[train_mask].value_counts().to_dict())
+            if numeric and train_mask.any():
+                numeric_scaler.partial_fit(
+                    chunk.loc[train_mask, numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+                )
+            
+            n_rows += len(chunk)
+            n_train += int(train_mask.sum())
+        
+        if not n_train:
+            raise ValueError(f'No training rows found in {csv_path}')
+        
+        self.label_encoders = {}
+        for col in categorical:
+            le = LabelEncoder()
+            le.fit(sorted(categories[col]))
+            self.label_encoders[col] = le
+        
+        # Scaler statistics of the label codes follow from the category counts
+        mean = np.empty(len(self.feature_names))
+        var = np.empty(len(self.feature_names))
+        for j, col in enumerate(self.feature_names):
+            if col in self.label_encoders:
+                classes = list(self.label_encoders[col].classes_)
+                codes = np.array([classes.index(c) for c in train_counts[col]], dtype=np.float64)
+                counts = np.array(list(train_counts[col].values()), dtype=np.float64)
+                # Over the rows with a value, as StandardScaler skips missing ones
+                n_present = max(counts.sum(), 1.0)
+                mean[j] = (codes * counts).sum() / n_present
+                var[j] = (((codes - mean[j]) ** 2) * counts).sum() / n_present
+            else:
+                k = numeric.index(col)
+                mean[j] = numeric_scaler.mean_[k]
+                var[j] = numeric_scaler.var_[k]
+        
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = mean
+        self.scaler.var_ = var
+        self.scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+        self.scaler.n_samples_seen_ = n_train
+        self.scaler.n_features_in_ = len(self.feature_names)
+        self.scaler.feature_names_in_ = np.array(self.feature_names, dtype=object)
+        
+        return n_rows, n_train
+    
+    def train_chunked(self, csv_path, chunk_size=100000, test_size=0.2, random_state=42,
+                      progress=None, model_family='random_forest', model_params=None):
+        """Train from a CSV streamed in chunks, with memory bounded by chunk_size
+        
+        Pass 1 fits the encoders and scaler statistics. Pass 2 fits a sub-forest
+        on each chunk of training rows, with trees in proportion to its size, and
+        joins their trees into one forest. Pass 3 scores the held-out rows.
+        """
+        if model_family not in CHUNKABLE_FAMILIES:
+            raise ValueError(
+                f"Chunked training supports {', '.join(CHUNKABLE_FAMILIES)}, not '{model_family}'"
+            )
+        n_estimators = self.build_model(model_family, model_params).n_estimators
+        report = progress or (lambda stage, fraction: None)
+        self.encoding = 'scaled'
+        self.feature_stats = None
         
-        results = []
-        for idx, (pred, prob) in enumerate(zip(predictions, probabilities)):
-            risk_score = float(prob * 100)
+        report('loading', 0.05)
+        print(f"Scanning {csv_path} in chunks of {chunk_size} rows...")
+        n_rows, n_train = self._fit_preprocessors_chunked(csv_path, chunk_size, test_size, random_state)
+        self._compile_encoder()
+        print(f"Training with {n_train} of {n_rows} samples and {len(self.feature_names)} features")
+        
+        report('fitting', 0.15)
+        print(f"Training {model_family} model chunk by chunk...")
+        estimators = []
+        pending_X, pending_y = [], []
+        consumed = trained = 0
+        fit_seconds = 0.0
+        
+        for chunk, y, test_mask in self._iter_csv_chunks(csv_path, chunk_size, test_size, random_state):
+            train_mask = ~test_mask
+            pending_X.append(self._encode_chunk(chunk, train_mask))
+            pending_y.append(y[train_mask])
+            consumed += len(chunk)
+            remaining = n_rows - consumed
+            
+            # Hold back chunks that lack a class, and a small tail joins the chunk before it
+            rows = sum(len(part) for part in pending_y)
+            if remaining and (remaining < chunk_size // 2 or len(np.unique(np.concatenate(pending_y))) < 2):
+                continue
             
-            # Get top contributing factors
-            feature_contributions = []
-            for feat_name, feat_value in zip(self.feature_names, X_scaled[idx]):
-                contribution = float(feat_value * self.feature_importance.get(feat_name, 0))
-                feature_contributions.append({
-                    'factor': feat_name,
-                    'importance': float(self.feature_importance.get(feat_name, 0)),
-                    'contribution': contribution
-                })
+            X_group, y_group = np.concatenate(pending_X), np.concatenate(pending_y)
+            pending_X, pending_y = [], []
+            if len(np.unique(y_group)) < 2:
+                print(f"Skipping {rows} trailing rows with a single class")
+                continue
             
-            # Sort by contribution
-            feature_contributions.sort(key=lambda x: abs(x['contribution']), reverse=True)
+            n_trees = max(1, round(n_estimators * rows / n_train))
+            forest = self.build_model(
+                model_family, {**(model_params or {}), 'n_estimators': n_trees},
+                random_state + len(estimators)
+            )
+            fit_start = time.perf_counter()
+            forest.fit(X_group, y_group)
+            fit_seconds += time.perf_counter() - fit_start
+            estimators.extend(forest.estimators_)
             
-            results.append({
-                'prediction': 'Leave' if pred == 1 else 'Stay',
-                'probability': float(prob),
-                'risk_score': risk_score,
-                'risk_level': self._get_risk_level(risk_score),
-                'top_factors': feature_contributions[:10]
-            })
+            trained += rows
+            report('fitting', 0.15 + 0.7 * trained / n_train)
+            print(f"  {trained}/{n_train} rows, {len(estimators)} trees")
+        
+        if not estimators:
+            raise ValueError('Training data must contain both attrition classes')
+        
+        # One forest holding every sub-forest's trees
+        self.model = self.build_model(
+            model_family, {**(model_params or {}), 'n_estimators': len(estimators)}, random_state
+        )
+        self.model.estimators_ = estimators
+        self.model.classes_ = np.array([0, 1])
+        self.model.n_classes_ = 2
+        self.model.n_outputs_ = 1
+        self.model.n_features_in_ = len(self.feature_names)
+        
+        report('evaluating', 0.85)
+        y_test, y_pred_proba, X_check = [], [], None
+        for chunk, y, test_mask in self._iter_csv_chunks(csv_path, chunk_size, test_size, random_state):
+            if not test_mask.any():
+                continue
+            X_test = self._encode_chunk(chunk, test_mask)
+            y_test.append(y[test_mask])
+            y_pred_proba.append(self.model.predict_proba(X_test)[:, 1])
+            if X_check is None:
+                X_check = X_test[:1000]
+        
+        if not y_test:
+            raise ValueError('No held-out rows to evaluate; increase test_size')
+        y_test = np.concatenate(y_test)
+        y_pred_proba = np.concatenate(y_pred_proba)
+        y_pred = (y_pred_proba > 0.5).astype(int)
+        
+        return self._finish_training(y_test, y_pred, y_pred_proba, X_check, fit_seconds)
+    
+    def predict(self, employee_data, top_k=10, factors_format='dicts', explain='importance'):
+        """Predict attrition probability for a single employee or batch
+        
+        factors_format='arrays' returns top_factors as parallel lists
+        (factor, importance, contribution) instead of one dict per factor.
+        explain='shap' ranks factors by exact SHAP values of the attrition
+        probability and adds the model's base_value to each result.
+        """
+        if explain not in self.EXPLAIN_MODES:
+            raise ValueError(f'Unknown explain mode: {explain}')
+        
+        # Encode and scale in one pass
+        with metrics.stage('encode'):
+            if isinstance(employee_data, pd.DataFrame):
+                X_scaled = self.encoder.transform_columns(
+                    {col: employee_data[col].to_numpy() for col in employee_data.columns},
+                    len(employee_data)
+                )
+            else:
+                X_scaled = self.encoder.transform(employee_data)
+        metrics.observe('attrition_predict_rows', len(X_scaled))
+        
+        if not self.cache.enabled:
+            results = self._predict_rows(X_scaled, top_k, factors_format, explain)
+            return results if len(results) > 1 else results[0]
+        
+        # Serve repeated employees from the cache, scoring only the misses
+        with metrics.stage('cache_lookup'):
+            namespace = f'predict:{top_k}:{factors_format}:{explain}'
+            keys = [self.cache.key_for(namespace, row.tobytes()) for row in X_scaled]
+            results = [self.cache.get(key) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing:
+            scored = self._predict_rows(X_scaled[missing], top_k, factors_format, explain)
+            for i, result in zip(missing, scored):
+                results[i] = result
+                self.cache.put(keys[i], result)
         
         return results if len(results) > 1 else results[0]
     
+    def predict_columns(self, columns, n_rows=None, top_k=10, explain='importance'):
+        """Score a mapping of column name -> values and return column arrays
+        
+        Rows are never turned into dicts: predictions, probabilities and risk
+        levels come back as one list or array each, and top factors as
+        (rows, top_k) arrays of feature indices and contributions. Results are
+        not cached.
+        """
+        if explain not in self.EXPLAIN_MODES:
+            raise ValueError(f'Unknown explain mode: {explain}')
+        
+        with metrics.stage('encode'):
+            X_scaled = self.encoder.transform_columns(columns, n_rows)
+        metrics.observe('attrition_predict_rows', len(X_scaled))
+        
+        predictions, probabilities, top_idx, top_contrib, explainer = self._score_and_explain(
+            X_scaled, top_k, explain
+        )
+        with metrics.stage('build_results'):
+            risk_scores = probabilities * 100
+            result = {
+                'prediction': np.where(predictions == 1, 'Leave', 'Stay').tolist(),
+                'probability': probabilities,
+                'risk_score': risk_scores,
+                'risk_level': np.select(
+                    [risk_scores >= 75, risk_scores >= 60, risk_scores >= 40],
+                    ['urgent', 'high', 'medium'], 'low'
+                ).tolist(),
+                'factor_names': list(self.feature_names),
+                'factor_importance': self._importance_vector(),
+                'top_factor_index': top_idx,
+                'top_factor_contribution': top_contrib
+            }
+            if explain == 'shap':
+                result['base_value'] = explainer.expected_value
+        return result
+    
+    def _score_and_explain(self, X_scaled, top_k, explain):
+        """Labels, probabilities, top factor indices and contributions, and the SHAP explainer if used"""
+        # Predict
+        with metrics.stage('score'):
+            predictions, probabilities = self._score(X_scaled)
+        
+        # Get top contributing factors for every row at once
+        explainer = None
+        with metrics.stage(f'factors_{explain}'):
+            if explain == 'shap':
+                explainer = self._shap_explainer()
+                contributions = explainer.shap_values(X_scaled)
+            else:
+                contributions = self._importance_contributions(X_scaled)
+            top_idx, top_contrib = self._top_factors(contributions, top_k)
+        return predictions, probabilities, top_idx, top_contrib, explainer
+    
+    def _predict_rows(self, X_scaled, top_k=10, factors_format='dicts', explain='importance'):
+        """Score an encoded matrix and build one result dict per row"""
+        predictions, probabilities, top_idx, top_contrib, explainer = self._score_and_explain(
+            X_scaled, top_k, explain
+        )
+        importance = self._importance_vector()
+        names = self.feature_names
+        
+        with metrics.stage('build_results'):
+            results = []
+            for pred, prob, idx_row, contrib_row in zip(
+                predictions.tolist(), probabilities.tolist(), top_idx.tolist(), top_contrib.tolist()
+            ):
+                risk_score = prob * 100
+                
+                if factors_format == 'arrays':
+                    top_factors = {
+                        'factor': [names[i] for i in idx_row],
+                        'importance': [importance[i] for i in idx_row],
+                        'contribution': contrib_row
+                    }
+                else:
+                    top_factors = [
+                        {'factor': names[i], 'importance': importance[i], 'contribution': c}
+                        for i, c in zip(idx_row, contrib_row)
+                    ]
+                
+                result = {
+                    'prediction': 'Leave' if pred == 1 else 'Stay',
+                    'probability': prob,
+                    'risk_score': risk_score,
+                    'risk_level': self._get_risk_level(risk_score),
+                    'top_factors': top_factors
+                }
+                if explain == 'shap':
+                    result['base_value'] = explainer.expected_value
+                results.append(result)
+        
+        return results
+    
+    def _importance_vector(self):
+        """Feature importances aligned with feature_names"""
+        return [float(self.feature_importance.get(feat, 0)) for feat in self.feature_names]
+    
+    def _importance_contributions(self, X_scaled):
+        """Heuristic contributions: scaled feature value times global importance"""
+        X = np.asarray(X_scaled, dtype=np.float64)
+        if self.encoding == 'native':
+            # Standardize raw values so contributions are on the same footing as the scaled encoding
+            mean, scale = self.feature_stats
+            X = np.nan_to_num((X - mean) / scale)
+        return X * np.asarray(self._importance_vector())
+    
+    def supports_explain(self, explain):
+        """Whether an explain mode works with the current model
+        
+        explain='shap' needs a binary random_forest or extra_trees model;
+        gradient-boosting families only support 'importance'.
+        """
+        if explain != 'shap':
+            return explain in self.EXPLAIN_MODES
+        # Engines are only compiled for forests TreeSHAP handles, so the estimator stays unloaded
+        return self.engine is not None or TreeShapExplainer.supports(self.model)
+    
+    def _shap_explainer(self):
+        """TreeSHAP path structures for the current model, built once per model version"""
+        with self._explainer_lock:
+            if self.explainer is None or self.explainer_version != self.model_version:
+                if not TreeShapExplainer.supports(self.model):
+                    raise ValueError('SHAP explanations require a binary random forest or extra trees model')
+                self.explainer = TreeShapExplainer.from_sklearn(self.model)
+                self.explainer_version = self.model_version
+            return self.explainer
+    
+    def _top_factors(self, contributions, top_k=10):
+        """Return indices and contributions of the top_k factors per row, largest first"""
+        magnitude = np.abs(contributions)
+        k = min(top_k, contributions.shape[1])
+        
+        if k == 0:
+            top_idx = np.empty((len(magnitude), 0), dtype=np.intp)
+        elif k < contributions.shape[1]:
+            # Everything above the k-th largest magnitude, then the first ties at it by
+            # feature position, as a stable sort would pick; argpartition picks ties arbitrarily
+            kth = -np.partition(-magnitude, k - 1, axis=1)[:, k - 1:k]
+            above = magnitude > kth
+            tied = magnitude == kth
+            needed = k - above.sum(axis=1, keepdims=True)
+            selected = above | (tied & (np.cumsum(tied, axis=1) <= needed))
+            top_idx = np.nonzero(selected)[1].reshape(len(magnitude), k)
+        else:
+            top_idx = np.broadcast_to(np.arange(k), magnitude.shape)
+        
+        # Order the selected factors by magnitude, ties by feature position
+        order = np.lexsort((top_idx, -np.take_along_axis(magnitude, top_idx, axis=1)), axis=1)
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        
+        return top_idx, np.take_along_axis(contributions, top_idx, axis=1)
+    
+    def _compile_encoder(self, scaler_stats=None):
+        """Build the lookup-table feature encoder from the fitted preprocessors
+        
+        scaler_stats, the saved (mean, scale) of a scaled model, builds it from
+        self.categories instead of the sklearn objects.
+        """
+        if self.encoding == 'native':
+            # Category codes and raw values, NaN for unseen or missing so the model treats them as missing
+            n_features = len(self.feature_names)
+            self.encoder = FeatureEncoder(
+                self.feature_names, self.categories, np.zeros(n_features), np.ones(n_features),
+                unknown_value=np.nan
+            )
+        elif scaler_stats is not None:
+            self.encoder = FeatureEncoder(self.feature_names, self.categories, *scaler_stats)
+        else:
+            self.encoder = FeatureEncoder.from_preprocessors(
+                self.feature_names, self.label_encoders, self.scaler
+            )
+    
+    def _compile_engine(self, X_check=None):
+        """Build the array-backed inference engine for the current model
+        
+        With X_check, the engine is verified against sklearn on those rows and
+        dropped if it disagrees, so scoring falls back to the sklearn model.
+        """
+        if self.model is None or not CompiledForest.supports(self.model):
+            self.engine = None
+            return
+        
+        self.engine = CompiledForest.from_sklearn(self.model)
+        if X_check is not None:
+            parity = self.engine.check_parity(self.model, X_check)
+            print(f"Compiled engine parity: max diff {parity['max_abs_diff']:.2e}, "
+                  f"labels match: {parity['labels_match']}")
+            if not parity['passed']:
+                print("Compiled engine does not match the sklearn model, serving with sklearn instead")
+                self.engine = None
+    
+    def _score(self, X_scaled):
+        """Return predicted labels and positive-class probabilities
+        
+        Batches above ENGINE_MAX_ROWS deserialize the sklearn forest on first use.
+        """
+        if self.engine is not None and len(X_scaled) <= self.ENGINE_MAX_ROWS:
+            probabilities = self.engine.predict_proba(X_scaled)
+            return self.engine.labels_from_proba(probabilities), probabilities
+        
+        # One pass: labels follow from the probabilities as in predict()
+        probabilities = self.model.predict_proba(X_scaled)[:, 1]
+        return self.model.classes_[(probabilities > 0.5).astype(int)], probabilities
+    
     def _get_risk_level(self, risk_score):
         """Determine risk level based on score"""
         if risk_score >= 75:
@@ -194,146 +861,198 @@ class AttritionPredictor:
         else:
             return 'low'
     
+    def warmup(self, records):
+        """Score records once, single and batched, bypassing the cache
+        
+        Pays one-time costs (first calls into numpy and the engine, touching
+        memory-mapped pages, rule compilation) before real requests arrive.
+        Returns the batch results.
+        """
+        X_scaled = self.encoder.transform(records)
+        self._predict_rows(X_scaled[:1])
+        results = self._predict_rows(X_scaled)
+        self.analyze_leave_reasons_batch(records)
+        self.retention_strategies(records, [r['risk_score'] for r in results])
+        return results
+    
     def analyze_leave_reasons(self, employee_data):
         """Analyze why an employee might leave"""
-        if isinstance(employee_data, dict):
-            df = pd.DataFrame([employee_data])
-        else:
-            df = employee_data
-        
-        reasons = []
-        
-        # Job Satisfaction
-        if 'jobSatisfaction' in df.columns and df['jobSatisfaction'].iloc[0] <= 2:
-            severity = 'critical' if df['jobSatisfaction'].iloc[0] == 1 else 'major'
-            reasons.append({
-                'category': 'Job Satisfaction',
-                'reason': 'Low job satisfaction indicates employee is unhappy with their role',
-                'severity': severity,
-                'impact': 85,
-                'preventable': True
-            })
-        
-        # Work-Life Balance
-        if 'workLifeBalance' in df.columns and df['workLifeBalance'].iloc[0] <= 2:
-            reasons.append({
-                'category': 'Work-Life Balance',
-                'reason': 'Poor work-life balance causing stress and burnout',
-                'severity': 'critical',
-                'impact': 80,
-                'preventable': True
-            })
-        
-        # Overtime
-        if 'overTime' in df.columns and df['overTime'].iloc[0] in ['Yes', 1, True]:
-            reasons.append({
-                'category': 'Overtime',
-                'reason': 'Frequent overtime leading to exhaustion',
-                'severity': 'major',
-                'impact': 70,
-                'preventable': True
-            })
-        
-        # Compensation
-        if 'monthlyIncome' in df.columns:
-            avg_income = 6500  # Industry average
-            if df['monthlyIncome'].iloc[0] < avg_income * 0.8:
-                reasons.append({
-                    'category': 'Compensation',
-                    'reason': 'Below-market compensation',
-                    'severity': 'critical',
-                    'impact': 90,
-                    'preventable': True
-                })
-        
-        # Career Growth
-        if 'yearsSinceLastPromotion' in df.columns and df['yearsSinceLastPromotion'].iloc[0] >= 5:
-            reasons.append({
-                'category': 'Career Growth',
-                'reason': 'No career advancement in 5+ years',
-                'severity': 'major',
-                'impact': 75,
-                'preventable': True
-            })
-        
-        # Commute
-        if 'distanceFromHome' in df.columns and df['distanceFromHome'].iloc[0] > 20:
-            reasons.append({
-                'category': 'Commute',
-                'reason': 'Long commute distance causing daily stress',
-                'severity': 'moderate',
-                'impact': 50,
-                'preventable': False
-            })
-        
-        # Environment
-        if 'environmentSatisfaction' in df.columns and df['environmentSatisfaction'].iloc[0] <= 2:
-            reasons.append({
-                'category': 'Work Environment',
-                'reason': 'Poor workplace environment satisfaction',
-                'severity': 'major',
-                'impact': 65,
-                'preventable': True
-            })
-        
-        # Relationships
-        if 'relationshipSatisfaction' in df.columns and df['relationshipSatisfaction'].iloc[0] <= 2:
-            reasons.append({
-                'category': 'Relationships',
-                'reason': 'Poor workplace relationships',
-                'severity': 'moderate',
-                'impact': 60,
-                'preventable': True
-            })
-        
-        # Training
-        if 'trainingTimesLastYear' in df.columns and df['trainingTimesLastYear'].iloc[0] == 0:
-            reasons.append({
-                'category': 'Professional Development',
-                'reason': 'No training or skill development opportunities',
-                'severity': 'moderate',
-                'impact': 55,
-                'preventable': True
-            })
-        
-        # Sort by impact
-        reasons.sort(key=lambda x: x['impact'], reverse=True)
+        if isinstance(employee_data, pd.DataFrame):
+            # Only the first employee is analyzed; use analyze_leave_reasons_batch for more
+            return self.leave_reason_engine.analyze_columns(
+                {col: employee_data[col].to_numpy()[:1] for col in employee_data.columns}, 1
+            )[0]
+        
+        if not self.cache.enabled:
+            return self.leave_reason_engine.analyze([employee_data])[0]
+        
+        # Rules read raw values, so key on the canonical raw fields rather than the encoding
+        fields = {col: employee_data.get(col) for col in self.leave_reason_engine.fields}
+        key = self.cache.key_for(
+            'leave-reasons', json.dumps(fields, sort_keys=True, default=str).encode()
+        )
+        analysis = self.cache.get(key)
+        if analysis is None:
+            analysis = self.leave_reason_engine.analyze([employee_data])[0]
+            self.cache.put(key, analysis)
+        return analysis
+    
+    def analyze_leave_reasons_batch(self, employees):
+        """Analyze a list of employee dicts (or a DataFrame) in one vectorized pass"""
+        if isinstance(employees, pd.DataFrame):
+            return self.leave_reason_engine.analyze_columns(
+                {col: employees[col].to_numpy() for col in employees.columns}, len(employees)
+            )
+        return self.leave_reason_engine.analyze(employees)
+    
+    def retention_strategies(self, employees, risk_scores):
+        """Retention strategies for a list of employee dicts and their risk scores"""
+        plans = self.retention_engine.evaluate(employees)
+        for plan, risk_score in zip(plans, risk_scores):
+            plan['risk_score'] = risk_score
+            plan['risk_level'] = self._get_risk_level(risk_score)
+        return plans
+    
+    def compact(self, accuracy_tolerance=ACCURACY_TOLERANCE, roc_auc_tolerance=ROC_AUC_TOLERANCE):
+        """Shrink a freshly trained forest within a held-out accuracy budget
+        
+        Drops trees and collapses subtrees (see forest_compaction.compact_forest)
+        and switches the engine to float32 arrays. Runs once per training run,
+        on its held-out rows; returns the trade-off report, or None when there is
+        nothing to compact or too few held-out rows to do it reliably.
+        """
+        if self._holdout is None or self.engine is None:
+            return None
+        X_check, y_check = self._holdout
+        self._holdout = None
+        reason = skip_reason(y_check)
+        if reason is not None:
+            print(f"Skipping forest compaction: {reason}")
+            return None
         
+        self.model, self.engine, self.compaction = compact_forest(
+            self.model, X_check, y_check, accuracy_tolerance, roc_auc_tolerance
+        )
+        # Importances of the trees that were kept
+        self.feature_importance = dict(zip(
+            self.feature_names, self._compute_feature_importance(X_check, y_check)
+        ))
+        self.cache.invalidate(self.model_version)
+        self.explainer = None
+        print_compaction(self.compaction)
+        return self.compaction
+    
+    def compacted_results(self, results):
+        """Training results describing the forest as saved
+        
+        After compaction, accuracy and ROC-AUC are the compacted forest's scores
+        on the held-out rows compaction did not select on, and the feature
+        importances are those of the trees that were kept.
+        """
+        if self.compaction is None:
+            return results
+        after = self.compaction['after']
         return {
-            'total_reasons': len(reasons),
-            'reasons': reasons,
-            'preventability_score': sum(1 for r in reasons if r['preventable']) / max(len(reasons), 1) * 100
+            **results,
+            'accuracy': after['accuracy'],
+            'roc_auc': after['roc_auc'],
+            'feature_importance': self.feature_importance
         }
     
-    def save_model(self, model_dir='models'):
-        """Save trained model and preprocessors"""
-        import os
+    def save_model(self, model_dir='models', compact=False):
+        """Save trained model and preprocessors
+        
+        With compact=True a freshly trained forest is compacted first (see compact()).
+        """
+        import joblib
+        
+        if compact:
+            self.compact()
         os.makedirs(model_dir, exist_ok=True)
         
         joblib.dump(self.model, f'{model_dir}/attrition_model.pkl')
         joblib.dump(self.scaler, f'{model_dir}/scaler.pkl')
         joblib.dump(self.label_encoders, f'{model_dir}/label_encoders.pkl')
         
+        # Flat node arrays that serving workers memory-map instead of unpickling the forest
+        if self.engine is not None:
+            self.engine.save(f'{model_dir}/forest')
+        
         # Save feature info
+        info = {
+            'feature_names': self.feature_names,
+            'feature_importance': self.feature_importance,
+            'model_version': self.model_version,
+            'encoding': self.encoding,
+            # False when the engine failed its parity check, so loading does not recompile it
+            'compiled_engine': self.engine is not None
+        }
+        if self.compaction is not None:
+            info['compaction'] = self.compaction
+        if self.encoding == 'native':
+            info['categories'] = self.categories
+            info['feature_mean'] = self.feature_stats[0].tolist()
+            info['feature_scale'] = self.feature_stats[1].tolist()
+        else:
+            # Encoder tables, so serving never has to unpickle the sklearn preprocessors
+            info['categories'] = self.encoder.categories
+            info['scaler_mean'] = self.encoder.mean.tolist()
+            info['scaler_scale'] = self.encoder.scale.tolist()
         with open(f'{model_dir}/model_info.json', 'w') as f:
-            json.dump({
-                'feature_names': self.feature_names,
-                'feature_importance': self.feature_importance
-            }, f, indent=2)
+            json.dump(info, f, indent=2)
         
         print(f"Model saved to {model_dir}/")
     
-    def load_model(self, model_dir='models'):
-        """Load trained model and preprocessors"""
-        self.model = joblib.load(f'{model_dir}/attrition_model.pkl')
-        self.scaler = joblib.load(f'{model_dir}/scaler.pkl')
-        self.label_encoders = joblib.load(f'{model_dir}/label_encoders.pkl')
+    def load_model(self, model_dir='models', mmap=True):
+        """Load trained model and preprocessors
+        
+        With mmap=True and a saved forest/ directory, the compiled node arrays are
+        memory-mapped read-only and shared between worker processes; the sklearn
+        forest is only unpickled if something needs it. The scaler and label
+        encoders are unpickled on first access; serving uses the encoder tables
+        from model_info.json.
+        """
+        forest_dir = f'{model_dir}/forest'
+        use_mmap = mmap and os.path.exists(f'{forest_dir}/meta.json')
+        if use_mmap:
+            self._model = None
+            self._model_path = f'{model_dir}/attrition_model.pkl'
+        else:
+            import joblib
+            self.model = joblib.load(f'{model_dir}/attrition_model.pkl')
+        self._scaler, self._scaler_path = None, f'{model_dir}/scaler.pkl'
+        self._label_encoders, self._label_encoders_path = None, f'{model_dir}/label_encoders.pkl'
         
         # Load feature info
         with open(f'{model_dir}/model_info.json', 'r') as f:
             info = json.load(f)
             self.feature_names = info['feature_names']
             self.feature_importance = info['feature_importance']
+            self.encoding = info.get('encoding', 'scaled')
+            self.categories = info.get('categories', {})
+            self.feature_stats = (
+                np.array(info['feature_mean']), np.array(info['feature_scale'])
+            ) if self.encoding == 'native' else None
+            scaler_stats = (
+                info['scaler_mean'], info['scaler_scale']
+            ) if 'scaler_mean' in info else None
+            compiled_engine = info.get('compiled_engine', True)
+            # Older artifacts carry no version, fall back to the model file timestamp
+            self.model_version = info.get('model_version') or datetime.fromtimestamp(
+                os.path.getmtime(f'{model_dir}/attrition_model.pkl')
+            ).strftime('%Y%m%d-%H%M%S')
+            self.compaction = info.get('compaction')
+        
+        self.cache.invalidate(self.model_version)
+        self.explainer = None
+        self._holdout = None
+        self._compile_encoder(scaler_stats)
+        if use_mmap:
+            self.engine = CompiledForest.load(forest_dir, mmap_mode='r')
+        elif compiled_engine:
+            self._compile_engine()
+        else:
+            self.engine = None
         
         print(f"Model loaded from {model_dir}/")
 
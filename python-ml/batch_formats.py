@@ -0,0 +1,156 @@
+"""
+Batch request bodies (row or column JSON, CSV, Arrow IPC) and fast response encoding
+"""
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_ingestion import column_plan
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_FILE_TYPE = 'application/vnd.apache.arrow.file'
+
+
+def arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UnsupportedBody(ValueError):
+    """Body in a content type this server cannot read"""
+
+
+def dumps(content):
+    """Serialize to compact JSON bytes; numpy arrays and scalars are written directly
+
+    Uses orjson when installed. NaN and infinities become null.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(',', ':'), default=_json_default
+    ).encode('utf-8')
+
+
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def parse_batch_body(body, content_type, feature_columns):
+    """Parse a batch body into ('records', list of dicts) or ('columns', {column: values}, n_rows)
+
+    JSON bodies are {"employees": [{...}, ...]} or {"columns": {"age": [...], ...}}.
+    CSV bodies may use camelCase or raw IBM headers. Only feature_columns are
+    kept from columnar inputs. Raises ValueError for malformed bodies and
+    UnsupportedBody for content types that cannot be read.
+    """
+    content_type = content_type.split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        columns = _parse_csv(body, feature_columns)
+    elif content_type in (ARROW_STREAM_TYPE, ARROW_FILE_TYPE):
+        columns = _parse_arrow(body, content_type == ARROW_FILE_TYPE, feature_columns)
+    elif content_type in ('', 'application/json'):
+        return _parse_json(body, feature_columns)
+    else:
+        raise UnsupportedBody(f'Unsupported content type: {content_type}')
+
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    return 'columns', columns, n_rows
+
+
+def _parse_json(body, feature_columns):
+    try:
+        payload = loads(body)
+    except ValueError as e:
+        raise ValueError(f'Invalid JSON body: {e}')
+    if not isinstance(payload, dict):
+        raise ValueError('Body must be a JSON object with "employees" or "columns"')
+
+    if 'columns' in payload:
+        columns = payload['columns']
+        if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+            raise ValueError('"columns" must map column names to lists of values')
+        columns = {col: values for col, values in columns.items() if col in feature_columns}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('All columns must have the same length')
+        return 'columns', columns, lengths.pop() if lengths else 0
+
+    employees = payload.get('employees')
+    if not isinstance(employees, list) or not all(isinstance(e, dict) for e in employees):
+        raise ValueError('"employees" must be a list of objects')
+    return 'records', employees
+
+
+def _parse_csv(body, feature_columns):
+    text = io.TextIOWrapper(io.BytesIO(body), encoding='utf-8-sig', newline='')
+    header = next(csv.reader(text), [])
+    usecols, _, rename = column_plan(header, feature_columns)
+    text.seek(0)
+    # No declared dtypes: scoring rows may have blanks, which the encoder treats as unknown
+    df = pd.read_csv(text, usecols=usecols).rename(columns=rename)
+    return {col: df[col].to_numpy() for col in df.columns}
+
+
+def _parse_arrow(body, file_format, feature_columns):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedBody('Arrow IPC bodies require pyarrow (pip install pyarrow)')
+
+    reader = pa.ipc.open_file(body) if file_format else pa.ipc.open_stream(body)
+    table = reader.read_all()
+    return {
+        name: table.column(name).to_numpy(zero_copy_only=False)
+        for name in table.column_names if name in feature_columns
+    }
+
+
+def to_arrow_ipc(result):
+    """Encode a predict_columns result as an Arrow IPC stream
+
+    Top factors become fixed-size list columns; feature names and
+    importances travel in the schema metadata.
+    """
+    import pyarrow as pa
+
+    top_idx = np.ascontiguousarray(result['top_factor_index'], dtype=np.int32)
+    top_contrib = np.ascontiguousarray(result['top_factor_contribution'], dtype=np.float64)
+    k = top_idx.shape[1]
+    table = pa.table({
+        'prediction': pa.array(result['prediction'], type=pa.string()),
+        'probability': pa.array(result['probability']),
+        'risk_score': pa.array(result['risk_score']),
+        'risk_level': pa.array(result['risk_level'], type=pa.string()),
+        'top_factor_index': pa.FixedSizeListArray.from_arrays(pa.array(top_idx.ravel()), k),
+        'top_factor_contribution': pa.FixedSizeListArray.from_arrays(pa.array(top_contrib.ravel()), k)
+    })
+    metadata = {
+        'factor_names': json.dumps(result['factor_names']),
+        'factor_importance': json.dumps(result['factor_importance'])
+    }
+    if 'base_value' in result:
+        metadata['base_value'] = json.dumps(result['base_value'])
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
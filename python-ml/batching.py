@@ -0,0 +1,160 @@
+"""
+Asyncio micro-batching dispatcher for single-employee predictions
+"""
+import asyncio
+import time
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+
+class MicroBatcher:
+    """Queue single predictions and flush them as one batched model call"""
+
+    # Upper bounds of the batch-size histogram buckets
+    SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(self, predict_fn, max_batch_size=32, max_delay_ms=5.0):
+        # predict_fn takes a list of records and returns a list of results
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_delay = max(0.0, float(max_delay_ms)) / 1000
+
+        self._pending = deque()
+        self._wakeup = None
+        self._worker = None
+
+        self.batches = 0
+        self.requests = 0
+        self.failures = 0
+        self.max_batch_seen = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.size_histogram = {bucket: 0 for bucket in self.SIZE_BUCKETS}
+        self.size_histogram['+Inf'] = 0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and fail any requests still queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._pending:
+            _, future, _ = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError('Prediction dispatcher stopped'))
+
+    async def submit(self, record):
+        """Queue one record and wait for its prediction"""
+        if not self.running:
+            raise RuntimeError('Prediction dispatcher is not running')
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future, time.perf_counter()))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Collect until the batch is full or the flush deadline passes
+            deadline = loop.time() + self.max_delay
+            batch = []
+            while True:
+                while self._pending and len(batch) < self.max_batch_size:
+                    batch.append(self._pending.popleft())
+                remaining = deadline - loop.time()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        self._record_batch(batch, time.perf_counter())
+        if len(batch) == 1:
+            await self._flush_single(batch[0])
+            return
+
+        records = [record for record, _, _ in batch]
+        try:
+            results = await run_in_threadpool(self.predict_fn, records)
+        except Exception:
+            # Score individually so one bad record does not fail its neighbours
+            for item in batch:
+                await self._flush_single(item)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _flush_single(self, item):
+        record, future, _ = item
+        try:
+            result = (await run_in_threadpool(self.predict_fn, [record]))[0]
+        except Exception as e:
+            self.failures += 1
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def _record_batch(self, batch, now):
+        size = len(batch)
+        self.batches += 1
+        self.requests += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+
+        for bucket in self.SIZE_BUCKETS:
+            if size <= bucket:
+                self.size_histogram[bucket] += 1
+                break
+        else:
+            self.size_histogram['+Inf'] += 1
+
+        for _, _, enqueued in batch:
+            wait = now - enqueued
+            self.queue_wait_total += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+
+    def stats(self):
+        """Batch-size and queue-wait metrics"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_delay_ms': self.max_delay * 1000,
+            'batches': self.batches,
+            'requests': self.requests,
+            'failures': self.failures,
+            'pending': len(self._pending),
+            'avg_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'largest_batch': self.max_batch_seen,
+            'batch_size_histogram': {str(k): v for k, v in self.size_histogram.items()},
+            'avg_queue_wait_ms': self.queue_wait_total / self.requests * 1000 if self.requests else 0.0,
+            'max_queue_wait_ms': self.queue_wait_max * 1000
+        }
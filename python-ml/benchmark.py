@@ -0,0 +1,323 @@
+"""
+Benchmark the inference, training and model load paths
+
+Results are written as JSON and optionally compared against a stored baseline:
+
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --tolerance 0.25
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import sklearn
+
+from attrition_model import AttritionPredictor
+from synthetic_data import generate_employees
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000, 1000000]
+# Batch sizes around and above AttritionPredictor.ENGINE_MAX_ROWS, scored by both backends
+BACKEND_SIZES = [100, 1000, 10000]
+TRAIN_SIZES = [1470, 5000, 20000]
+
+# Lower is better for every metric except throughput
+HIGHER_IS_BETTER = {'rows_per_sec'}
+COMPARED_METRICS = ['p50_ms', 'p99_ms', 'mean_ms', 'rows_per_sec', 'peak_memory_mb']
+
+
+def time_calls(fn, repeats, warmup=1):
+    """Wall-clock seconds of repeated calls to fn"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_memory_mb(fn):
+    """Peak Python heap allocated during one call of fn, in MiB"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def summarize(samples, rows=1, peak_mb=None):
+    """Latency percentiles and throughput of a list of timings"""
+    ms = np.array(samples) * 1000
+    result = {
+        'calls': len(samples),
+        'rows': rows,
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+        'rows_per_sec': float(rows / (ms.mean() / 1000)) if ms.mean() > 0 else None
+    }
+    if peak_mb is not None:
+        result['peak_memory_mb'] = float(peak_mb)
+    return result
+
+
+def repeats_for(rows, budget_rows=200000, max_repeats=50):
+    """Fewer repeats for larger inputs so each case takes comparable time"""
+    return int(max(3, min(max_repeats, budget_rows // max(rows, 1))))
+
+
+def bench_predict_single(predictor, records, calls):
+    records = records[:calls]
+    it = itertools.cycle(records)
+    samples = time_calls(lambda: predictor.predict(next(it)), len(records))
+    return summarize(samples, 1, peak_memory_mb(lambda: predictor.predict(records[0])))
+
+
+def bench_predict_batch(predictor, frame, size):
+    # DataFrames avoid building a million dicts just to feed the benchmark
+    batch = frame.iloc[:size]
+    samples = time_calls(lambda: predictor.predict(batch), repeats_for(size))
+    return summarize(samples, size, peak_memory_mb(lambda: predictor.predict(batch)))
+
+
+def bench_scoring_backends(predictor, records, sizes):
+    """Probabilities from the compiled engine and the sklearn forest on the same encoded rows"""
+    X = predictor.encoder.transform(records[:max(sizes)])
+    results = {}
+    for size in sizes:
+        batch = X[:size]
+        for name, score in (('engine', predictor.engine.predict_proba),
+                            ('sklearn', lambda rows: predictor.model.predict_proba(rows)[:, 1])):
+            samples = time_calls(lambda: score(batch), repeats_for(size, budget_rows=50000, max_repeats=20))
+            results[f'{name}_proba_{size}'] = summarize(samples, size)
+    return results
+
+
+def bench_api_batch(client, records, size):
+    payload = {'employees': records[:size]}
+
+    def call():
+        response = client.post('/predict/batch', json=payload)
+        response.raise_for_status()
+
+    samples = time_calls(call, repeats_for(size, budget_rows=50000, max_repeats=20))
+    return summarize(samples, size)
+
+
+def bench_train(csv_path, rows):
+    predictor = AttritionPredictor(cache_size=0)
+    start = time.perf_counter()
+    predictor.train(csv_path)
+    elapsed = time.perf_counter() - start
+    return summarize([elapsed], rows), predictor
+
+
+def bench_save_load(predictor, model_dir):
+    save = summarize(time_calls(lambda: predictor.save_model(model_dir, compact=False), 3, warmup=0))
+
+    def load(mmap):
+        AttritionPredictor(cache_size=0).load_model(model_dir, mmap=mmap)
+
+    return {
+        'save_model': save,
+        'load_model_mmap': summarize(time_calls(lambda: load(True), 5)),
+        'load_model_pickle': summarize(time_calls(lambda: load(False), 5))
+    }
+
+
+def bench_startup(model_dir, repeats=3):
+    """Seconds for a fresh interpreter to import api_server, load the model and warm it up"""
+    from model_registry import ModelRegistry
+
+    # api_server loads the registry's current version from ./models
+    with tempfile.TemporaryDirectory() as workdir:
+        registry = ModelRegistry(os.path.join(workdir, 'models'))
+        predictor = AttritionPredictor(cache_size=0)
+        predictor.load_model(model_dir, mmap=False)
+        registry.promote(registry.save_predictor(predictor))
+
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        command = [sys.executable, '-c', 'import api_server; api_server.load_initial_model()']
+
+        def start():
+            subprocess.run(command, cwd=workdir, env=env, check=True, capture_output=True)
+
+        return summarize(time_calls(start, repeats))
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.time(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scikit_learn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Metrics that got worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            current, previous = metrics.get(metric), base.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': previous,
+                    'current': current,
+                    'change': change
+                })
+    return regressions
+
+
+def run(args):
+    results = {}
+    batch_sizes = [s for s in BATCH_SIZES if s <= args.max_rows]
+    train_sizes = [s for s in TRAIN_SIZES if s <= args.max_train_rows]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print("Generating synthetic data...")
+        features = generate_employees(
+            max(batch_sizes + [args.single_calls]), seed=args.seed
+        ).drop(columns='attrition')
+        n_records = max(args.single_calls, min(max(batch_sizes), args.max_api_rows))
+        records = features.iloc[:n_records].to_dict('records')
+
+        # Training at growing dataset sizes; the smallest model serves the inference benchmarks
+        predictor = None
+        for rows in train_sizes:
+            csv_path = os.path.join(workdir, f'train_{rows}.csv')
+            generate_employees(rows, seed=args.seed).to_csv(csv_path, index=False)
+            print(f"Benchmarking train on {rows} rows...")
+            results[f'train_{rows}'], trained = bench_train(csv_path, rows)
+            predictor = predictor or trained
+
+        if predictor is None:
+            csv_path = os.path.join(workdir, 'train.csv')
+            generate_employees(1470, seed=args.seed).to_csv(csv_path, index=False)
+            _, predictor = bench_train(csv_path, 1470)
+
+        model_dir = os.path.join(workdir, 'model')
+        print("Benchmarking save/load...")
+        results.update(bench_save_load(predictor, model_dir))
+
+        serving = AttritionPredictor(cache_size=0)
+        serving.load_model(model_dir)
+
+        print("Benchmarking single predictions...")
+        results['predict_single'] = bench_predict_single(serving, records, args.single_calls)
+
+        for size in batch_sizes:
+            print(f"Benchmarking predict batch of {size}...")
+            results[f'predict_batch_{size}'] = bench_predict_batch(serving, features, size)
+
+        backend_sizes = [s for s in BACKEND_SIZES if s <= len(records)]
+        if serving.engine is not None and backend_sizes:
+            print(f"Benchmarking engine vs sklearn on {', '.join(map(str, backend_sizes))} rows...")
+            results.update(bench_scoring_backends(serving, records, backend_sizes))
+
+        if not args.skip_api:
+            # Serving this predictor keeps the lifespan hook from loading ./models
+            from fastapi.testclient import TestClient
+            import api_server
+            api_server.predictor = serving
+            with TestClient(api_server.app) as client:
+                for size in batch_sizes:
+                    if size > args.max_api_rows:
+                        continue
+                    print(f"Benchmarking /predict/batch with {size} employees...")
+                    results[f'api_predict_batch_{size}'] = bench_api_batch(client, records, size)
+
+        if not args.skip_startup:
+            print("Benchmarking server startup...")
+            results['server_startup'] = bench_startup(model_dir)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the attrition model hot paths')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write results')
+    parser.add_argument('--baseline', help='Baseline results JSON to compare against')
+    parser.add_argument('--save-baseline', help='Also write the results to this baseline path')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown before a metric counts as a regression')
+    parser.add_argument('--max-rows', type=int, default=max(BATCH_SIZES), help='Largest scoring batch')
+    parser.add_argument('--max-api-rows', type=int, default=10000, help='Largest /predict/batch request')
+    parser.add_argument('--max-train-rows', type=int, default=max(TRAIN_SIZES), help='Largest training set')
+    parser.add_argument('--single-calls', type=int, default=1000, help='Number of single predictions')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-api', action='store_true', help='Skip the HTTP benchmarks')
+    parser.add_argument('--skip-startup', action='store_true', help='Skip the server startup benchmark')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("HR Attrition Model Benchmarks")
+    print("="*60)
+
+    report = {'environment': environment(), 'results': run(args)}
+
+    print(f"\n{'Benchmark':<32}{'p50 ms':>12}{'p99 ms':>12}{'rows/s':>14}{'peak MiB':>10}")
+    for name, metrics in report['results'].items():
+        peak = metrics.get('peak_memory_mb')
+        print(f"{name:<32}{metrics['p50_ms']:>12.2f}{metrics['p99_ms']:>12.2f}"
+              f"{metrics['rows_per_sec'] or 0:>14.0f}{'' if peak is None else f'{peak:.1f}':>10}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        report['baseline'] = {'path': args.baseline, 'environment': baseline.get('environment')}
+        report['regressions'] = compare(report['results'], baseline['results'], args.tolerance)
+        if report['regressions']:
+            exit_code = 1
+            print(f"\n{len(report['regressions'])} regression(s) against {args.baseline}:")
+            for r in report['regressions']:
+                print(f"  - {r['benchmark']} {r['metric']}: {r['baseline']:.2f} -> "
+                      f"{r['current']:.2f} ({r['change']:+.0%})")
+        else:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
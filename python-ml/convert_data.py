@@ -1,104 +1,396 @@
 """
 Convert TypeScript employee data to CSV for ML training
 """
-import json
-import pandas as pd
-import sys
+import argparse
+import csv
 import os
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+
+# Column order for ML; columns missing from the data are left out
+COLUMN_ORDER = [
+    'age', 'attrition', 'businessTravel', 'department',
+    'distanceFromHome', 'education', 'educationField',
+    'environmentSatisfaction', 'gender', 'jobInvolvement',
+    'jobLevel', 'jobRole', 'jobSatisfaction', 'maritalStatus',
+    'monthlyIncome', 'numCompaniesWorked', 'overTime',
+    'performanceRating', 'relationshipSatisfaction',
+    'stockOptionLevel', 'trainingTimesLastYear', 'workLifeBalance',
+    'yearsAtCompany', 'yearsInCurrentRole', 'yearsSinceLastPromotion',
+    'yearsWithCurrManager'
+]
+
+# Boolean fields written as Yes/No, like the IBM dataset
+YES_NO_FIELDS = ('overTime', 'attrition')
+
+_STRING = r'''"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`'''
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_KEY = rf'[A-Za-z_$][\w$]*|{_STRING}|\d+'
+_SCALAR = rf'{_STRING}|{_NUMBER}|(?:true|false|null|undefined)\b'
+
+# One token; unnamed alternatives are whitespace and comments
+_TOKEN = re.compile(rf'''
+    \s+ | //[^\n]* | /\*.*?\*/
+  | (?P<string>{_STRING})
+  | (?P<number>{_NUMBER})
+  | (?P<word>[A-Za-z_$][\w$]*)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+_SPACE = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_SEPARATOR = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/|,)*', re.DOTALL)
+
+# Fast path: an object literal of scalar properties, without comments, matched in one go
+_FLAT_OBJECT = re.compile(
+    rf'\{{\s*(?:(?:{_KEY})\s*:\s*(?:{_SCALAR})\s*,\s*)*(?:(?:{_KEY})\s*:\s*(?:{_SCALAR})\s*,?\s*)?\}}'
+)
+_PAIR = re.compile(rf'({_KEY})\s*:\s*({_SCALAR})')
+_INT = re.compile(r'[-+]?\d+$')
+_ESCAPE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\n|.)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0', '\n': ''}
+
+_WORDS = {
+    'true': True, 'false': False, 'null': None, 'undefined': None,
+    'NaN': float('nan'), 'Infinity': float('inf')
+}
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code[0] == 'u' and len(code) > 1:
+        return chr(int(code[1:].strip('{}'), 16))
+    if code[0] == 'x' and len(code) == 3:
+        return chr(int(code[1:], 16))
+    return _ESCAPES.get(code, code)
+
+
+def _unquote(token):
+    """Decode a single-, double- or backtick-quoted string literal"""
+    body = token[1:-1]
+    return _ESCAPE.sub(_unescape, body) if '\\' in body else body
+
+
+# Generated data repeats the same keys and values on every record
+@lru_cache(maxsize=1 << 16)
+def _scalar(token):
+    """Python value of a string, number or literal word token"""
+    if token[0] in '"\'`':
+        return _unquote(token)
+    if token in _WORDS:
+        return _WORDS[token]
+    if _INT.match(token):
+        return int(token)
+    try:
+        return float(token)
+    except ValueError:
+        raise ValueError(f'Unsupported value: {token}')
+
+
+class TsArrayReader:
+    """Incremental reader of the first array of object literals in a TypeScript file
+
+    The file is read in chunks; the buffer only grows while a single token or
+    record spans a chunk boundary, so memory stays constant for any file size.
+    """
+
+    # Characters kept buffered ahead of every match, so a token's optional tail
+    # (like a number's exponent) is never split from it
+    LOOKAHEAD = 256
+    # Characters buffered ahead before trying the single-regex fast path on a record
+    FLAT_LOOKAHEAD = 1 << 16
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+
+    def _match(self, pattern):
+        """Match at the current position, reading more while the match may be cut off"""
+        while True:
+            if len(self.buf) - self.pos < self.LOOKAHEAD and not self.eof:
+                self._fill()
+                continue
+            m = pattern.match(self.buf, self.pos)
+            if self.eof or (m is not None and m.end() < len(self.buf)):
+                return m
+            self._fill()
+
+    def _skip(self, pattern=_SPACE):
+        self.pos = self._match(pattern).end()
+
+    def _next(self):
+        """Next significant token as (kind, text), or None at the end of the file"""
+        while True:
+            m = self._match(_TOKEN)
+            if m is None:
+                return None
+            if m.lastgroup == 'other' and not self.eof and self._cut_off(m.group()):
+                self._fill()
+                continue
+            self.pos = m.end()
+            if m.lastgroup is not None:
+                return m.lastgroup, m.group(m.lastgroup)
+
+    def _cut_off(self, char):
+        """Whether a quote or comment opener failed to match only because its end is not read yet"""
+        rest = self.buf[self.pos + 1:]
+        if char in '"\'':
+            return '\n' not in rest
+        if char == '`':
+            return '`' not in rest
+        if char == '/':
+            return rest[:1] == '*' and '*/' not in rest[1:]
+        return False
+
+    def _expect(self):
+        token = self._next()
+        if token is None:
+            raise ValueError('Unexpected end of file')
+        return token
+
+    def _peek_char(self):
+        while self.pos >= len(self.buf) and not self.eof:
+            self._fill()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ''
+
+    def _value(self, token):
+        kind, text = token
+        if text == '{':
+            return self._object()
+        if text == '[':
+            return self._array()
+        if kind == 'other':
+            raise ValueError(f'Unexpected {text!r}')
+        return _scalar(text)
+
+    def _object(self):
+        obj = {}
+        while True:
+            kind, text = self._expect()
+            if text == '}':
+                return obj
+            if text == ',':
+                continue
+            if kind == 'other':
+                raise ValueError(f'Unexpected {text!r} in object literal')
+            key = _unquote(text) if kind == 'string' else text
+            if self._expect()[1] != ':':
+                raise ValueError(f'Expected ":" after {key!r}')
+            obj[key] = self._value(self._expect())
+
+    def _array(self):
+        items = []
+        while True:
+            token = self._expect()
+            if token[1] == ']':
+                return items
+            if token[1] == ',':
+                continue
+            items.append(self._value(token))
+
+    def _find_array(self):
+        """Advance to the first '{' of the first array whose first element is an object"""
+        while True:
+            token = self._next()
+            if token is None:
+                return False
+            if token[1] == '[':
+                self._skip()
+                if self._peek_char() == '{':
+                    return True
+
+    def records(self):
+        """Yield each object literal of the array as a dict"""
+        if not self._find_array():
+            raise ValueError('Could not find employee array in file')
+
+        while True:
+            self._skip(_SEPARATOR)
+            if self._peek_char() == '{':
+                while len(self.buf) - self.pos < self.FLAT_LOOKAHEAD and not self.eof:
+                    self._fill()
+                m = _FLAT_OBJECT.match(self.buf, self.pos)
+                if m is not None:
+                    self.pos = m.end()
+                    yield self._flat_record(m.group())
+                    continue
+
+            token = self._next()
+            if token is None:
+                raise ValueError('Unterminated employee array')
+            if token[1] == ']':
+                return
+            if token[1] != '{':
+                raise ValueError(f'Expected an object literal, got {token[1]!r}')
+            yield self._object()
+
+    @staticmethod
+    def _flat_record(text):
+        # The object already matched as a whole, so its pairs are exactly the findall matches
+        return {
+            _scalar(key) if key[0] in '"\'`' else key: _scalar(value)
+            for key, value in _PAIR.findall(text)
+        }
 
-def convert_ts_to_csv():
+
+def convert_record(record):
+    """Shape a parsed employee for training: no id, booleans as Yes/No"""
+    record.pop('id', None)
+    for field in YES_NO_FIELDS:
+        value = record.get(field)
+        if isinstance(value, bool):
+            record[field] = 'Yes' if value else 'No'
+    return record
+
+
+class CsvBatchWriter:
+    def __init__(self, path, columns):
+        self.f = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.f, fieldnames=columns, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetBatchWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Parquet output requires pyarrow (pip install pyarrow)')
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    def write(self, records):
+        rows = [{col: r.get(col) for col in self.columns} for r in records]
+        if self.writer is None:
+            # The first batch fixes the schema; later batches are converted to it
+            table = self.pa.Table.from_pylist(rows)
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = self.pa.Table.from_pylist(rows, schema=self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {'csv': CsvBatchWriter, 'parquet': ParquetBatchWriter}
+
+
+def convert_ts_file(ts_file, output_file, output_format='csv', batch_size=10000):
+    """Stream employee records from a TypeScript file into CSV or Parquet in batches
+
+    The columns are those of the first batch. Returns the number of rows and
+    the attrition counts.
+    """
+    counts = Counter()
+    n_rows = 0
+    writer = None
+    batch = []
+
+    def flush():
+        nonlocal writer
+        if writer is None:
+            # Columns come from the first batch, in ML column order
+            present = set().union(*batch)
+            columns = [col for col in COLUMN_ORDER if col in present]
+            writer = WRITERS[output_format](output_file, columns)
+        writer.write(batch)
+        batch.clear()
+
+    try:
+        with open(ts_file, 'r', encoding='utf-8') as f:
+            for record in TsArrayReader(f).records():
+                record = convert_record(record)
+                counts[record.get('attrition')] += 1
+                batch.append(record)
+                n_rows += 1
+                if len(batch) >= batch_size:
+                    flush()
+        if batch:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows, counts
+
+
+def convert_ts_to_csv(ts_file='../src/data/attritionData.ts', output_file='../data/employee_data.csv',
+                      output_format=None, batch_size=10000):
     """Convert attritionData.ts to CSV format"""
-    
-    # Read the TypeScript file
-    ts_file = '../src/data/attritionData.ts'
-    
     if not os.path.exists(ts_file):
         print(f"Error: {ts_file} not found!")
         sys.exit(1)
-    
+
+    output_format = output_format or ('parquet' if output_file.endswith('.parquet') else 'csv')
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
     print(f"Reading data from {ts_file}...")
-    
-    with open(ts_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract the array content
-    start = content.find('[')
-    end = content.rfind(']') + 1
-    
-    if start == -1 or end == 0:
-        print("Error: Could not find employee array in file!")
-        sys.exit(1)
-    
-    json_str = content[start:end]
-    
-    # Fix TypeScript syntax to valid JSON
-    json_str = json_str.replace("'", '"')  # Single to double quotes
-    json_str = json_str.replace('overTime: true', 'overTime: "Yes"')
-    json_str = json_str.replace('overTime: false', 'overTime: "No"')
-    json_str = json_str.replace('attrition: true', 'attrition: "Yes"')
-    json_str = json_str.replace('attrition: false', 'attrition: "No"')
-    
+
     try:
-        # Parse JSON
-        data = json.loads(json_str)
-        print(f"Loaded {len(data)} employee records")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Drop ID column (not needed for training)
-        if 'id' in df.columns:
-            df = df.drop('id', axis=1)
-        
-        # Ensure correct column order for ML
-        column_order = [
-            'age', 'attrition', 'businessTravel', 'department', 
-            'distanceFromHome', 'education', 'educationField',
-            'environmentSatisfaction', 'gender', 'jobInvolvement',
-            'jobLevel', 'jobRole', 'jobSatisfaction', 'maritalStatus',
-            'monthlyIncome', 'numCompaniesWorked', 'overTime',
-            'performanceRating', 'relationshipSatisfaction',
-            'stockOptionLevel', 'trainingTimesLastYear', 'workLifeBalance',
-            'yearsAtCompany', 'yearsInCurrentRole', 'yearsSinceLastPromotion',
-            'yearsWithCurrManager'
-        ]
-        
-        # Reorder columns
-        available_cols = [col for col in column_order if col in df.columns]
-        df = df[available_cols]
-        
-        # Save to CSV
-        output_dir = '../data'
-        os.makedirs(output_dir, exist_ok=True)
-        
-        output_file = f'{output_dir}/employee_data.csv'
-        df.to_csv(output_file, index=False)
-        
-        print(f"\n{'='*60}")
-        print("Data conversion successful!")
-        print(f"{'='*60}")
-        print(f"Output file: {output_file}")
-        print(f"Total rows: {len(df)}")
-        print(f"Total columns: {len(df.columns)}")
-        print(f"\nColumn names:")
-        for col in df.columns:
-            print(f"  - {col}")
-        
-        print(f"\nAttrition distribution:")
-        print(df['attrition'].value_counts())
-        
-        print(f"\n{'='*60}")
-        print("You can now train the model using:")
-        print("  python train_model.py")
-        print(f"{'='*60}")
-        
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON: {e}")
+        n_rows, counts = convert_ts_file(ts_file, output_file, output_format, batch_size)
+    except ValueError as e:
+        print(f"Error parsing {ts_file}: {e}")
         print("There might be syntax issues in the TypeScript file.")
         sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
 
+    if not n_rows:
+        print("Error: Employee array is empty!")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("Data conversion successful!")
+    print(f"{'='*60}")
+    print(f"Output file: {output_file}")
+    print(f"Total rows: {n_rows}")
+
+    print(f"\nAttrition distribution:")
+    for value, count in counts.most_common():
+        print(f"  {value}: {count}")
+
+    print(f"\n{'='*60}")
+    print("You can now train the model using:")
+    print("  python train_model.py")
+    print(f"{'='*60}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert TypeScript employee data for training')
+    parser.add_argument('--input', default='../src/data/attritionData.ts', help='TypeScript data file')
+    parser.add_argument('--output', default='../data/employee_data.csv', help='CSV or .parquet output')
+    parser.add_argument('--format', choices=list(WRITERS), help='Output format (default: from extension)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Records written per batch')
+    args = parser.parse_args()
+
+    convert_ts_to_csv(args.input, args.output, args.format, args.batch_size)
+
+
 if __name__ == '__main__':
-    convert_ts_to_csv()
+    main()
@@ -0,0 +1,130 @@
+"""
+Typed, column-pruned CSV ingestion for employee data in either header style
+"""
+import csv
+
+import pandas as pd
+
+# Raw IBM HR export header -> training column; other IBM columns are never read
+IBM_COLUMN_MAP = {
+    'Age': 'age',
+    'Attrition': 'attrition',
+    'BusinessTravel': 'businessTravel',
+    'Department': 'department',
+    'DistanceFromHome': 'distanceFromHome',
+    'Education': 'education',
+    'EducationField': 'educationField',
+    'EnvironmentSatisfaction': 'environmentSatisfaction',
+    'Gender': 'gender',
+    'JobInvolvement': 'jobInvolvement',
+    'JobLevel': 'jobLevel',
+    'JobRole': 'jobRole',
+    'JobSatisfaction': 'jobSatisfaction',
+    'MaritalStatus': 'maritalStatus',
+    'MonthlyIncome': 'monthlyIncome',
+    'NumCompaniesWorked': 'numCompaniesWorked',
+    'OverTime': 'overTime',
+    'PerformanceRating': 'performanceRating',
+    'RelationshipSatisfaction': 'relationshipSatisfaction',
+    'StockOptionLevel': 'stockOptionLevel',
+    'TrainingTimesLastYear': 'trainingTimesLastYear',
+    'WorkLifeBalance': 'workLifeBalance',
+    'YearsAtCompany': 'yearsAtCompany',
+    'YearsInCurrentRole': 'yearsInCurrentRole',
+    'YearsSinceLastPromotion': 'yearsSinceLastPromotion',
+    'YearsWithCurrManager': 'yearsWithCurrManager'
+}
+
+# Declared dtype of every training column; survey scales fit in Int8. The nullable
+# integer dtypes read blank cells as missing (pd.NA) instead of failing the parse
+COLUMN_DTYPES = {
+    'age': 'Int16',
+    'attrition': 'object',
+    'businessTravel': 'category',
+    'department': 'category',
+    'distanceFromHome': 'Int16',
+    'education': 'Int8',
+    'educationField': 'category',
+    'environmentSatisfaction': 'Int8',
+    'gender': 'category',
+    'jobInvolvement': 'Int8',
+    'jobLevel': 'Int8',
+    'jobRole': 'category',
+    'jobSatisfaction': 'Int8',
+    'maritalStatus': 'category',
+    'monthlyIncome': 'Int32',
+    'numCompaniesWorked': 'Int16',
+    'overTime': 'category',
+    'performanceRating': 'Int8',
+    'relationshipSatisfaction': 'Int8',
+    'stockOptionLevel': 'Int8',
+    'trainingTimesLastYear': 'Int16',
+    'workLifeBalance': 'Int8',
+    'yearsAtCompany': 'Int16',
+    'yearsInCurrentRole': 'Int16',
+    'yearsSinceLastPromotion': 'Int16',
+    'yearsWithCurrManager': 'Int16'
+}
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# The pyarrow parser is multi-threaded; pandas' C parser is the fallback
+DEFAULT_ENGINE = 'pyarrow' if _has_pyarrow() else 'c'
+
+
+def read_header(csv_path):
+    """Column names of a CSV, without a UTF-8 byte order mark"""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def column_plan(header, columns=None):
+    """Source columns to read, their dtypes and the renames to training names
+
+    columns limits the result to those training columns (default: all declared).
+    """
+    wanted = set(COLUMN_DTYPES if columns is None else columns)
+    usecols, dtype, rename = [], {}, {}
+    seen = set()
+    for name in header:
+        target = IBM_COLUMN_MAP.get(name, name)
+        if target not in wanted or target in seen:
+            continue
+        seen.add(target)
+        usecols.append(name)
+        if target in COLUMN_DTYPES:
+            dtype[name] = COLUMN_DTYPES[target]
+        if target != name:
+            rename[name] = target
+    return usecols, dtype, rename
+
+
+def read_employee_csv(csv_path, columns=None, chunksize=None, nrows=None, engine=None):
+    """Read an employee CSV with camelCase or raw IBM headers into training columns
+
+    Only the needed columns are parsed, straight into their declared dtypes.
+    With chunksize, returns an iterator of DataFrames (read with the C parser).
+    """
+    usecols, dtype, rename = column_plan(read_header(csv_path), columns)
+    if chunksize is not None or nrows is not None:
+        # Neither is supported by the pyarrow parser
+        engine = 'c'
+    reader = pd.read_csv(
+        csv_path,
+        usecols=usecols,
+        dtype=dtype,
+        encoding='utf-8-sig',
+        engine=engine or DEFAULT_ENGINE,
+        chunksize=chunksize,
+        nrows=nrows
+    )
+    if chunksize is None:
+        return reader.rename(columns=rename)
+    return (chunk.rename(columns=rename) for chunk in reader)
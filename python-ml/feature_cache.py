@@ -0,0 +1,75 @@
+"""
+Fingerprinted on-disk cache of encoded training data, memory-mapped on load
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from model_registry import file_fingerprint
+
+
+class FeatureCache:
+    """Encoded feature matrices stored as <root>/<key>/{X,y}.npy plus meta.json
+
+    The key hashes the source file contents together with the feature schema,
+    so a change to either is a miss. Entries beyond max_entries are evicted,
+    least recently used first.
+    """
+
+    def __init__(self, root, max_entries=4):
+        self.root = root
+        self.max_entries = max_entries
+
+    def key(self, csv_path, schema):
+        digest = hashlib.sha256(file_fingerprint(csv_path).encode())
+        digest.update(json.dumps(schema, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """Return (X, y, meta) memory-mapped read-only, or None on a miss"""
+        path = os.path.join(self.root, key)
+        meta_path = os.path.join(path, 'meta.json')
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            X = np.load(os.path.join(path, 'X.npy'), mmap_mode='r')
+            y = np.load(os.path.join(path, 'y.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+        # Recency for eviction
+        os.utime(meta_path)
+        return X, y, meta
+
+    def save(self, key, X, y, meta):
+        """Store an entry; the directory is renamed into place so readers never see a partial one"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f'.{key}.{uuid.uuid4().hex[:8]}.tmp')
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'X.npy'), np.ascontiguousarray(X))
+        np.save(os.path.join(tmp, 'y.npy'), np.ascontiguousarray(y))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(tmp, os.path.join(self.root, key))
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if name.startswith('.'):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.root, name, 'meta.json')), name))
+            except OSError:
+                continue
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
@@ -0,0 +1,95 @@
+"""
+Schema-compiled encoder turning employee records into scaled feature matrices
+"""
+import numpy as np
+
+
+def _numeric(values):
+    """Values as float64, NaN for None, pd.NA (nullable integer columns) and non-numbers"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+class FeatureEncoder:
+    """Encode dicts or columns straight into a float32 matrix using lookup tables"""
+
+    def __init__(self, feature_names, categories, mean, scale, unknown_value=0.0):
+        self.feature_names = list(feature_names)
+        self.categories = {col: list(classes) for col, classes in categories.items()}
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        # Scaled value used for unseen categories and missing values (0.0 is the training mean)
+        self.unknown_value = float(unknown_value)
+
+        # Category string -> already-scaled value, so encoding and scaling happen in one lookup
+        self.lookup = {}
+        for j, col in enumerate(self.feature_names):
+            if col in self.categories:
+                codes = np.arange(len(self.categories[col]), dtype=np.float64)
+                scaled = (codes - self.mean[j]) / self.scale[j]
+                self.lookup[col] = dict(zip(self.categories[col], scaled.tolist()))
+
+    @classmethod
+    def from_preprocessors(cls, feature_names, label_encoders, scaler, unknown_value=0.0):
+        """Compile from fitted LabelEncoders and a StandardScaler"""
+        n_features = len(feature_names)
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+
+        return cls(
+            feature_names=feature_names,
+            categories={
+                col: [str(c) for c in le.classes_]
+                for col, le in label_encoders.items()
+                if col in feature_names
+            },
+            mean=np.zeros(n_features) if mean is None else mean,
+            scale=np.ones(n_features) if scale is None else scale,
+            unknown_value=unknown_value
+        )
+
+    def transform(self, records):
+        """Encode a dict or list of dicts into a (rows, features) float32 matrix"""
+        if isinstance(records, dict):
+            records = [records]
+
+        columns = {
+            col: [record.get(col) for record in records]
+            for col in self.feature_names
+        }
+        return self.transform_columns(columns, len(records))
+
+    def transform_columns(self, columns, n_rows=None):
+        """Encode a mapping of column name -> sequence of values"""
+        if n_rows is None:
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+
+        out = np.empty((n_rows, len(self.feature_names)), dtype=np.float32)
+
+        for j, col in enumerate(self.feature_names):
+            values = columns.get(col)
+            if values is None:
+                out[:, j] = self.unknown_value
+                continue
+
+            if col in self.lookup:
+                table = self.lookup[col]
+                unknown = self.unknown_value
+                out[:, j] = [
+                    unknown if v is None else table.get(str(v), unknown)
+                    for v in values
+                ]
+            else:
+                raw = _numeric(values)
+                scaled = (raw - self.mean[j]) / self.scale[j]
+                out[:, j] = np.where(np.isnan(scaled), self.unknown_value, scaled)
+
+        return out
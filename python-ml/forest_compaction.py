@@ -0,0 +1,236 @@
+"""
+Forest compaction: drop trees and collapse subtrees within a held-out accuracy budget
+"""
+import copy
+import pickle
+import time
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+# Largest allowed drop in selection accuracy and ROC-AUC against the full forest
+ACCURACY_TOLERANCE = 0.01
+ROC_AUC_TOLERANCE = 0.01
+
+# Subtrees whose leaf probabilities span at most this much become one leaf; 0.0 is lossless
+LEAF_TOLERANCES = (0.0, 0.01, 0.02, 0.05, 0.1)
+
+# Fewest trees kept: at least MIN_TREES and MIN_TREE_FRACTION of the forest
+MIN_TREES = 20
+MIN_TREE_FRACTION = 0.25
+
+# Held-out rows used to score candidates; test splits come shuffled, so the first rows are a sample
+MAX_HOLDOUT_ROWS = 20000
+
+# Smallest selection and report halves of the held-out rows, overall and per class
+MIN_SELECTION_ROWS = 100
+MIN_CLASS_ROWS = 10
+
+
+def _leaf_probability(tree):
+    counts = tree.value[:, 0, :]
+    return counts[:, 1] / counts.sum(axis=1)
+
+
+def _node_depths(tree):
+    left, right = tree.children_left, tree.children_right
+    depth = np.zeros(tree.node_count, dtype=np.int64)
+    level = np.array([0])
+    d = 0
+    while len(level):
+        depth[level] = d
+        level = level[left[level] != -1]
+        level = np.concatenate([left[level], right[level]])
+        d += 1
+    return depth
+
+
+def leaf_spread(tree):
+    """Lowest and highest leaf probability under every node, shape (nodes,) each"""
+    left, right = tree.children_left, tree.children_right
+    proba = _leaf_probability(tree)
+    low, high = proba.copy(), proba.copy()
+    depth = _node_depths(tree)
+    internal = left != -1
+    # Deepest internal nodes first, so both children are final before their parent
+    for d in range(int(depth.max()) - 1, -1, -1):
+        nodes = np.flatnonzero(internal & (depth == d))
+        low[nodes] = np.minimum(low[left[nodes]], low[right[nodes]])
+        high[nodes] = np.maximum(high[left[nodes]], high[right[nodes]])
+    return low, high, depth
+
+
+def prune_tree(estimator, tolerance, spread=None):
+    """Copy of a fitted decision tree with every subtree whose leaves agree within tolerance collapsed
+
+    A collapsed node keeps its own class distribution, the sample-weighted mean
+    of the leaves below it, so each tree's probability moves by at most tolerance.
+    """
+    from sklearn.tree._tree import Tree
+
+    tree = estimator.tree_
+    low, high, depth = spread if spread is not None else leaf_spread(tree)
+    left, right = tree.children_left, tree.children_right
+    # Leaf probabilities of equal class ratios can differ in the last bits
+    collapse = (left != -1) & (high - low <= tolerance + 1e-12)
+    split = (left != -1) & ~collapse
+
+    keep = np.zeros(tree.node_count, dtype=bool)
+    keep[0] = True
+    for d in range(int(depth.max())):
+        nodes = np.flatnonzero(keep & split & (depth == d))
+        keep[left[nodes]] = True
+        keep[right[nodes]] = True
+
+    state = tree.__getstate__()
+    new_ids = np.cumsum(keep) - 1
+    nodes = state['nodes'][keep].copy()
+    is_split = split[keep]
+    nodes['left_child'] = np.where(is_split, new_ids[left[keep]], -1)
+    nodes['right_child'] = np.where(is_split, new_ids[right[keep]], -1)
+    nodes['feature'] = np.where(is_split, nodes['feature'], -2)
+    nodes['threshold'] = np.where(is_split, nodes['threshold'], -2.0)
+
+    pruned = Tree(tree.n_features, np.asarray(tree.n_classes, dtype=np.intp), tree.n_outputs)
+    pruned.__setstate__({
+        'max_depth': int(depth[keep].max()),
+        'node_count': int(keep.sum()),
+        'nodes': nodes,
+        'values': np.ascontiguousarray(state['values'][keep])
+    })
+    result = copy.copy(estimator)
+    result.tree_ = pruned
+    return result
+
+
+def _with_estimators(model, estimators):
+    forest = copy.copy(model)
+    forest.estimators_ = estimators
+    forest.n_estimators = len(estimators)
+    return forest
+
+
+def _scores(y, proba):
+    from sklearn.metrics import roc_auc_score
+    return float(np.mean((proba > 0.5) == y)), float(roc_auc_score(y, proba))
+
+
+def _profile(model, engine, X, y, single_calls=200):
+    """Size, latency and held-out scores of a forest and its compiled engine"""
+    single = []
+    for row in X[:single_calls]:
+        start = time.perf_counter()
+        engine.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    proba = engine.predict_proba(X)
+    batch_seconds = time.perf_counter() - start
+    accuracy, roc_auc = _scores(y, proba)
+
+    return {
+        'trees': engine.n_trees,
+        'nodes': engine.n_nodes,
+        'max_depth': engine.max_depth,
+        'engine_bytes': engine.nbytes,
+        'model_bytes': len(pickle.dumps(model)),
+        'accuracy': accuracy,
+        'roc_auc': roc_auc,
+        'predict_single_p50_ms': float(np.percentile(single, 50) * 1000),
+        'predict_batch_rows_per_sec': len(X) / batch_seconds
+    }
+
+
+def skip_reason(y):
+    """Why held-out labels are too few to both select and report a compaction, or None"""
+    y = np.asarray(y)[:MAX_HOLDOUT_ROWS].astype(np.int64)
+    counts = np.bincount(y, minlength=2)
+    if (counts == 0).any():
+        return 'held-out rows contain a single class'
+    if len(y) < 2 * MIN_SELECTION_ROWS:
+        return f'{len(y)} held-out rows, at least {2 * MIN_SELECTION_ROWS} needed'
+    if counts.min() < 2 * MIN_CLASS_ROWS:
+        return f'{counts.min()} held-out rows of the minority class, at least {2 * MIN_CLASS_ROWS} needed'
+    return None
+
+
+def compact_forest(model, X, y, accuracy_tolerance=ACCURACY_TOLERANCE,
+                   roc_auc_tolerance=ROC_AUC_TOLERANCE, leaf_tolerances=LEAF_TOLERANCES,
+                   min_trees=MIN_TREES, random_state=0):
+    """Smallest forest within the accuracy budget, its float32 engine and a trade-off report
+
+    The held-out rows X, y are split in stratified halves. Every leaf tolerance
+    is tried with every tree-count prefix (trees of a forest are exchangeable,
+    so the first k are as good as any k), and the candidate with the fewest
+    nodes whose accuracy and ROC-AUC on the selection half stay within the
+    tolerances of the full forest wins. The report's before/after scores come
+    from the other half, which selection never saw. Raises ValueError when
+    skip_reason(y) is not None.
+    """
+    from sklearn.model_selection import train_test_split
+
+    reason = skip_reason(y)
+    if reason is not None:
+        raise ValueError(f'Cannot compact: {reason}')
+    X_select, X_report, y_select, y_report = train_test_split(
+        np.asarray(X)[:MAX_HOLDOUT_ROWS], np.asarray(y)[:MAX_HOLDOUT_ROWS],
+        test_size=0.5, stratify=np.asarray(y)[:MAX_HOLDOUT_ROWS], random_state=random_state
+    )
+
+    full_engine = CompiledForest.from_sklearn(model)
+    accuracy, roc_auc = _scores(y_select, full_engine.predict_proba(X_select))
+    floor_accuracy = accuracy - accuracy_tolerance
+    floor_roc_auc = roc_auc - roc_auc_tolerance
+
+    n_trees = len(model.estimators_)
+    step = max(1, n_trees // 20)
+    fewest = min(n_trees, max(min_trees, int(np.ceil(n_trees * MIN_TREE_FRACTION))))
+    tree_counts = sorted({n_trees, *range(fewest, n_trees, step)})
+    spreads = [leaf_spread(estimator.tree_) for estimator in model.estimators_]
+
+    best = None
+    for tolerance in leaf_tolerances:
+        pruned = [prune_tree(e, tolerance, s) for e, s in zip(model.estimators_, spreads)]
+        engine = CompiledForest.from_sklearn(_with_estimators(model, pruned)).to_float32()
+        # Running mean over trees scores every prefix of the forest at once
+        per_tree = engine.value[engine.apply(X_select)].astype(np.float64)
+        prefix_proba = np.cumsum(per_tree, axis=1) / np.arange(1, n_trees + 1)
+        prefix_nodes = np.cumsum([e.tree_.node_count for e in pruned])
+
+        for k in tree_counts:
+            if best is not None and prefix_nodes[k - 1] >= best[0]:
+                continue
+            accuracy, roc_auc = _scores(y_select, prefix_proba[:, k - 1])
+            if accuracy >= floor_accuracy and roc_auc >= floor_roc_auc:
+                best = (prefix_nodes[k - 1], tolerance, pruned[:k])
+
+    _, tolerance, estimators = best
+    compacted = _with_estimators(model, estimators)
+    engine = CompiledForest.from_sklearn(compacted).to_float32()
+    before = _profile(model, full_engine, X_report, y_report)
+    after = _profile(compacted, engine, X_report, y_report)
+    parity = engine.check_parity(compacted, np.concatenate([X_select, X_report]))
+
+    report = {
+        'accuracy_tolerance': accuracy_tolerance,
+        'roc_auc_tolerance': roc_auc_tolerance,
+        'leaf_tolerance': tolerance,
+        'selection_rows': int(len(X_select)),
+        'report_rows': int(len(X_report)),
+        'dtype': 'float32',
+        'before': before,
+        'after': after,
+        'engine_parity': parity
+    }
+    return compacted, engine, report
+
+
+def print_compaction(report):
+    """Print a compact_forest report as a before/after table"""
+    before, after = report['before'], report['after']
+    print(f"\nForest compaction (leaf tolerance {report['leaf_tolerance']}, selected on "
+          f"{report['selection_rows']} held-out rows, scored on {report['report_rows']} others):")
+    for key in ('trees', 'nodes', 'max_depth', 'engine_bytes', 'model_bytes', 'accuracy',
+                'roc_auc', 'predict_single_p50_ms', 'predict_batch_rows_per_sec'):
+        fmt = '{:>14.4f}' if isinstance(before[key], float) else '{:>14}'
+        print(f"  {key:<28}{fmt.format(before[key])} -> {fmt.format(after[key])}")
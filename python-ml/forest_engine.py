@@ -0,0 +1,187 @@
+"""
+Compiled array-backed inference engine for tree ensembles
+"""
+import json
+import os
+
+import numpy as np
+
+
+class CompiledForest:
+    """Random forest flattened into contiguous node arrays and scored in one vectorized pass"""
+
+    # Rows scored per traversal step; bounds the (rows x trees) index arrays
+    CHUNK_SIZE = 8192
+
+    ARRAYS = ('feature', 'threshold', 'children_left', 'children_right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children_left, children_right, value, roots, max_depth, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        """Size of the node arrays, as written by save()"""
+        return int(sum(getattr(self, name).nbytes for name in self.ARRAYS))
+
+    @classmethod
+    def supports(cls, model):
+        """Check whether a fitted estimator can be compiled"""
+        from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+        return (
+            isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+            and hasattr(model, 'estimators_')
+            and len(model.classes_) == 2
+        )
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten the trees of a fitted binary forest classifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            node_ids = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point back at themselves so every row can take max_depth steps
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            counts = tree.value[:, 0, :]
+            proba = counts[:, 1] / counts.sum(axis=1)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(left)
+            rights.append(right)
+            values.append(proba)
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children_left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            children_right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=model.classes_
+        )
+
+    def to_float32(self):
+        """Copy with float32 thresholds and leaf values, halving their size
+
+        Thresholds are rounded down to the nearest float32, so float32 features
+        take exactly the same branches; leaf values lose precision past ~1e-7.
+        """
+        threshold = self.threshold.astype(np.float32)
+        above = threshold > self.threshold
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        return CompiledForest(
+            feature=self.feature,
+            threshold=threshold,
+            children_left=self.children_left,
+            children_right=self.children_right,
+            value=self.value.astype(np.float32),
+            roots=self.roots,
+            max_depth=self.max_depth,
+            classes=self.classes_
+        )
+
+    def save(self, path):
+        """Write each node array as an uncompressed .npy file so it can be memory-mapped"""
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({
+                'max_depth': self.max_depth,
+                'classes': self.classes_.tolist()
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Load node arrays, memory-mapped read-only by default so worker processes share pages"""
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        # np.asarray drops the memmap subclass, avoiding its per-index overhead
+        arrays = {
+            name: np.asarray(np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+            for name in cls.ARRAYS
+        }
+        return cls(max_depth=meta['max_depth'], classes=meta['classes'], **arrays)
+
+    def apply(self, X):
+        """Return the leaf node index reached in every tree, shape (rows, trees)"""
+        # sklearn compares float32 features against the split thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for each row"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        proba = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], self.CHUNK_SIZE):
+            stop = start + self.CHUNK_SIZE
+            proba[start:stop] = self.value[self.apply(X[start:stop])].mean(axis=1, dtype=np.float64)
+        return proba
+
+    def labels_from_proba(self, proba):
+        """Map positive-class probabilities to class labels"""
+        return self.classes_[(np.asarray(proba) > 0.5).astype(np.intp)]
+
+    def predict(self, X):
+        """Return class labels for each row"""
+        return self.labels_from_proba(self.predict_proba(X))
+
+    def check_parity(self, model, X, atol=None):
+        """Compare compiled scores against the sklearn model on the same rows
+
+        atol defaults to 1e-9, or 1e-6 for float32 leaf values.
+        """
+        if atol is None:
+            atol = 1e-6 if self.value.dtype == np.float32 else 1e-9
+        expected_proba = model.predict_proba(X)[:, 1]
+        expected_labels = model.predict(X)
+        proba = self.predict_proba(X)
+        max_abs_diff = float(np.max(np.abs(proba - expected_proba))) if len(proba) else 0.0
+        labels_match = bool(np.array_equal(self.labels_from_proba(proba), expected_labels))
+
+        return {
+            'rows': int(len(proba)),
+            'max_abs_diff': max_abs_diff,
+            'labels_match': labels_match,
+            'passed': labels_match and max_abs_diff <= atol
+        }
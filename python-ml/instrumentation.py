@@ -0,0 +1,270 @@
+"""
+Low-overhead latency histograms and counters, rendered in the Prometheus text format
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+# Upper bounds in seconds, from a fraction of a millisecond (single stages) up to slow batch calls
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Upper bounds of rows scored per model call
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1000, 10000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a running sum"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        """(name, labels, value) samples for the _bucket, _sum and _count series"""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            le = bound if bound == '+Inf' else _format_value(bound)
+            yield f'{name}_bucket', {**labels, 'le': le}, total
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+class _Timer:
+    """Context manager observing its elapsed seconds into a histogram"""
+
+    __slots__ = ('metrics', 'key', 'start')
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _StageTimer(_Timer):
+    """Stage timer that also reports to the stage sink of the current context"""
+
+    __slots__ = ('stage', 'sink')
+
+    def __init__(self, metrics, stage, sink):
+        self.metrics = metrics
+        self.key = ('attrition_stage_seconds', (('stage', stage),))
+        self.stage = stage
+        self.sink = sink
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if self.metrics.enabled:
+            self.metrics._observe(self.key, seconds)
+        if self.sink is not None:
+            self.sink(self.stage, seconds)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+# Callable(stage, seconds) receiving the stage timings of one request, e.g. a profiling session.
+# Context variables follow a request into run_in_threadpool calls.
+stage_sink = contextvars.ContextVar('stage_sink', default=None)
+
+
+class Metrics:
+    """Registry of labelled histograms and counters
+
+    Series are created on first use. Collectors registered with add_collector
+    are called at render time for values kept elsewhere (batcher, cache, model).
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._families = {}
+        self._series = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """Declare a metric family: kind is 'counter', 'gauge' or 'histogram'"""
+        self._families[name] = (kind, help_text, buckets or LATENCY_BUCKETS)
+
+    def observe(self, name, value, **labels):
+        if self.enabled:
+            self._observe((name, tuple(sorted(labels.items()))), value)
+
+    def _observe(self, key, value):
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram(self._families[key[0]][2])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def timer(self, name, **labels):
+        """Time a block into the histogram name"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, (name, tuple(sorted(labels.items()))))
+
+    def stage(self, stage):
+        """Time one stage of the prediction path"""
+        sink = stage_sink.get()
+        if not self.enabled and sink is None:
+            return _NULL_TIMER
+        return _StageTimer(self, stage, sink)
+
+    def add_collector(self, collector):
+        """Register a callable returning (name, kind, help, samples) families
+
+        samples is a list of (sample name, labels dict, value), so a collector
+        can emit the _bucket/_sum/_count series of a histogram it keeps itself.
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            series = [
+                (name, dict(labels), _snapshot(value) if isinstance(value, Histogram) else value)
+                for (name, labels), value in self._series.items()
+            ]
+
+        by_family = {}
+        for name, labels, value in series:
+            by_family.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, (kind, help_text, _) in self._families.items():
+            entries = sorted(by_family.get(name, []), key=lambda e: sorted(e[0].items()))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in entries:
+                if kind == 'histogram':
+                    for sample_name, sample_labels, sample_value in value.samples(name, labels):
+                        lines.append(_format_sample(sample_name, sample_labels, sample_value))
+                else:
+                    lines.append(_format_sample(name, labels, value))
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for sample_name, labels, value in samples:
+                    lines.append(_format_sample(sample_name, labels, value))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _snapshot(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = histogram.counts[:]
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        return f'{name}{{{label_text}}} {_format_value(value)}'
+    return f'{name} {_format_value(value)}'
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests, errors and latency per route template
+
+    Routes are labelled by their path template (e.g. /train/{job_id}) so the
+    number of series stays bounded; requests matching no route share one label.
+    Latency runs until the last body chunk is sent, so it covers streaming.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            method = scope['method']
+            self.metrics.observe(
+                'attrition_http_request_duration_seconds', time.perf_counter() - start,
+                endpoint=endpoint, method=method
+            )
+            self.metrics.inc('attrition_http_requests_total', endpoint=endpoint, method=method,
+                             status=str(status[0]))
+            if status[0] >= 500:
+                self.metrics.inc('attrition_http_errors_total', endpoint=endpoint, method=method)
+
+
+# Process-wide registry; METRICS_ENABLED=0 turns every timer and counter into a no-op
+metrics = Metrics(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
+
+metrics.describe('attrition_http_requests_total', 'counter', 'HTTP requests by route, method and status')
+metrics.describe('attrition_http_errors_total', 'counter', 'HTTP requests answered with a 5xx status')
+metrics.describe('attrition_http_request_duration_seconds', 'histogram',
+                 'Time from request start to the last response byte, by route')
+metrics.describe('attrition_stage_seconds', 'histogram',
+                 'Time spent in each stage of the prediction path, per model call')
+metrics.describe('attrition_predict_rows', 'histogram', 'Rows scored per predictor call',
+                 buckets=ROW_BUCKETS)
@@ -0,0 +1,187 @@
+"""
+Versioned model registry with atomic promote and rollback
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, data):
+    """Write JSON to a temp file and rename it over path"""
+    tmp = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """Model versions stored as models/versions/<version>/ with a promoted pointer
+
+    registry.json holds the current version and the promotion history used by
+    rollback. Each version directory holds the artifacts written by
+    AttritionPredictor.save_model plus a manifest.json.
+    """
+
+    def __init__(self, root='models'):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        self.state_path = os.path.join(root, 'registry.json')
+        # Encoded training data reused across retrains (see feature_cache.FeatureCache)
+        self.feature_cache_dir = os.path.join(root, 'feature_cache')
+
+    def new_version_id(self):
+        return f"v{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:4]}"
+
+    def version_path(self, version):
+        return os.path.join(self.versions_dir, version)
+
+    def _read_state(self):
+        if not os.path.exists(self.state_path):
+            return {'current': None, 'history': []}
+        with open(self.state_path, 'r') as f:
+            return json.load(f)
+
+    def state_mtime(self):
+        """Modification time of registry.json, or None if nothing was promoted yet"""
+        try:
+            return os.path.getmtime(self.state_path)
+        except OSError:
+            return None
+
+    def current_version(self):
+        return self._read_state()['current']
+
+    def current_path(self):
+        """Directory of the promoted model, falling back to legacy files in the root"""
+        version = self.current_version()
+        if version is not None:
+            return self.version_path(version)
+        if os.path.exists(os.path.join(self.root, 'attrition_model.pkl')):
+            return self.root
+        return None
+
+    def manifest(self, version):
+        with open(os.path.join(self.version_path(version), 'manifest.json'), 'r') as f:
+            return json.load(f)
+
+    def list_versions(self):
+        """Manifests of every registered version, oldest first"""
+        if not os.path.isdir(self.versions_dir):
+            return []
+
+        current = self.current_version()
+        manifests = []
+        for version in sorted(os.listdir(self.versions_dir)):
+            try:
+                manifest = self.manifest(version)
+            except (OSError, ValueError):
+                # Incomplete or in-progress version directory
+                continue
+            manifest['current'] = version == current
+            manifests.append(manifest)
+        return manifests
+
+    def save_predictor(self, predictor, version=None, metrics=None, data_path=None, artifacts=None,
+                       compact=False):
+        """Save a trained predictor as a new version and write its manifest
+
+        artifacts maps extra file names, such as a tuning leaderboard, to JSON data.
+        compact is passed on to AttritionPredictor.save_model; the manifest then
+        carries the compacted forest's scores.
+        """
+        version = version or self.new_version_id()
+        path = self.version_path(version)
+
+        predictor.model_version = version
+        predictor.save_model(path, compact=compact)
+        metrics = predictor.compacted_results(metrics or {})
+        for name, data in (artifacts or {}).items():
+            _write_json_atomic(os.path.join(path, name), data)
+
+        manifest = {
+            'version': version,
+            'created_at': time.time(),
+            'metrics': {
+                k: float(v) for k, v in (metrics or {}).items()
+                if isinstance(v, (int, float))
+            },
+            'data_fingerprint': {
+                'path': data_path,
+                'sha256': file_fingerprint(data_path)
+            } if data_path else None,
+            'feature_schema': {
+                'features': list(predictor.feature_names),
+                'encoding': predictor.encoding,
+                'categorical': predictor.encoder.categories
+            },
+            'model': {
+                'type': type(predictor.model).__name__,
+                'params': {
+                    k: v for k, v in predictor.model.get_params().items()
+                    if isinstance(v, (int, float, str, bool, type(None)))
+                }
+            },
+            'artifacts': sorted(artifacts or {})
+        }
+        # The manifest is written last, so its presence marks a complete version
+        _write_json_atomic(os.path.join(path, 'manifest.json'), manifest)
+        return version
+
+    def discard(self, version):
+        """Delete an unpromoted version directory"""
+        if version == self.current_version():
+            raise ValueError(f'Cannot discard the current version {version}')
+        shutil.rmtree(self.version_path(version), ignore_errors=True)
+
+    def promote(self, version):
+        """Atomically make version the current model"""
+        if not os.path.exists(os.path.join(self.version_path(version), 'manifest.json')):
+            raise ValueError(f'Unknown model version: {version}')
+
+        state = self._read_state()
+        if state['current'] != version:
+            state['history'].append(version)
+            state['current'] = version
+            state['promoted_at'] = time.time()
+            _write_json_atomic(self.state_path, state)
+        return version
+
+    def previous_version(self):
+        """Version rollback would return to, without changing anything"""
+        history = self._read_state()['history']
+        if len(history) < 2:
+            raise ValueError('No previous model version to roll back to')
+        return history[-2]
+
+    def rollback(self, expected=None):
+        """Atomically return to the previously promoted version
+
+        Callers that load the previous version first pass it as expected, so a
+        promotion in the meantime fails the rollback instead of skipping a version.
+        """
+        state = self._read_state()
+        if len(state['history']) < 2:
+            raise ValueError('No previous model version to roll back to')
+        if expected is not None and state['history'][-2] != expected:
+            raise ValueError(f'Registry changed during rollback, previous version is now {state["history"][-2]}')
+
+        state['history'].pop()
+        state['current'] = state['history'][-1]
+        state['promoted_at'] = time.time()
+        _write_json_atomic(self.state_path, state)
+        return state['current']
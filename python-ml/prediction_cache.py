@@ -0,0 +1,88 @@
+"""
+In-process LRU/TTL cache for prediction results
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Size-bounded LRU cache with per-entry TTL, cleared whenever the model changes"""
+
+    def __init__(self, max_size=4096, ttl_seconds=300.0):
+        self.max_size = int(max_size)
+        self.ttl = float(ttl_seconds)
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @staticmethod
+    def key_for(namespace, payload):
+        """Canonical key for a namespace (endpoint and options) and a bytes payload"""
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        return f'{namespace}:{digest.hex()}'
+
+    def get(self, key):
+        """Return the cached value or None, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_version=None):
+        """Drop every entry, e.g. after the model was retrained or reloaded"""
+        with self._lock:
+            self._entries.clear()
+            self.model_version = model_version
+            self.invalidations += 1
+
+    def stats(self):
+        """Hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'model_version': self.model_version,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,197 @@
+"""
+Opt-in per-request profiling: cProfile plus a stage timing breakdown
+"""
+import asyncio
+import contextvars
+import cProfile
+import functools
+import glob
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from instrumentation import stage_sink
+
+# The profile flag is ignored unless PROFILING_ENABLED=1, since any caller can set it
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+# Where profile=file requests write their .prof files
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+# Hot functions listed in an inline report
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 20))
+# .prof files kept in PROFILE_DIR; older ones are deleted
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
+_session = contextvars.ContextVar('profile_session', default=None)
+
+# Only one cProfile profiler can be active at a time (enforced from Python 3.12)
+_profile_lock = threading.Lock()
+
+
+def profile_mode(request):
+    """None, 'inline' or 'file' from the X-Profile header or the profile query parameter"""
+    if not PROFILING_ENABLED:
+        return None
+    flag = request.headers.get('x-profile') or request.query_params.get('profile')
+    if not flag or flag.lower() in ('0', 'false', 'no'):
+        return None
+    return 'file' if flag.lower() == 'file' else 'inline'
+
+
+def profiling_active():
+    """Whether the current request is being profiled"""
+    return _session.get() is not None
+
+
+class ProfileSession:
+    """Deterministic profile and per-stage timings of one request"""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.stages = {}
+        self.start = time.perf_counter()
+        self.active = False
+
+    def record_stage(self, stage, seconds):
+        calls, total = self.stages.get(stage, (0, 0.0))
+        self.stages[stage] = (calls + 1, total + seconds)
+
+    def run(self, fn, *args, **kwargs):
+        # Nested calls run under the already enabled profiler
+        if self.active:
+            return fn(*args, **kwargs)
+        self.active = True
+        self.profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.profiler.disable()
+            self.active = False
+
+    def report(self, top_n=PROFILE_TOP_N):
+        """Wall time, stage breakdown and the functions with the most self time"""
+        stats = pstats.Stats(self.profiler).stats
+        hot = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top_n]
+        return {
+            'wall_ms': (time.perf_counter() - self.start) * 1000,
+            'stages': {
+                stage: {'calls': calls, 'total_ms': total * 1000}
+                for stage, (calls, total) in self.stages.items()
+            },
+            'hot_functions': [
+                {
+                    'function': func,
+                    'file': filename,
+                    'line': line,
+                    'calls': n_calls,
+                    'self_ms': self_time * 1000,
+                    'cumulative_ms': cumulative * 1000
+                }
+                for (filename, line, func), (_, n_calls, self_time, cumulative, _) in hot
+            ]
+        }
+
+    def dump(self, directory, name, max_files=PROFILE_MAX_FILES):
+        """Write the profile as a pstats file, keeping the newest max_files; returns its path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(directory, f'{stamp}-{name}-{uuid.uuid4().hex[:6]}.prof')
+        self.profiler.dump_stats(path)
+
+        profiles = sorted(glob.glob(os.path.join(directory, '*.prof')), key=os.path.getmtime)
+        for old in profiles[:max(0, len(profiles) - max_files)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return path
+
+
+async def run_profiled(fn, *args, **kwargs):
+    """Run fn in the threadpool, under the request's profiler when it is being profiled
+
+    Async endpoints do their model work through this; the event loop thread
+    itself is never profiled, since other requests' tasks run on it too.
+    """
+    session = _session.get()
+    if session is None:
+        return await run_in_threadpool(fn, *args, **kwargs)
+    return await run_in_threadpool(session.run, fn, *args, **kwargs)
+
+
+def _profiled(endpoint):
+    """Wrap a sync endpoint so it runs under the request's profiler when there is one"""
+    if asyncio.iscoroutinefunction(endpoint):
+        # Profiled through run_profiled calls
+        return endpoint
+
+    # Sync endpoints run in the threadpool, which inherits the request's context
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        session = _session.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        return session.run(endpoint, *args, **kwargs)
+    return wrapper
+
+
+class ProfilingRoute(APIRoute):
+    """APIRoute that profiles a request when it carries the profile flag
+
+    profile=1 (or X-Profile: 1) adds a 'profile' report to a JSON object
+    response; profile=file writes a .prof file to PROFILE_DIR and names it in
+    the X-Profile-File header. Without the flag the request runs as usual.
+    Profiled requests run one at a time (409 while another is in progress),
+    and routes declared with a streaming response_class reject the flag,
+    since their work happens after the handler returns.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = self.name
+        # APIRoute builds the handler from __init__, so the response class is already set
+        response_class = getattr(self.response_class, 'value', self.response_class)
+        streaming = isinstance(response_class, type) and issubclass(response_class, StreamingResponse)
+
+        async def profiling_handler(request):
+            mode = profile_mode(request)
+            if mode is None:
+                return await handler(request)
+            if streaming:
+                raise HTTPException(status_code=400, detail='Streaming endpoints cannot be profiled')
+            if not _profile_lock.acquire(blocking=False):
+                raise HTTPException(status_code=409, detail='Another profiled request is in progress')
+
+            session = ProfileSession()
+            token = _session.set(session)
+            sink_token = stage_sink.set(session.record_stage)
+            try:
+                response = await handler(request)
+            finally:
+                stage_sink.reset(sink_token)
+                _session.reset(token)
+                _profile_lock.release()
+
+            content = None
+            if mode == 'inline' and isinstance(response, JSONResponse):
+                content = json.loads(response.body)
+            if isinstance(content, dict):
+                content['profile'] = session.report()
+                response.body = response.render(content)
+                response.headers['content-length'] = str(len(response.body))
+            elif not isinstance(response, StreamingResponse):
+                # Non-object bodies cannot carry the report inline
+                response.headers['X-Profile-File'] = session.dump(PROFILE_DIR, name)
+            return response
+
+        return profiling_handler
@@ -0,0 +1,311 @@
+"""
+Declarative rule tables evaluated as vectorized column masks
+"""
+import operator
+
+import numpy as np
+
+# A condition is (field, op, value), or {'any': [conditions]} for an OR of several;
+# a rule fires when its condition holds. Missing or non-numeric values never
+# satisfy a comparison unless the table gives the field a default.
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq
+}
+
+LEAVE_REASON_RULES = [
+    {
+        'category': 'Job Satisfaction',
+        'reason': 'Low job satisfaction indicates employee is unhappy with their role',
+        'when': ('jobSatisfaction', '<=', 2),
+        'severity': 'major',
+        'severity_when': {'critical': ('jobSatisfaction', '==', 1)},
+        'impact': 85,
+        'preventable': True
+    },
+    {
+        'category': 'Work-Life Balance',
+        'reason': 'Poor work-life balance causing stress and burnout',
+        'when': ('workLifeBalance', '<=', 2),
+        'severity': 'critical',
+        'impact': 80,
+        'preventable': True
+    },
+    {
+        'category': 'Overtime',
+        'reason': 'Frequent overtime leading to exhaustion',
+        'when': ('overTime', 'in', ('Yes', 1, True)),
+        'severity': 'major',
+        'impact': 70,
+        'preventable': True
+    },
+    {
+        'category': 'Compensation',
+        'reason': 'Below-market compensation',
+        # 80% of the 6500 industry average
+        'when': ('monthlyIncome', '<', 6500 * 0.8),
+        'severity': 'critical',
+        'impact': 90,
+        'preventable': True
+    },
+    {
+        'category': 'Career Growth',
+        'reason': 'No career advancement in 5+ years',
+        'when': ('yearsSinceLastPromotion', '>=', 5),
+        'severity': 'major',
+        'impact': 75,
+        'preventable': True
+    },
+    {
+        'category': 'Commute',
+        'reason': 'Long commute distance causing daily stress',
+        'when': ('distanceFromHome', '>', 20),
+        'severity': 'moderate',
+        'impact': 50,
+        'preventable': False
+    },
+    {
+        'category': 'Work Environment',
+        'reason': 'Poor workplace environment satisfaction',
+        'when': ('environmentSatisfaction', '<=', 2),
+        'severity': 'major',
+        'impact': 65,
+        'preventable': True
+    },
+    {
+        'category': 'Relationships',
+        'reason': 'Poor workplace relationships',
+        'when': ('relationshipSatisfaction', '<=', 2),
+        'severity': 'moderate',
+        'impact': 60,
+        'preventable': True
+    },
+    {
+        'category': 'Professional Development',
+        'reason': 'No training or skill development opportunities',
+        'when': ('trainingTimesLastYear', '==', 0),
+        'severity': 'moderate',
+        'impact': 55,
+        'preventable': True
+    }
+]
+
+
+# Retention strategies, with the values assumed for fields an employee record lacks
+RETENTION_FIELD_DEFAULTS = {
+    'monthlyIncome': 0,
+    'workLifeBalance': 3,
+    'trainingTimesLastYear': 1,
+    'yearsAtCompany': 0,
+    'jobSatisfaction': 3,
+    'performanceRating': 3
+}
+
+RETENTION_STRATEGY_RULES = [
+    {
+        'category': 'Compensation',
+        'action': 'Salary review and adjustment (+10-15% market rate comparison)',
+        'when': ('monthlyIncome', '<', 5000),
+        'timeline': 'Immediate (1-2 weeks)',
+        'impact': 'high',
+        'cost': 'high',
+        'priority': 1
+    },
+    {
+        'category': 'Work-Life Balance',
+        'action': 'Reduce overtime, implement flexible schedule, remote work options',
+        'when': {'any': [('overTime', 'in', ('Yes',)), ('workLifeBalance', '<=', 2)]},
+        'timeline': 'Short-term (2-4 weeks)',
+        'impact': 'high',
+        'cost': 'low',
+        'priority': 1
+    },
+    {
+        'category': 'Career Development',
+        'action': 'Create personalized development plan, assign mentor, discuss promotion path',
+        'when': {'any': [('trainingTimesLastYear', '==', 0), ('yearsAtCompany', '>=', 5)]},
+        'timeline': 'Medium-term (1-3 months)',
+        'impact': 'high',
+        'cost': 'medium',
+        'priority': 2
+    },
+    {
+        'category': 'Job Redesign',
+        'action': 'One-on-one discussion, role adjustment, task variety increase',
+        'when': ('jobSatisfaction', '<=', 2),
+        'timeline': 'Short-term (2-4 weeks)',
+        'impact': 'high',
+        'cost': 'low',
+        'priority': 1
+    },
+    {
+        'category': 'Recognition & Rewards',
+        'action': 'Employee recognition program, spot bonuses, public acknowledgment',
+        'when': ('performanceRating', '>=', 3),
+        'timeline': 'Immediate (1 week)',
+        'impact': 'medium',
+        'cost': 'low',
+        'priority': 2
+    }
+]
+
+
+def _flatten(condition):
+    if isinstance(condition, dict):
+        for sub in condition['any']:
+            yield from _flatten(sub)
+    else:
+        yield condition
+
+
+def _conditions(rule):
+    yield from _flatten(rule['when'])
+    for condition in rule.get('severity_when', {}).values():
+        yield from _flatten(condition)
+
+
+def rule_fields(rules):
+    """Fields read by a rule table, in first-use order"""
+    fields = []
+    for rule in rules:
+        for field, _, _ in _conditions(rule):
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+
+def records_to_columns(records, fields, defaults=None):
+    """Pull the given fields out of a list of dicts as column lists"""
+    columns = {field: [record.get(field) for record in records] for field in fields}
+    for field, default in (defaults or {}).items():
+        if field in columns:
+            columns[field] = [default if v is None else v for v in columns[field]]
+    return columns
+
+
+def _numeric(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def evaluate_condition(condition, columns, n_rows):
+    """Boolean mask of the rows satisfying a condition"""
+    if isinstance(condition, dict):
+        mask = np.zeros(n_rows, dtype=bool)
+        for sub in condition['any']:
+            mask |= evaluate_condition(sub, columns, n_rows)
+        return mask
+
+    field, op, value = condition
+    values = columns.get(field)
+    if values is None:
+        return np.zeros(n_rows, dtype=bool)
+
+    if op == 'in':
+        return np.fromiter((v in value for v in values), dtype=bool, count=n_rows)
+
+    with np.errstate(invalid='ignore'):
+        return OPERATORS[op](_numeric(values), value)
+
+
+class LeaveReasonEngine:
+    """Leave-reason rule table compiled for batch evaluation"""
+
+    def __init__(self, rules=LEAVE_REASON_RULES):
+        # Rules are reported by impact, highest first; stable for equal impact
+        self.rules = sorted(rules, key=lambda r: r['impact'], reverse=True)
+        self.fields = rule_fields(self.rules)
+        self.preventable = np.array([r['preventable'] for r in self.rules], dtype=bool)
+
+    def analyze(self, records):
+        """Analyze a list of employee dicts"""
+        return self.analyze_columns(records_to_columns(records, self.fields), len(records))
+
+    def analyze_columns(self, columns, n_rows):
+        """Analyze employees given as a mapping of field -> sequence of values"""
+        fired = np.vstack([evaluate_condition(r['when'], columns, n_rows) for r in self.rules])
+
+        # Per rule, the severity of each row: default unless an override condition holds
+        severities = []
+        for rule in self.rules:
+            severity = np.full(n_rows, rule['severity'], dtype=object)
+            for level, condition in rule.get('severity_when', {}).items():
+                severity[evaluate_condition(condition, columns, n_rows)] = level
+            severities.append(severity)
+
+        counts = fired.sum(axis=0)
+        preventable_counts = fired[self.preventable].sum(axis=0)
+        scores = preventable_counts / np.maximum(counts, 1) * 100
+
+        results = []
+        for fired_row, severity_row, score in zip(
+            fired.T.tolist(), zip(*severities), scores.tolist()
+        ):
+            reasons = [
+                {
+                    'category': rule['category'],
+                    'reason': rule['reason'],
+                    'severity': severity,
+                    'impact': rule['impact'],
+                    'preventable': rule['preventable']
+                }
+                for rule, hit, severity in zip(self.rules, fired_row, severity_row)
+                if hit
+            ]
+            results.append({
+                'total_reasons': len(reasons),
+                'reasons': reasons,
+                'preventability_score': score
+            })
+        return results
+
+
+class RetentionStrategyEngine:
+    """Retention-strategy rule table compiled for batch evaluation"""
+
+    # Strategies returned per employee
+    MAX_STRATEGIES = 5
+
+    def __init__(self, rules=RETENTION_STRATEGY_RULES, defaults=RETENTION_FIELD_DEFAULTS):
+        # Reported by priority, then high impact first; stable for ties
+        self.rules = sorted(
+            rules, key=lambda r: (r['priority'], r['impact'] == 'high'), reverse=True
+        )
+        self.fields = rule_fields(self.rules)
+        self.defaults = defaults
+        self.high_impact = np.array([r['impact'] == 'high' for r in self.rules], dtype=bool)
+        self.strategies = [
+            {k: v for k, v in rule.items() if k != 'when'}
+            for rule in self.rules
+        ]
+
+    def evaluate(self, records):
+        """Strategies and estimated effectiveness for a list of employee dicts"""
+        columns = records_to_columns(records, self.fields, self.defaults)
+        n_rows = len(records)
+        fired = np.vstack([evaluate_condition(r['when'], columns, n_rows) for r in self.rules])
+
+        counts = fired.sum(axis=0)
+        high_counts = fired[self.high_impact].sum(axis=0)
+        effectiveness = np.minimum(high_counts * 25 + counts * 10, 95)
+
+        results = []
+        for fired_row, count, score in zip(fired.T.tolist(), counts.tolist(), effectiveness.tolist()):
+            strategies = [dict(strategy) for strategy, hit in zip(self.strategies, fired_row) if hit]
+            results.append({
+                'strategies': strategies[:self.MAX_STRATEGIES],
+                'estimated_effectiveness': score,
+                'total_strategies': count
+            })
+        return results
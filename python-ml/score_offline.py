@@ -0,0 +1,371 @@
+"""
+Score a large employee CSV or Parquet file offline, sharded across a process pool
+
+Every worker loads the model once and memory-maps its compiled forest, so the
+node arrays are shared read-only between processes. Each shard is written to
+its own part file as soon as it is scored and recorded in a checkpoint; an
+interrupted run picks up where it stopped when started again with the same
+arguments. The parts are concatenated into the output at the end.
+"""
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import shutil
+import signal
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from attrition_model import AttritionPredictor
+from data_ingestion import column_plan, read_header
+from model_registry import ModelRegistry, file_fingerprint
+
+# Rows per shard; a worker reads, scores and writes one shard at a time
+DEFAULT_SHARD_SIZE = 50000
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Model loaded by each worker process in _init_worker
+_predictor = None
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet input and output require pyarrow (pip install pyarrow)')
+    return pq
+
+
+def input_columns(input_path):
+    """Column names of a CSV or Parquet input"""
+    if input_path.endswith('.parquet'):
+        return _parquet().ParquetFile(input_path).schema_arrow.names
+    return read_header(input_path)
+
+
+def plan_csv_shards(csv_path, shard_size, block_size=1 << 23):
+    """Split a CSV into byte ranges of shard_size data rows, found by scanning for line breaks
+
+    Records must not contain quoted line breaks, which holds for HR exports
+    and the files written by convert_data.py.
+    """
+    bounds = []
+    with open(csv_path, 'rb') as f:
+        pos = len(f.readline())
+        bounds.append(pos)
+        rows = 0
+        for block in iter(lambda: f.read(block_size), b''):
+            # Offset just past every line break in the block
+            line_ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + pos + 1
+            # A shard ends after every shard_size-th row
+            first = (shard_size - 1 - rows) % shard_size
+            bounds.extend(line_ends[first::shard_size].tolist())
+            rows += len(line_ends)
+            pos += len(block)
+    if bounds[-1] < pos or len(bounds) == 1:
+        # Last line without a trailing line break, or an empty shard for a header-only
+        # file so the output still gets its header
+        bounds.append(pos)
+
+    return [
+        {'index': i, 'first_row': i * shard_size, 'byte_range': [start, stop]}
+        for i, (start, stop) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def plan_parquet_shards(parquet_path, shard_size):
+    """Group consecutive row groups into shards of at least shard_size rows (the last may be smaller)"""
+    metadata = _parquet().ParquetFile(parquet_path).metadata
+    shards, groups, rows, first_row = [], [], 0, 0
+    for group in range(metadata.num_row_groups):
+        groups.append(group)
+        rows += metadata.row_group(group).num_rows
+        if rows >= shard_size or group == metadata.num_row_groups - 1:
+            shards.append({'index': len(shards), 'first_row': first_row, 'row_groups': groups})
+            first_row += rows
+            groups, rows = [], 0
+    if not shards:
+        # No row groups: one empty shard, so the output still gets its schema
+        shards.append({'index': 0, 'first_row': 0, 'row_groups': []})
+    return shards
+
+
+def _read_shard(input_path, shard, columns):
+    """One shard as a DataFrame of training-named columns"""
+    header = input_columns(input_path)
+    usecols, _, rename = column_plan(header, columns)
+    if 'row_groups' in shard:
+        table = _parquet().ParquetFile(input_path).read_row_groups(shard['row_groups'], columns=usecols)
+        return table.to_pandas().rename(columns=rename)
+
+    start, stop = shard['byte_range']
+    if start == stop:
+        return pd.DataFrame(columns=usecols).rename(columns=rename)
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    # No declared dtypes: scoring rows may have blanks, which the encoder treats as unknown
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=usecols)
+    return df.rename(columns=rename)
+
+
+def _init_worker(model_dir):
+    global _predictor
+    # Ctrl+C is handled by the parent, which lets running shards finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _predictor = AttritionPredictor(cache_size=0)
+    _predictor.load_model(model_dir)
+
+
+def _score_shard(input_path, shard, part_path, output_format, id_columns, top_k, explain):
+    """Score one shard into its part file; returns (shard index, rows, seconds)"""
+    start = time.perf_counter()
+    df = _read_shard(input_path, shard, AttritionPredictor.FEATURE_COLUMNS + list(id_columns))
+    n_rows = len(df)
+    result = _predictor.predict_columns(
+        {col: df[col].to_numpy() for col in df.columns if col in AttritionPredictor.FEATURE_COLUMNS},
+        n_rows, top_k, explain
+    )
+
+    out = pd.DataFrame({'row': np.arange(shard['first_row'], shard['first_row'] + n_rows)})
+    for col in id_columns:
+        out[col] = df[col].to_numpy()
+    out['prediction'] = result['prediction']
+    out['probability'] = result['probability']
+    out['risk_score'] = result['risk_score']
+    out['risk_level'] = result['risk_level']
+    names = np.asarray(result['factor_names'], dtype=object)
+    top_idx, top_contrib = result['top_factor_index'], result['top_factor_contribution']
+    for j in range(top_idx.shape[1]):
+        out[f'factor_{j + 1}'] = names[top_idx[:, j]]
+        out[f'factor_{j + 1}_contribution'] = top_contrib[:, j]
+
+    # Written under a temporary name, so a part file on disk is always complete
+    tmp = f'{part_path}.{uuid.uuid4().hex[:8]}.tmp'
+    if output_format == 'parquet':
+        out.to_parquet(tmp, index=False)
+    else:
+        out.to_csv(tmp, index=False)
+    os.replace(tmp, part_path)
+    return shard['index'], n_rows, time.perf_counter() - start
+
+
+def _write_checkpoint(path, checkpoint):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def merge_parts(part_paths, output_path, output_format):
+    """Concatenate part files, in order, into the output"""
+    tmp = f'{output_path}.tmp'
+    if output_format == 'parquet':
+        pq = _parquet()
+        writer = None
+        try:
+            for path in part_paths:
+                table = pq.read_table(path)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                else:
+                    # Column types can differ between shards, e.g. an id column with blanks in one
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(tmp, 'wb') as out:
+            for i, path in enumerate(part_paths):
+                with open(path, 'rb') as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+    os.replace(tmp, output_path)
+
+
+def score_file(input_path, output_path, model_dir, output_format=None, shard_size=DEFAULT_SHARD_SIZE,
+               n_workers=None, id_columns=(), top_k=3, explain='importance', restart=False,
+               keep_parts=False):
+    """Score every row of input_path into output_path with a pool of n_workers processes
+
+    Parts and the checkpoint live in <output_path>.parts/ until the output is
+    complete. A checkpoint from a run with other settings, input contents or
+    model version is an error unless restart is set. Returns a summary dict.
+    """
+    if explain not in AttritionPredictor.EXPLAIN_MODES:
+        raise ValueError(f'Unknown explain mode: {explain}')
+    output_format = output_format or ('parquet' if output_path.endswith('.parquet') else 'csv')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
+    if output_format == 'parquet':
+        _parquet()
+
+    id_columns = list(id_columns)
+    header = input_columns(input_path)
+    missing = [col for col in id_columns if col not in header]
+    if missing:
+        raise ValueError(f"Id columns not in the input: {', '.join(missing)}")
+
+    with open(os.path.join(model_dir, 'model_info.json'), 'r') as f:
+        model_version = json.load(f).get('model_version')
+
+    settings = {
+        'input': os.path.abspath(input_path),
+        'input_sha256': file_fingerprint(input_path),
+        'model_version': model_version,
+        'output_format': output_format,
+        'shard_size': shard_size,
+        'id_columns': id_columns,
+        'top_k': top_k,
+        'explain': explain
+    }
+
+    parts_dir = f'{output_path}.parts'
+    checkpoint_path = os.path.join(parts_dir, 'checkpoint.json')
+    checkpoint = None
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        if restart:
+            shutil.rmtree(parts_dir)
+            checkpoint = None
+        elif checkpoint['settings'] != settings:
+            raise ValueError(
+                f'{checkpoint_path} belongs to a run with other settings, input or model; '
+                'use --restart to discard it'
+            )
+    if checkpoint is None:
+        os.makedirs(parts_dir, exist_ok=True)
+        plan = (plan_parquet_shards if input_path.endswith('.parquet') else plan_csv_shards)(
+            input_path, shard_size
+        )
+        checkpoint = {'settings': settings, 'shards': plan, 'completed': {}}
+        _write_checkpoint(checkpoint_path, checkpoint)
+
+    shards = checkpoint['shards']
+    completed = checkpoint['completed']
+
+    def part_path(index):
+        return os.path.join(parts_dir, f'part-{index:05d}.{output_format}')
+
+    pending = [
+        s for s in shards
+        if str(s['index']) not in completed or not os.path.exists(part_path(s['index']))
+    ]
+    print(f"{len(shards)} shards of up to {shard_size} rows, {len(shards) - len(pending)} already done")
+
+    start = time.perf_counter()
+    scored_rows = 0
+    if pending:
+        context = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(model_dir,)) as pool:
+            futures = [
+                pool.submit(_score_shard, input_path, s, part_path(s['index']), output_format,
+                            id_columns, top_k, explain)
+                for s in pending
+            ]
+            try:
+                for future in as_completed(futures):
+                    index, n_rows, seconds = future.result()
+                    completed[str(index)] = n_rows
+                    _write_checkpoint(checkpoint_path, checkpoint)
+                    scored_rows += n_rows
+                    elapsed = time.perf_counter() - start
+                    print(f"  Shard {index + 1}/{len(shards)}: {n_rows} rows in {seconds:.2f}s "
+                          f"({len(completed)}/{len(shards)} done, {scored_rows / elapsed:.0f} rows/s)")
+            except BaseException:
+                # Ctrl+C or a failed shard: drop queued shards, wait for running ones and
+                # checkpoint what finished, so a rerun only scores the rest
+                pool.shutdown(wait=True, cancel_futures=True)
+                for future in futures:
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        index, n_rows, _ = future.result()
+                        completed[str(index)] = n_rows
+                _write_checkpoint(checkpoint_path, checkpoint)
+                raise
+
+    merge_parts([part_path(s['index']) for s in shards], output_path, output_format)
+    if not keep_parts:
+        shutil.rmtree(parts_dir)
+
+    seconds = time.perf_counter() - start
+    return {
+        'output': output_path,
+        'rows': int(sum(completed.values())),
+        'shards': len(shards),
+        'resumed_shards': len(shards) - len(pending),
+        'model_version': model_version,
+        'seconds': seconds,
+        'rows_per_sec': scored_rows / seconds if seconds > 0 else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score an employee CSV or Parquet file offline')
+    parser.add_argument('--input', required=True, help='CSV (camelCase or raw IBM headers) or .parquet file')
+    parser.add_argument('--output', required=True, help='CSV or .parquet output')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help='Output format (default: from extension)')
+    parser.add_argument('--model-dir', default=None,
+                        help="Model version directory (default: the registry's promoted version)")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Rows per shard')
+    parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count)')
+    parser.add_argument('--id-columns', nargs='+', default=[],
+                        help='Input columns copied to the output, e.g. EmployeeNumber')
+    parser.add_argument('--top-k', type=int, default=3, help='Top factors written per row')
+    parser.add_argument('--explain', choices=AttritionPredictor.EXPLAIN_MODES, default='importance')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint of an earlier run')
+    parser.add_argument('--keep-parts', action='store_true', help='Keep the per-shard part files')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: Input file not found at {args.input}")
+        sys.exit(1)
+    model_dir = args.model_dir or ModelRegistry('models').current_path()
+    if model_dir is None:
+        print("Error: No trained model found. Please train the model first.")
+        sys.exit(1)
+
+    print("="*60)
+    print("HR Attrition Offline Scoring")
+    print("="*60)
+    print(f"Input: {args.input}")
+    print(f"Model: {model_dir}")
+    print()
+
+    try:
+        summary = score_file(
+            args.input, args.output, model_dir, output_format=args.format,
+            shard_size=args.shard_size, n_workers=args.workers, id_columns=args.id_columns,
+            top_k=args.top_k, explain=args.explain, restart=args.restart, keep_parts=args.keep_parts
+        )
+    except KeyboardInterrupt:
+        print("\nInterrupted. Completed shards are checkpointed; run the same command again to resume.")
+        sys.exit(130)
+    except Exception as e:
+        print(f"\nError during scoring: {str(e)}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("Scoring completed successfully!")
+    print(f"{'='*60}")
+    print(f"Output file: {summary['output']}")
+    print(f"Rows scored: {summary['rows']} in {summary['shards']} shards "
+          f"({summary['resumed_shards']} resumed)")
+    print(f"Model version: {summary['model_version']}")
+    print(f"Time: {summary['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Incremental NDJSON/CSV parsing for streamed batch scoring
+"""
+import csv
+import json
+
+from starlette.responses import StreamingResponse
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """Streaming response that leaves the request body to the handler
+
+    StreamingResponse normally listens for client disconnects on `receive`,
+    which would consume the upload we are still reading chunk by chunk.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class MalformedRecord:
+    """Placeholder for an input row that could not be parsed"""
+
+    def __init__(self, error):
+        self.error = str(error)
+
+
+async def iter_lines(byte_stream):
+    """Yield decoded text lines from an async stream of byte chunks"""
+    buffer = b''
+    first = True
+    async for chunk in byte_stream:
+        if not chunk:
+            continue
+        buffer += chunk
+        if first and len(buffer) >= 3:
+            # Spreadsheet exports often start with a UTF-8 BOM
+            if buffer.startswith(b'\xef\xbb\xbf'):
+                buffer = buffer[3:]
+            first = False
+
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line.rstrip(b'\r').decode('utf-8')
+
+    if first and buffer.startswith(b'\xef\xbb\xbf'):
+        buffer = buffer[3:]
+    if buffer.strip():
+        yield buffer.rstrip(b'\r').decode('utf-8')
+
+
+async def iter_ndjson_records(lines):
+    """Yield one dict per non-empty NDJSON line"""
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield MalformedRecord(f'Invalid JSON: {e}')
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            yield MalformedRecord('Each line must be a JSON object')
+
+
+async def iter_csv_records(lines):
+    """Yield one dict per CSV row, using the first row as the header"""
+    header = None
+    pending = ''
+    async for line in lines:
+        # A quoted field may span several physical lines
+        pending = f'{pending}\n{line}' if pending else line
+        if pending.count('"') % 2:
+            continue
+
+        row = next(csv.reader([pending]), [])
+        pending = ''
+        if not row or not any(field.strip() for field in row):
+            continue
+
+        if header is None:
+            header = [field.strip() for field in row]
+            continue
+
+        yield {
+            col: (value if value != '' else None)
+            for col, value in zip(header, row)
+        }
+
+
+def iter_records(byte_stream, fmt):
+    """Parse an uploaded body as 'ndjson' or 'csv' records"""
+    lines = iter_lines(byte_stream)
+    if fmt == 'csv':
+        return iter_csv_records(lines)
+    return iter_ndjson_records(lines)
+
+
+async def iter_chunks(records, max_size=1000, first_size=64):
+    """Group records into lists, starting small so the first results return quickly"""
+    size = min(first_size, max_size)
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+            size = min(size * 2, max_size)
+    if chunk:
+        yield chunk
@@ -0,0 +1,147 @@
+"""
+Generate synthetic employee records matching the training data schema
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Column order written by convert_data.py
+COLUMNS = [
+    'age', 'attrition', 'businessTravel', 'department',
+    'distanceFromHome', 'education', 'educationField',
+    'environmentSatisfaction', 'gender', 'jobInvolvement',
+    'jobLevel', 'jobRole', 'jobSatisfaction', 'maritalStatus',
+    'monthlyIncome', 'numCompaniesWorked', 'overTime',
+    'performanceRating', 'relationshipSatisfaction',
+    'stockOptionLevel', 'trainingTimesLastYear', 'workLifeBalance',
+    'yearsAtCompany', 'yearsInCurrentRole', 'yearsSinceLastPromotion',
+    'yearsWithCurrManager'
+]
+
+# Category frequencies of the IBM HR attrition dataset
+CATEGORIES = {
+    'businessTravel': {'Travel_Rarely': 0.71, 'Travel_Frequently': 0.188, 'Non-Travel': 0.102},
+    'department': {'Research & Development': 0.654, 'Sales': 0.303, 'Human Resources': 0.043},
+    'educationField': {
+        'Life Sciences': 0.412, 'Medical': 0.316, 'Marketing': 0.108,
+        'Technical Degree': 0.09, 'Other': 0.056, 'Human Resources': 0.018
+    },
+    'gender': {'Male': 0.6, 'Female': 0.4},
+    'maritalStatus': {'Married': 0.458, 'Single': 0.32, 'Divorced': 0.222},
+    'overTime': {'No': 0.717, 'Yes': 0.283}
+}
+
+# Job roles available in each department
+DEPARTMENT_ROLES = {
+    'Research & Development': {
+        'Research Scientist': 0.30, 'Laboratory Technician': 0.27, 'Manufacturing Director': 0.15,
+        'Healthcare Representative': 0.14, 'Research Director': 0.08, 'Manager': 0.06
+    },
+    'Sales': {'Sales Executive': 0.73, 'Sales Representative': 0.19, 'Manager': 0.08},
+    'Human Resources': {'Human Resources': 0.82, 'Manager': 0.18}
+}
+
+
+def _choice(rng, frequencies, size):
+    values = list(frequencies)
+    p = np.array([frequencies[v] for v in values], dtype=np.float64)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def _ordinal(rng, low, high, size, p=None):
+    return rng.choice(np.arange(low, high + 1), size=size, p=p)
+
+
+def generate_employees(n_rows, seed=42):
+    """Return a DataFrame of n_rows synthetic employees, attrition included"""
+    rng = np.random.default_rng(seed)
+    n = n_rows
+
+    age = np.clip(np.round(rng.normal(37, 9, n)), 18, 60).astype(np.int64)
+    department = _choice(rng, CATEGORIES['department'], n)
+    job_role = np.empty(n, dtype=object)
+    for dept, roles in DEPARTMENT_ROLES.items():
+        mask = department == dept
+        job_role[mask] = _choice(rng, roles, int(mask.sum()))
+
+    job_level = _ordinal(rng, 1, 5, n, p=[0.37, 0.36, 0.15, 0.07, 0.05])
+    job_level[job_role == 'Manager'] = np.maximum(job_level[job_role == 'Manager'], 4)
+    monthly_income = np.clip(
+        np.round(job_level * 3600 + rng.normal(-2200, 1300, n)), 1009, 19999
+    ).astype(np.int64)
+
+    total_years = np.clip(np.round((age - 18) * rng.uniform(0.2, 0.9, n)), 0, 40)
+    years_at_company = np.round(total_years * rng.uniform(0.2, 1.0, n)).astype(np.int64)
+    years_in_role = np.round(years_at_company * rng.uniform(0.3, 1.0, n)).astype(np.int64)
+    years_since_promotion = np.round(years_at_company * rng.beta(1.2, 3.0, n)).astype(np.int64)
+    years_with_manager = np.round(years_at_company * rng.uniform(0.3, 1.0, n)).astype(np.int64)
+
+    df = pd.DataFrame({
+        'age': age,
+        'businessTravel': _choice(rng, CATEGORIES['businessTravel'], n),
+        'department': department,
+        'distanceFromHome': np.clip(np.round(rng.gamma(1.3, 7, n)), 1, 29).astype(np.int64),
+        'education': _ordinal(rng, 1, 5, n, p=[0.12, 0.19, 0.39, 0.27, 0.03]),
+        'educationField': _choice(rng, CATEGORIES['educationField'], n),
+        'environmentSatisfaction': _ordinal(rng, 1, 4, n),
+        'gender': _choice(rng, CATEGORIES['gender'], n),
+        'jobInvolvement': _ordinal(rng, 1, 4, n, p=[0.06, 0.26, 0.59, 0.09]),
+        'jobLevel': job_level,
+        'jobRole': job_role,
+        'jobSatisfaction': _ordinal(rng, 1, 4, n),
+        'maritalStatus': _choice(rng, CATEGORIES['maritalStatus'], n),
+        'monthlyIncome': monthly_income,
+        'numCompaniesWorked': _ordinal(rng, 0, 9, n),
+        'overTime': _choice(rng, CATEGORIES['overTime'], n),
+        'performanceRating': _ordinal(rng, 3, 4, n, p=[0.85, 0.15]),
+        'relationshipSatisfaction': _ordinal(rng, 1, 4, n),
+        'stockOptionLevel': _ordinal(rng, 0, 3, n, p=[0.43, 0.41, 0.11, 0.05]),
+        'trainingTimesLastYear': _ordinal(rng, 0, 6, n, p=[0.04, 0.05, 0.37, 0.33, 0.08, 0.08, 0.05]),
+        'workLifeBalance': _ordinal(rng, 1, 4, n, p=[0.05, 0.23, 0.61, 0.11]),
+        'yearsAtCompany': years_at_company,
+        'yearsInCurrentRole': years_in_role,
+        'yearsSinceLastPromotion': years_since_promotion,
+        'yearsWithCurrManager': years_with_manager
+    })
+
+    # Attrition follows the known drivers, calibrated to roughly the real 16% rate
+    logit = (
+        -2.4
+        + 1.3 * (df['overTime'] == 'Yes')
+        + 0.8 * (df['maritalStatus'] == 'Single')
+        + 0.5 * (df['businessTravel'] == 'Travel_Frequently')
+        - 0.35 * (df['jobSatisfaction'] - 2.5)
+        - 0.3 * (df['environmentSatisfaction'] - 2.5)
+        - 0.3 * (df['workLifeBalance'] - 2.5)
+        - 0.6 * df['stockOptionLevel'].clip(upper=1)
+        - 0.00012 * (df['monthlyIncome'] - 6500)
+        - 0.04 * (df['age'] - 37)
+        + 0.03 * (df['distanceFromHome'] - 9)
+    )
+    leave = rng.random(n) < 1 / (1 + np.exp(-logit.to_numpy(dtype=np.float64)))
+    df['attrition'] = np.where(leave, 'Yes', 'No')
+
+    return df[COLUMNS]
+
+
+def generate_records(n_rows, seed=42):
+    """Return n_rows synthetic employees as API-style dicts without attrition"""
+    return generate_employees(n_rows, seed).drop(columns='attrition').to_dict('records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic employee data')
+    parser.add_argument('--rows', type=int, default=1470, help='Number of employees')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='../data/synthetic_employee_data.csv')
+    args = parser.parse_args()
+
+    df = generate_employees(args.rows, args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df)} synthetic employees to {args.output}")
+    print(f"Attrition rate: {(df['attrition'] == 'Yes').mean():.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,8 @@
 Test the trained ML model with sample predictions
 """
 from attrition_model import AttritionPredictor
+from model_registry import ModelRegistry
+from tree_shap import TreeShapExplainer
 import json
 
 def main():
@@ -12,7 +14,7 @@ def main():
     
     # Load trained model
     predictor = AttritionPredictor()
-    predictor.load_model('models')
+    predictor.load_model(ModelRegistry('models').current_path())
     
     print("Model loaded successfully!\n")
     
@@ -120,7 +122,45 @@ def main():
         print(f"  Prediction: {result['prediction']}")
         print(f"  Risk Score: {result['risk_score']:.2f}%")
         print(f"  Risk Level: {result['risk_level'].upper()}")
-    
+
+    # Test Case 4: Compiled engine parity (encoder parity is covered by tests/test_feature_encoder.py)
+    print(f"\n{'='*60}")
+    print("Test Case 4: Compiled Engine Parity")
+    print("-" * 40)
+
+    X_scaled = predictor.encoder.transform(employees)
+    if predictor.engine is None:
+        print("Compiled engine not available for this model type, skipping")
+    else:
+        parity = predictor.engine.check_parity(predictor.model, X_scaled)
+        print(f"Rows compared: {parity['rows']}")
+        print(f"Max probability difference: {parity['max_abs_diff']:.2e}")
+        print(f"Labels match: {parity['labels_match']}")
+        if not parity['passed']:
+            raise AssertionError("Compiled engine does not match the sklearn model")
+
+    # Test Case 5: SHAP explanations
+    print(f"\n{'='*60}")
+    print("Test Case 5: SHAP Explanations")
+    print("-" * 40)
+
+    if not TreeShapExplainer.supports(predictor.model):
+        print("SHAP explanations not available for this model type, skipping")
+    else:
+        explainer = predictor._shap_explainer()
+        shap_values = explainer.shap_values(X_scaled)
+        additivity = float(abs(
+            shap_values.sum(axis=1) + explainer.expected_value - predictor.model.predict_proba(X_scaled)[:, 1]
+        ).max())
+        print(f"Paths: {explainer.n_paths}, base value: {explainer.expected_value:.4f}")
+        print(f"Max additivity error: {additivity:.2e}")
+        if additivity > 1e-9:
+            raise AssertionError("SHAP values do not sum to the predicted probability")
+
+        result = predictor.predict(employees[0], top_k=3, explain='shap')
+        for factor in result['top_factors']:
+            print(f"  - {factor['factor']}: {factor['contribution']:+.4f}")
+
     print(f"\n{'='*60}")
     print("Testing completed successfully!")
     print("="*60)
@@ -0,0 +1,37 @@
+"""
+Shared fixtures: a synthetic training CSV and a small trained model
+"""
+import pytest
+
+from attrition_model import AttritionPredictor
+from synthetic_data import generate_employees, generate_records
+
+
+@pytest.fixture(scope='session')
+def employee_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp('data') / 'employees.csv'
+    generate_employees(1500, seed=7).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def saved_model_dir(employee_csv, tmp_path_factory):
+    """A 30-tree forest trained on employee_csv and saved uncompacted"""
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train(employee_csv, model_params={'n_estimators': 30})
+    path = str(tmp_path_factory.mktemp('model'))
+    predictor.save_model(path, compact=False)
+    return path
+
+
+@pytest.fixture
+def predictor(saved_model_dir):
+    """A fresh predictor loaded from saved_model_dir, safe to modify"""
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.load_model(saved_model_dir, mmap=False)
+    return predictor
+
+
+@pytest.fixture(scope='session')
+def records():
+    return generate_records(200, seed=11)
@@ -0,0 +1,105 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from batch_formats import ARROW_STREAM_TYPE, dumps, loads, parse_batch_body
+from data_ingestion import IBM_COLUMN_MAP
+
+
+@pytest.fixture
+def client(predictor, monkeypatch):
+    monkeypatch.setattr(api_server, 'predictor', predictor)
+    return TestClient(api_server.app)
+
+
+def _probabilities(response):
+    assert response.status_code == 200, response.text
+    data = response.json()['data']
+    if isinstance(data, dict):
+        return data['probability']
+    return [row['probability'] for row in data]
+
+
+def _csv(records, header_map=None, bom=False):
+    df = pd.DataFrame(records)
+    if header_map:
+        df = df.rename(columns=header_map)
+    return (b'\xef\xbb\xbf' if bom else b'') + df.to_csv(index=False).encode('utf-8')
+
+
+def test_every_body_format_scores_the_same(client, records):
+    employees = records[:25]
+    expected = _probabilities(client.post('/predict/batch', json={'employees': employees}))
+
+    columns = pd.DataFrame(employees).to_dict('list')
+    assert np.allclose(_probabilities(client.post('/predict/batch', json={'columns': columns})), expected)
+
+    ibm = {v: k for k, v in IBM_COLUMN_MAP.items()}
+    for body in (_csv(employees), _csv(employees, ibm, bom=True)):
+        response = client.post('/predict/batch', content=body, headers={'Content-Type': 'text/csv'})
+        assert np.allclose(_probabilities(response), expected)
+
+
+def test_columnar_response_matches_rows(client, records):
+    employees = records[:10]
+    rows = client.post('/predict/batch', json={'employees': employees}).json()['data']
+    data = client.post('/predict/batch?response_format=columnar', json={'employees': employees}).json()['data']
+
+    assert np.allclose(data['probability'], [r['probability'] for r in rows])
+    assert data['risk_level'] == [r['risk_level'] for r in rows]
+    assert data['prediction'] == [r['prediction'] for r in rows]
+    names = data['factor_names']
+    assert len(data['top_factor_index']) == 10
+    assert [names[i] for i in data['top_factor_index'][0]] == [f['factor'] for f in rows[0]['top_factors']]
+    assert np.allclose(data['top_factor_contribution'][0], [f['contribution'] for f in rows[0]['top_factors']])
+
+
+def test_csv_blank_cells_score(client, records):
+    body = _csv(records[:3]).replace(b',Sales,', b',,', 1)
+    assert len(_probabilities(client.post('/predict/batch', content=body,
+                                          headers={'Content-Type': 'text/csv'}))) == 3
+
+
+@pytest.mark.parametrize('body, content_type, status', [
+    (b'{"columns": {"age": [30, 40], "department": ["Sales"]}}', 'application/json', 400),
+    (b'{"employees": [1, 2]}', 'application/json', 400),
+    (b'not json', 'application/json', 400),
+    (b'{"employees": []}', 'application/json', 400),
+    (b'<xml/>', 'application/xml', 415),
+])
+def test_malformed_bodies(client, body, content_type, status):
+    response = client.post('/predict/batch', content=body, headers={'Content-Type': content_type})
+    assert response.status_code == status
+
+
+def test_parse_keeps_only_feature_columns():
+    kind, columns, n_rows = parse_batch_body(
+        b'age,EmployeeNumber,Department\n30,1,Sales\n41,2,\n', 'text/csv; charset=utf-8', ['age', 'department']
+    )
+    assert kind == 'columns' and n_rows == 2 and set(columns) == {'age', 'department'}
+    assert columns['age'].tolist() == [30, 41]
+
+
+def test_dumps_numpy_and_nan():
+    payload = {'a': np.arange(3), 'b': np.float32(0.5), 'c': float('nan'), 'd': np.array([[1.5]])}
+    assert loads(dumps(payload)) == {'a': [0, 1, 2], 'b': 0.5, 'c': None, 'd': [[1.5]]}
+
+
+def test_arrow_round_trip(client, records):
+    pa = pytest.importorskip('pyarrow')
+    employees = records[:10]
+    expected = _probabilities(client.post('/predict/batch', json={'employees': employees}))
+
+    table = pa.Table.from_pandas(pd.DataFrame(employees))
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post('/predict/batch?response_format=arrow', content=sink.getvalue(),
+                           headers={'Content-Type': ARROW_STREAM_TYPE})
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert np.allclose(result.column('probability').to_pylist(), expected)
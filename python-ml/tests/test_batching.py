@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _submit_all(batcher, records):
+    await batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(r) for r in records), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_submits_share_a_model_call():
+    calls = []
+
+    def predict(records):
+        calls.append(len(records))
+        return [r * 2 for r in records]
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_delay_ms=50)
+    results = _run(_submit_all(batcher, list(range(10))))
+
+    assert results == [r * 2 for r in range(10)]
+    assert calls == [4, 4, 2]
+    stats = batcher.stats()
+    assert stats['batches'] == 3 and stats['requests'] == 10
+    assert stats['largest_batch'] == 4 and stats['failures'] == 0
+    assert stats['batch_size_histogram']['4'] == 2 and stats['batch_size_histogram']['2'] == 1
+
+
+def test_failed_batch_is_retried_record_by_record():
+    calls = []
+
+    def predict(records):
+        calls.append(list(records))
+        if 'bad' in records:
+            raise ValueError('bad record')
+        return [r.upper() for r in records]
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_delay_ms=50)
+    results = _run(_submit_all(batcher, ['a', 'bad', 'c']))
+
+    assert results[0] == 'A' and results[2] == 'C'
+    assert isinstance(results[1], ValueError)
+    assert calls == [['a', 'bad', 'c'], ['a'], ['bad'], ['c']]
+    assert batcher.stats()['failures'] == 1
+
+
+def test_submit_requires_running_batcher():
+    batcher = MicroBatcher(lambda records: records)
+    with pytest.raises(RuntimeError):
+        _run(batcher.submit(1))
@@ -0,0 +1,80 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from attrition_model import AttritionPredictor
+
+PARAMS = {'n_estimators': 30}
+
+
+def _fits(output):
+    """Training rows covered after each sub-forest fit, from the progress lines"""
+    return [int(m) for m in re.findall(r'^  (\d+)/\d+ rows, \d+ trees$', output, re.M)]
+
+
+def _sorted_csv(employee_csv, path, leavers_first):
+    df = pd.read_csv(employee_csv)
+    df = df.sort_values('attrition', ascending=not leavers_first, kind='stable')
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_streamed_scaler_matches_full_pass(employee_csv):
+    chunked = AttritionPredictor(cache_size=0)
+    results = chunked.train_chunked(employee_csv, chunk_size=400, model_params=PARAMS)
+
+    # Full-pass reference over the same training rows, label codes from the same classes
+    frames = []
+    for chunk, _, test_mask in chunked._iter_csv_chunks(employee_csv, 400, 0.2, 42):
+        frames.append(chunk[~test_mask])
+    train = pd.concat(frames)
+    X = np.column_stack([
+        np.searchsorted(chunked.label_encoders[col].classes_, train[col].astype(str))
+        if col in chunked.label_encoders else train[col].to_numpy(dtype=np.float64)
+        for col in chunked.feature_names
+    ])
+    reference = StandardScaler().fit(X)
+    np.testing.assert_allclose(chunked.scaler.mean_, reference.mean_, rtol=1e-9)
+    np.testing.assert_allclose(chunked.scaler.var_, reference.var_, rtol=1e-6)
+
+    full = AttritionPredictor(cache_size=0)
+    full_results = full.train(employee_csv, model_params=PARAMS)
+    assert abs(results['accuracy'] - full_results['accuracy']) < 0.05
+    assert len(chunked.model.estimators_) == pytest.approx(PARAMS['n_estimators'], abs=4)
+
+
+def test_single_class_chunks_wait_for_the_other_class(employee_csv, tmp_path, capsys):
+    # Stayers first: the leading chunks have no leavers and join the first chunk that does
+    csv_path = _sorted_csv(employee_csv, tmp_path / 'stayers_first.csv', leavers_first=False)
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train_chunked(csv_path, chunk_size=300, model_params=PARAMS)
+
+    fits = _fits(capsys.readouterr().out)
+    assert fits[0] > 2 * 300 and len(fits) < 5
+    assert len(predictor.model.estimators_) == pytest.approx(PARAMS['n_estimators'], abs=4)
+
+
+def test_trailing_single_class_rows_are_skipped(employee_csv, tmp_path, capsys):
+    # Leavers first: the last chunks only hold stayers and cannot train a tree on their own
+    csv_path = _sorted_csv(employee_csv, tmp_path / 'leavers_first.csv', leavers_first=True)
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train_chunked(csv_path, chunk_size=300, model_params=PARAMS)
+
+    output = capsys.readouterr().out
+    assert 'trailing rows with a single class' in output
+    assert predictor.model.estimators_
+
+
+def test_small_tail_chunk_joins_the_chunk_before_it(employee_csv, capsys):
+    # 1500 rows in chunks of 700: the 100-row tail is under half a chunk
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train_chunked(employee_csv, chunk_size=700, model_params=PARAMS)
+
+    output = capsys.readouterr().out
+    n_train = int(re.search(r'Training with (\d+) of 1500 samples', output).group(1))
+    fits = _fits(output)
+    assert len(fits) == 2 and fits[-1] == n_train
+    assert fits[0] < 700
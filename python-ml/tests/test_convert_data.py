@@ -0,0 +1,73 @@
+import csv
+import io
+
+import pytest
+
+from convert_data import TsArrayReader, convert_ts_file
+
+SOURCE = r'''
+import { Employee } from '../types';
+// A [bracket] in a comment is not the array
+export const employees: Employee[] = [
+  { id: 1, age: 41, attrition: true, department: 'Sales', overTime: "Yes", monthlyIncome: 5993, },
+  {
+    id: 2, /* block comment, with a } brace */ age: 49,
+    "department": "Research & Development", 'jobRole': 'Research Scientist',
+    note: "says \"hi\"\tand é\x41", // trailing comment
+    score: -1.5e-3, rate: .5, big: 1E3, missing: null, skipped: undefined,
+    tags: ['a', "b,c", `multi
+line`], nested: { level: { deep: [1, 2, { x: '}' }] } }
+  },
+  { id: 3, age: 37, attrition: false, department: 'Sales', overTime: 'No', monthlyIncome: 2090 }
+];
+'''
+
+EXPECTED = [
+    {'id': 1, 'age': 41, 'attrition': True, 'department': 'Sales', 'overTime': 'Yes',
+     'monthlyIncome': 5993},
+    {'id': 2, 'age': 49, 'department': 'Research & Development', 'jobRole': 'Research Scientist',
+     'note': 'says "hi"\tand éA', 'score': -1.5e-3, 'rate': 0.5, 'big': 1000.0,
+     'missing': None, 'skipped': None, 'tags': ['a', 'b,c', 'multi\nline'],
+     'nested': {'level': {'deep': [1, 2, {'x': '}'}]}}},
+    {'id': 3, 'age': 37, 'attrition': False, 'department': 'Sales', 'overTime': 'No',
+     'monthlyIncome': 2090}
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 20])
+def test_records_survive_any_chunk_boundary(chunk_size):
+    reader = TsArrayReader(io.StringIO(SOURCE), chunk_size=chunk_size)
+    assert list(reader.records()) == EXPECTED
+
+
+def test_types_are_kept():
+    records = list(TsArrayReader(io.StringIO('[{a: 1, b: 1.0, c: "1", d: -0}]')).records())
+    assert [type(v) for v in records[0].values()] == [int, float, str, int]
+
+
+@pytest.mark.parametrize('source, message', [
+    ('const x = 1;', 'Could not find'),
+    ('[{ age: 41 }, { age: 42 }', 'Unterminated'),
+    ('[{ age: 41 }, 42]', 'Expected an object literal'),
+    ('[{ age: 41, dept: Sales }]', 'Unsupported value'),
+    ('[{ age 41 }]', 'Expected ":"'),
+])
+def test_malformed_input_raises(source, message):
+    with pytest.raises(ValueError, match=message):
+        list(TsArrayReader(io.StringIO(source), chunk_size=4).records())
+
+
+def test_convert_to_csv(tmp_path):
+    ts_file = tmp_path / 'attritionData.ts'
+    ts_file.write_text(SOURCE, encoding='utf-8')
+    output = tmp_path / 'employees.csv'
+
+    n_rows, counts = convert_ts_file(str(ts_file), str(output), batch_size=2)
+    assert n_rows == 3 and counts == {'Yes': 1, None: 1, 'No': 1}
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    # Columns come from the first batch in training order, without the id
+    assert list(rows[0]) == ['age', 'attrition', 'department', 'jobRole', 'monthlyIncome', 'overTime']
+    assert rows[0]['attrition'] == 'Yes' and rows[2]['attrition'] == 'No'
+    assert rows[1]['department'] == 'Research & Development' and rows[1]['attrition'] == ''
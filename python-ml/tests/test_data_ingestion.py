@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition_model import AttritionPredictor
+from data_ingestion import COLUMN_DTYPES, IBM_COLUMN_MAP, read_employee_csv
+from synthetic_data import generate_employees
+
+
+@pytest.fixture(scope='module')
+def blank_csv(tmp_path_factory):
+    """Synthetic employees with some numeric and categorical cells left blank"""
+    df = generate_employees(600, seed=3).astype(object)
+    df.loc[::7, 'monthlyIncome'] = None
+    df.loc[::11, 'jobSatisfaction'] = None
+    df.loc[::13, 'department'] = None
+    path = tmp_path_factory.mktemp('data') / 'blank.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_blank_numeric_cells_are_missing(blank_csv):
+    df = read_employee_csv(blank_csv)
+    assert str(df['monthlyIncome'].dtype) == 'Int32' and str(df['jobSatisfaction'].dtype) == 'Int8'
+    assert df['monthlyIncome'].isna().sum() == len(range(0, 600, 7))
+    assert df['department'].isna().sum() == len(range(0, 600, 13))
+
+
+def test_ibm_headers_are_renamed_and_pruned(employee_csv, tmp_path):
+    df = pd.read_csv(employee_csv)
+    ibm = {v: k for k, v in IBM_COLUMN_MAP.items()}
+    df = df.rename(columns=ibm)
+    df['EmployeeCount'] = 1
+    df['Over18'] = 'Y'
+    path = tmp_path / 'ibm.csv'
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        df.to_csv(f, index=False)
+
+    result = read_employee_csv(str(path))
+    assert set(result.columns) == set(COLUMN_DTYPES)
+    assert str(result['age'].dtype) == 'Int16' and str(result['department'].dtype) == 'category'
+    assert result['age'].tolist() == df['Age'].tolist()
+
+    subset = read_employee_csv(str(path), columns=['age', 'attrition'], nrows=10)
+    assert list(subset.columns) == ['age', 'attrition'] and len(subset) == 10
+
+
+def test_chunks_match_whole_file(blank_csv):
+    whole = read_employee_csv(blank_csv)
+    chunks = pd.concat(read_employee_csv(blank_csv, chunksize=128), ignore_index=True)
+    pd.testing.assert_frame_equal(
+        whole.astype({'department': object}), chunks.astype({'department': object}), check_categorical=False
+    )
+
+
+@pytest.mark.parametrize('family', ['random_forest', 'hist_gradient_boosting'])
+def test_training_with_blank_cells(blank_csv, family):
+    predictor = AttritionPredictor(cache_size=0)
+    results = predictor.train(blank_csv, model_family=family, model_params={'max_iter': 20}
+                              if family == 'hist_gradient_boosting' else {'n_estimators': 20})
+    assert 0.5 <= results['roc_auc'] <= 1
+
+    record = {'age': 30, 'department': 'Sales', 'overTime': 'Yes'}
+    X = predictor.encoder.transform(record)
+    income = predictor.feature_names.index('monthlyIncome')
+    if family == 'hist_gradient_boosting':
+        # Native models see missing values as NaN
+        assert np.isnan(X[0, income])
+    else:
+        assert X[0, income] == 0.0
+    assert 0 <= predictor.predict(record)['probability'] <= 1
+
+
+def test_chunked_training_with_blank_cells(blank_csv):
+    predictor = AttritionPredictor(cache_size=0)
+    results = predictor.train(blank_csv, chunk_size=200, model_params={'n_estimators': 20})
+    assert 0.5 <= results['roc_auc'] <= 1
+    assert np.isfinite(predictor.scaler.mean_).all()
+
+
+def test_encoder_matches_training_encoding(blank_csv):
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train(blank_csv, model_params={'n_estimators': 5})
+    X, _ = AttritionPredictor(cache_size=0).load_features(blank_csv)
+    expected = predictor.scaler.transform(X)
+    expected = np.where(np.isnan(expected), 0.0, expected)
+
+    df = read_employee_csv(blank_csv)
+    encoded = predictor.encoder.transform_columns({col: df[col].to_numpy() for col in df.columns}, len(df))
+    assert np.allclose(encoded, expected, atol=1e-5)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+import attrition_model
+from attrition_model import AttritionPredictor
+from feature_cache import FeatureCache
+
+
+@pytest.fixture
+def csv_copy(employee_csv, tmp_path):
+    path = tmp_path / 'employees.csv'
+    shutil.copy(employee_csv, path)
+    return str(path)
+
+
+def _no_csv_reads(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('CSV parsed despite a cache hit')
+    monkeypatch.setattr(attrition_model, 'read_employee_csv', fail)
+
+
+def test_hit_skips_parsing(csv_copy, tmp_path, monkeypatch):
+    cache = FeatureCache(str(tmp_path / 'cache'))
+    first = AttritionPredictor(cache_size=0)
+    X, y = first.load_features(csv_copy, 'scaled', cache)
+    assert len(os.listdir(cache.root)) == 1
+
+    _no_csv_reads(monkeypatch)
+    second = AttritionPredictor(cache_size=0)
+    X_cached, y_cached = second.load_features(csv_copy, 'scaled', cache)
+    assert isinstance(X_cached, np.memmap)
+    assert np.array_equal(X_cached, X) and np.array_equal(y_cached, y)
+    assert second.feature_names == first.feature_names
+    assert {col: list(le.classes_) for col, le in second.label_encoders.items()} == \
+        {col: list(le.classes_) for col, le in first.label_encoders.items()}
+
+
+def test_changed_data_or_schema_misses(csv_copy, tmp_path):
+    cache = FeatureCache(str(tmp_path / 'cache'))
+    schema = AttritionPredictor()._feature_schema('scaled')
+    key = cache.key(csv_copy, schema)
+    assert key == cache.key(csv_copy, dict(schema))
+    assert key != cache.key(csv_copy, AttritionPredictor()._feature_schema('native'))
+
+    AttritionPredictor(cache_size=0).load_features(csv_copy, 'scaled', cache)
+    assert cache.load(key) is not None
+    with open(csv_copy, 'a') as f:
+        f.write(open(csv_copy).readlines()[1])
+    assert cache.key(csv_copy, schema) != key
+    assert cache.load(cache.key(csv_copy, schema)) is None
+
+
+def test_incomplete_entry_is_a_miss(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    cache.save('k', np.ones((3, 2)), np.zeros(3), {'feature_names': []})
+    os.remove(tmp_path / 'k' / 'y.npy')
+    assert cache.load('k') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = FeatureCache(str(tmp_path), max_entries=2)
+    for key in ('a', 'b'):
+        cache.save(key, np.ones((2, 2)), np.zeros(2), {})
+        time.sleep(0.02)
+    assert cache.load('a') is not None
+    time.sleep(0.02)
+    cache.save('c', np.ones((2, 2)), np.zeros(2), {})
+    assert sorted(os.listdir(tmp_path)) == ['a', 'c']
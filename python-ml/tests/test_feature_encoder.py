@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from feature_encoder import FeatureEncoder
+
+
+def _pandas_path(predictor, records):
+    """The DataFrame, LabelEncoder and StandardScaler path the encoder replaced"""
+    df = predictor.preprocess_data(pd.DataFrame(records), is_training=False)
+    X, _ = predictor.prepare_features(df)
+    return predictor.scaler.transform(X.to_numpy(dtype=np.float64))
+
+
+def test_encoder_matches_pandas_path(predictor, records):
+    X_scaled = _pandas_path(predictor, records)
+    encoded = predictor.encoder.transform(records)
+    np.testing.assert_array_equal(encoded, X_scaled.astype(np.float32))
+
+    probabilities = [r['probability'] for r in predictor.predict(records)]
+    np.testing.assert_allclose(probabilities, predictor.model.predict_proba(X_scaled)[:, 1], atol=1e-12)
+
+
+def test_saved_tables_match_fitted_preprocessors(predictor, records):
+    compiled = FeatureEncoder.from_preprocessors(
+        predictor.feature_names, predictor.label_encoders, predictor.scaler
+    )
+    assert compiled.categories == predictor.encoder.categories
+    np.testing.assert_array_equal(compiled.transform(records), predictor.encoder.transform(records))
+
+
+def test_unseen_and_missing_values_use_unknown_value(predictor, records):
+    encoder = predictor.encoder
+    base = records[0]
+    variants = [
+        {**base, 'department': 'Astronautics'},
+        {**base, 'department': None},
+        {k: v for k, v in base.items() if k != 'department'},
+        {**base, 'age': None},
+        {**base, 'age': 'unknown'}
+    ]
+    expected = encoder.transform(base)[0]
+    encoded = encoder.transform(variants)
+
+    department, age = encoder.feature_names.index('department'), encoder.feature_names.index('age')
+    assert encoder.unknown_value == 0.0
+    for row, col in zip(encoded, [department] * 3 + [age] * 2):
+        assert row[col] == encoder.unknown_value
+        np.testing.assert_array_equal(np.delete(row, col), np.delete(expected, col))
+
+    # Scored as if the value were the training mean, without raising like LabelEncoder would
+    results = predictor.predict(variants)
+    assert len({round(r['probability'], 12) for r in results[:3]}) == 1
@@ -0,0 +1,86 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from attrition_model import AttritionPredictor
+from forest_compaction import compact_forest, prune_tree, skip_reason
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def trained(employee_csv):
+    predictor = AttritionPredictor(cache_size=0)
+    results = predictor.train(employee_csv, model_params={'n_estimators': 40})
+    return predictor, results
+
+
+def test_lossless_pruning_keeps_predictions(predictor, records):
+    X = predictor.encoder.transform(records)
+    for estimator in predictor.model.estimators_[:5]:
+        pruned = prune_tree(estimator, 0.0)
+        assert pruned.tree_.node_count <= estimator.tree_.node_count
+        assert np.allclose(pruned.predict_proba(X), estimator.predict_proba(X))
+
+
+def test_selection_and_report_use_separate_rows(trained):
+    predictor, _ = trained
+    X, y = predictor._holdout
+    model, engine, report = compact_forest(predictor.model, X, y)
+
+    assert report['selection_rows'] + report['report_rows'] == len(X)
+    assert 20 <= report['after']['trees'] <= 40 and len(model.estimators_) == report['after']['trees']
+    assert report['after']['nodes'] <= report['before']['nodes']
+    assert report['engine_parity']['passed']
+
+
+def test_skip_reasons():
+    assert skip_reason(np.zeros(500)) is not None
+    assert skip_reason(np.r_[np.zeros(150), np.ones(40)]) is not None
+    assert skip_reason(np.r_[np.zeros(490), np.ones(10)]) is not None
+    assert skip_reason(np.r_[np.zeros(250), np.ones(50)]) is None
+    with pytest.raises(ValueError):
+        compact_forest(None, np.zeros((500, 3)), np.zeros(500))
+
+
+def test_one_class_holdout_skips_compaction(trained, tmp_path):
+    predictor, _ = trained
+    X, y = predictor._holdout
+    predictor._holdout = (X, np.zeros_like(y))
+    nodes = predictor.engine.n_nodes
+
+    predictor.save_model(str(tmp_path), compact=True)
+    assert predictor.compaction is None and predictor.engine.n_nodes == nodes
+    with open(tmp_path / 'model_info.json') as f:
+        assert 'compaction' not in json.load(f)
+
+
+def test_saving_does_not_compact_by_default(trained, tmp_path):
+    predictor, _ = trained
+    nodes = predictor.engine.n_nodes
+    ModelRegistry(str(tmp_path)).save_predictor(predictor, 'v1')
+    assert predictor.compaction is None and predictor.engine.n_nodes == nodes
+
+
+def test_version_metrics_describe_compacted_forest(trained, tmp_path):
+    predictor, results = trained
+    registry = ModelRegistry(str(tmp_path))
+    registry.save_predictor(predictor, 'v1', metrics=results, compact=True)
+    report = predictor.compaction
+    assert report is not None
+
+    manifest = registry.manifest('v1')
+    assert manifest['metrics']['accuracy'] == report['after']['accuracy']
+    assert manifest['metrics']['roc_auc'] == report['after']['roc_auc']
+    assert manifest['metrics']['fit_seconds'] == results['fit_seconds']
+
+    with open(os.path.join(registry.version_path('v1'), 'model_info.json')) as f:
+        info = json.load(f)
+    importances = dict(zip(info['feature_names'], predictor.model.feature_importances_))
+    assert info['feature_importance'] == pytest.approx(importances)
+    assert predictor.compacted_results(results)['feature_importance'] == predictor.feature_importance
+
+    loaded = AttritionPredictor(cache_size=0)
+    loaded.load_model(registry.version_path('v1'))
+    assert loaded.engine.n_trees == report['after']['trees'] and loaded.compaction == report
@@ -0,0 +1,90 @@
+import numpy as np
+
+from attrition_model import AttritionPredictor
+from forest_engine import CompiledForest
+
+
+def test_engine_matches_sklearn(predictor, records):
+    X = predictor.encoder.transform(records)
+    parity = predictor.engine.check_parity(predictor.model, X)
+    assert parity['passed'], parity
+    np.testing.assert_array_equal(predictor.engine.predict(X), predictor.model.predict(X))
+
+
+def test_memory_mapped_engine_matches_compiled(predictor, saved_model_dir, records):
+    X = predictor.encoder.transform(records)
+    loaded = CompiledForest.load(f'{saved_model_dir}/forest', mmap_mode='r')
+    np.testing.assert_array_equal(loaded.predict_proba(X), predictor.engine.predict_proba(X))
+
+
+def test_float32_engine_takes_the_same_branches(predictor, records):
+    X = predictor.encoder.transform(records)
+    compact = predictor.engine.to_float32()
+    np.testing.assert_array_equal(compact.apply(X), predictor.engine.apply(X))
+    assert compact.check_parity(predictor.model, X)['passed']
+
+
+def test_failed_parity_falls_back_to_sklearn(predictor, records, monkeypatch, tmp_path):
+    compile_forest = CompiledForest.from_sklearn
+
+    def skewed(model):
+        engine = compile_forest(model)
+        engine.value = engine.value + 0.01
+        return engine
+
+    monkeypatch.setattr(CompiledForest, 'from_sklearn', staticmethod(skewed))
+    X = predictor.encoder.transform(records)
+    predictor._compile_engine(X)
+    assert predictor.engine is None
+
+    results = predictor.predict(records[:5])
+    expected = predictor.model.predict_proba(X[:5])[:, 1]
+    np.testing.assert_allclose([r['probability'] for r in results], expected)
+
+    # The saved version remembers that the engine is not to be trusted
+    predictor.save_model(str(tmp_path), compact=False)
+    reloaded = AttritionPredictor(cache_size=0)
+    reloaded.load_model(str(tmp_path))
+    assert reloaded.engine is None
+
+
+def test_large_batches_score_with_sklearn(saved_model_dir, records, monkeypatch):
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.load_model(saved_model_dir)
+    X = predictor.encoder.transform(records)
+    expected = predictor.engine.predict_proba(X)
+
+    # Small batches never deserialize the sklearn forest
+    predictor._score(X[:AttritionPredictor.ENGINE_MAX_ROWS])
+    assert predictor._model is None
+
+    monkeypatch.setattr(AttritionPredictor, 'ENGINE_MAX_ROWS', 50)
+    labels, probabilities = predictor._score(X)
+    assert predictor._model is not None
+    np.testing.assert_allclose(probabilities, expected, atol=1e-9)
+    np.testing.assert_array_equal(labels, predictor.engine.labels_from_proba(expected))
+
+
+def test_mmap_load_matches_pickle_without_unpickling_the_forest(predictor, saved_model_dir, records,
+                                                                monkeypatch):
+    import joblib
+    load = joblib.load
+
+    def guarded_load(path, *args, **kwargs):
+        assert not str(path).endswith('attrition_model.pkl'), 'forest was unpickled'
+        return load(path, *args, **kwargs)
+
+    monkeypatch.setattr(joblib, 'load', guarded_load)
+    mapped = AttritionPredictor(cache_size=0)
+    mapped.load_model(saved_model_dir, mmap=True)
+
+    for name in CompiledForest.ARRAYS:
+        array = getattr(mapped.engine, name)
+        assert isinstance(array.base, np.memmap), name
+        assert not array.flags.writeable, name
+
+    expected = predictor.predict(records[:50])
+    results = mapped.predict(records[:50])
+    assert mapped._model is None
+    assert [r['probability'] for r in results] == [r['probability'] for r in expected]
+    assert [r['top_factors'] for r in results] == [r['top_factors'] for r in expected]
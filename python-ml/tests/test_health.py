@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from attrition_model import AttritionPredictor
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def server(predictor, tmp_path, monkeypatch):
+    """An unloaded server over a registry holding v1 and a broken version, with fresh startup state"""
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    for version in ('v1', 'v2_broken'):
+        registry.save_predictor(predictor, version=version)
+    with open(f"{registry.version_path('v2_broken')}/model_info.json", 'w') as f:
+        f.write('{')
+
+    monkeypatch.setattr(api_server, 'registry', registry)
+    monkeypatch.setattr(api_server, 'predictor', AttritionPredictor(cache_size=0))
+    monkeypatch.setattr(api_server, 'model_ready', threading.Event())
+    monkeypatch.setattr(api_server, 'startup_state', {'phase': 'starting', 'error': None})
+    monkeypatch.setattr(api_server, 'WARMUP_ROWS', 4)
+    return registry
+
+
+def _wait_for(client, status_code, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get('/health/ready')
+        if response.status_code == status_code:
+            return response.json()
+        time.sleep(0.05)
+    raise AssertionError(f'/health/ready never returned {status_code}')
+
+
+def test_ready_after_warmup(server, monkeypatch):
+    server.promote('v1')
+    gate = threading.Event()
+    warm_up = api_server._warm_up
+
+    def gated_warm_up(new_predictor):
+        gate.wait(30)
+        return warm_up(new_predictor)
+
+    monkeypatch.setattr(api_server, '_warm_up', gated_warm_up)
+    with TestClient(api_server.app) as client:
+        # The model cannot finish warming up until the gate opens
+        response = client.get('/health/ready')
+        assert response.status_code == 503
+        assert response.json()['status'] == 'not_ready'
+        assert response.json()['phase'] in ('starting', 'loading')
+        assert client.get('/health/live').status_code == 200
+
+        gate.set()
+        body = _wait_for(client, 200)
+        assert body['status'] == 'ready' and body['model_version'] == 'v1'
+        assert body['warmup_seconds'] > 0
+        assert client.get('/health/live').status_code == 200
+
+
+def test_not_ready_when_loading_fails(server):
+    server.promote('v2_broken')
+    with TestClient(api_server.app) as client:
+        deadline = time.monotonic() + 30
+        while api_server.startup_state['phase'] != 'failed' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        response = client.get('/health/ready')
+        assert response.status_code == 503
+        assert response.json()['phase'] == 'failed' and response.json()['error']
+        assert client.get('/health/live').status_code == 200
+
+
+def test_not_ready_without_a_model(server):
+    with TestClient(api_server.app) as client:
+        deadline = time.monotonic() + 30
+        while api_server.startup_state['phase'] != 'no_model' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert client.get('/health/ready').status_code == 503
+        assert client.get('/health/live').status_code == 200
@@ -0,0 +1,97 @@
+import re
+
+from fastapi.testclient import TestClient
+
+import api_server
+from instrumentation import Metrics
+
+# name{label="value",...} value, per the Prometheus text exposition format
+SAMPLE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*")*\})?'
+    r' (-?[0-9.e+-]+|\+Inf|NaN)$'
+)
+
+
+def _check_exposition(text):
+    """Every line is a HELP, a TYPE or a sample of the most recently declared family"""
+    assert text.endswith('\n')
+    family = None
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            family = line.split()[2]
+        elif line.startswith('# TYPE '):
+            assert line.split()[2] == family
+            assert line.split()[3] in ('counter', 'gauge', 'histogram')
+        else:
+            assert SAMPLE.match(line), line
+            assert line.startswith(family), line
+
+
+def _sample(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    metrics.describe('latency_seconds', 'histogram', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        metrics.observe('latency_seconds', value, route='/a')
+    text = metrics.render()
+    _check_exposition(text)
+
+    assert _sample(text, 'latency_seconds') == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 6.05',
+        'latency_seconds_count{route="/a"} 4'
+    ]
+
+
+def test_counters_labels_and_escaping():
+    metrics = Metrics()
+    metrics.describe('requests_total', 'counter', 'Requests')
+    metrics.inc('requests_total', path='/b')
+    metrics.inc('requests_total', 2, path='/a"\n\\')
+    metrics.add_collector(lambda: [('up', 'gauge', 'Up', [('up', {}, True)])])
+    text = metrics.render()
+    _check_exposition(text)
+
+    assert _sample(text, 'requests_total') == [
+        'requests_total{path="/a\\"\\n\\\\"} 2',
+        'requests_total{path="/b"} 1'
+    ]
+    assert 'up 1' in text.splitlines()
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    metrics.describe('requests_total', 'counter', 'Requests')
+    metrics.inc('requests_total')
+    with metrics.stage('encode'):
+        pass
+    assert _sample(metrics.render(), 'requests_total') == []
+
+
+def test_metrics_endpoint(predictor, records, monkeypatch):
+    monkeypatch.setattr(api_server, 'predictor', predictor)
+    client = TestClient(api_server.app)
+    assert client.post('/predict/batch', json={'employees': records[:5]}).status_code == 200
+    assert client.get('/train/missing-job').status_code == 404
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    text = response.text
+    _check_exposition(text)
+
+    assert any('endpoint="/predict/batch",method="POST",status="200"' in line
+               for line in _sample(text, 'attrition_http_requests_total'))
+    # Routes are labelled by template, not by the requested path
+    assert any('endpoint="/train/{job_id}"' in line for line in _sample(text, 'attrition_http_requests_total'))
+    assert not any('missing-job' in line for line in text.splitlines())
+    for stage in ('encode', 'score', 'build_results'):
+        assert _sample(text, f'attrition_stage_seconds_count{{stage="{stage}"}}')
+    assert f'attrition_model_info{{version="{predictor.model_version}"}} 1' in text.splitlines()
+    assert 'attrition_model_loaded 1' in text.splitlines()
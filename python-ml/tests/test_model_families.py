@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attrition_model import AttritionPredictor
+from tuning import compare_families
+
+FAMILIES = ['hist_gradient_boosting', 'random_forest']
+
+
+@pytest.fixture(scope='module')
+def comparison(employee_csv):
+    return compare_families(
+        employee_csv, FAMILIES,
+        model_params={'hist_gradient_boosting': {'max_iter': 30}, 'random_forest': {'n_estimators': 20}},
+        latency_rows=50, single_calls=5
+    )
+
+
+def test_comparison_reports_both_families(comparison):
+    report, predictors = comparison
+    assert [row['model_family'] for row in report] == FAMILIES
+    for row in report:
+        assert 0.5 < row['accuracy'] <= 1 and 0 <= row['roc_auc'] <= 1
+        assert row['fit_seconds'] > 0 and row['model_size_mb'] > 0
+        assert row['predict_single_p50_ms'] > 0 and row['predict_batch_rows_per_sec'] > 0
+    assert predictors['hist_gradient_boosting'].encoding == 'native'
+    assert predictors['random_forest'].encoding == 'scaled'
+
+
+def test_native_model_predicts_rows_and_columns(comparison, records, tmp_path):
+    predictor = comparison[1]['hist_gradient_boosting']
+    assert predictor.engine is None and not predictor.supports_explain('shap')
+
+    employees = records[:40]
+    results = predictor.predict(employees)
+    expected = predictor.model.predict_proba(predictor.encoder.transform(employees))[:, 1]
+    np.testing.assert_allclose([r['probability'] for r in results], expected)
+    assert all(len(r['top_factors']) == 10 for r in results)
+
+    columns = pd.DataFrame(employees).to_dict('list')
+    scored = predictor.predict_columns(
+        {col: np.asarray(values, dtype=object) for col, values in columns.items()}, len(employees), top_k=3
+    )
+    np.testing.assert_allclose(scored['probability'], expected)
+    assert scored['top_factor_index'].shape == (40, 3)
+
+    # Unseen categories and missing values reach the model as NaN
+    odd = predictor.predict([{**employees[0], 'department': 'Astronautics', 'age': None}])
+    assert 0 <= odd['probability'] <= 1
+
+    predictor.save_model(str(tmp_path), compact=False)
+    loaded = AttritionPredictor(cache_size=0)
+    loaded.load_model(str(tmp_path))
+    assert loaded.encoding == 'native'
+    np.testing.assert_allclose([r['probability'] for r in loaded.predict(employees)], expected)
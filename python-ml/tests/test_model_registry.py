@@ -0,0 +1,106 @@
+import json
+import os
+
+import pytest
+from fastapi import HTTPException
+
+import api_server
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path, predictor):
+    """A registry holding three saved versions of the test model, none promoted"""
+    registry = ModelRegistry(str(tmp_path))
+    for version in ('v1', 'v2', 'v3'):
+        registry.save_predictor(predictor, version=version, metrics={'accuracy': 0.9, 'note': 'x'},
+                                compact=False)
+    return registry
+
+
+def test_saved_versions_have_manifests(registry):
+    versions = registry.list_versions()
+    assert [v['version'] for v in versions] == ['v1', 'v2', 'v3']
+    assert versions[0]['metrics'] == {'accuracy': 0.9}
+    assert not any(v['current'] for v in versions)
+    assert registry.current_version() is None
+
+
+def test_promote_and_rollback_follow_history(registry):
+    registry.promote('v1')
+    registry.promote('v2')
+    registry.promote('v2')
+    registry.promote('v3')
+    assert registry.current_version() == 'v3'
+    assert registry.previous_version() == 'v2'
+
+    assert registry.rollback() == 'v2'
+    assert registry.rollback() == 'v1'
+    assert registry.current_path() == registry.version_path('v1')
+    with pytest.raises(ValueError):
+        registry.rollback()
+
+
+def test_promote_unknown_version_is_rejected(registry):
+    os.remove(os.path.join(registry.version_path('v2'), 'manifest.json'))
+    with pytest.raises(ValueError):
+        registry.promote('v2')
+    with pytest.raises(ValueError):
+        registry.promote('missing')
+    assert registry.current_version() is None
+
+
+def test_rollback_checks_expected_version(registry):
+    registry.promote('v1')
+    registry.promote('v2')
+    with pytest.raises(ValueError):
+        registry.rollback(expected='v3')
+    assert registry.current_version() == 'v2'
+    assert registry.rollback(expected='v1') == 'v1'
+
+
+def test_discard_keeps_current_version(registry):
+    registry.promote('v1')
+    with pytest.raises(ValueError):
+        registry.discard('v1')
+    registry.discard('v2')
+    assert [v['version'] for v in registry.list_versions()] == ['v1', 'v3']
+
+
+def _failing_swap(model_path):
+    raise RuntimeError(f'cannot load {model_path}')
+
+
+def test_api_rollback_keeps_registry_when_load_fails(registry, monkeypatch):
+    registry.promote('v1')
+    registry.promote('v2')
+    with open(registry.state_path) as f:
+        state = json.load(f)
+
+    monkeypatch.setattr(api_server, 'registry', registry)
+    monkeypatch.setattr(api_server, '_swap_predictor', _failing_swap)
+    with pytest.raises(HTTPException) as error:
+        api_server.rollback_model()
+    assert error.value.status_code == 500
+    with open(registry.state_path) as f:
+        assert json.load(f) == state
+
+    loaded = []
+    monkeypatch.setattr(api_server, '_swap_predictor', loaded.append)
+    assert api_server.rollback_model() == {'success': True, 'version': 'v1'}
+    assert loaded == [registry.version_path('v1')]
+    assert registry.current_version() == 'v1'
+
+
+def test_api_promote_keeps_registry_when_load_fails(registry, monkeypatch):
+    registry.promote('v1')
+    monkeypatch.setattr(api_server, 'registry', registry)
+    monkeypatch.setattr(api_server, '_swap_predictor', _failing_swap)
+    with pytest.raises(HTTPException) as error:
+        api_server.promote_model('v2')
+    assert error.value.status_code == 500
+    assert registry.current_version() == 'v1'
+
+    with pytest.raises(HTTPException) as error:
+        api_server.promote_model('missing')
+    assert error.value.status_code == 404
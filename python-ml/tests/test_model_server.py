@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from attrition_model import AttritionPredictor
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(predictor, tmp_path, monkeypatch):
+    """v1, v2 and v3 promoted in turn, a broken version and a server serving v3"""
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    for version in ('v1', 'v2', 'v3', 'v4_broken'):
+        registry.save_predictor(predictor, version=version)
+    with open(f"{registry.version_path('v4_broken')}/model_info.json", 'w') as f:
+        f.write('{')
+    for version in ('v1', 'v2', 'v3'):
+        registry.promote(version)
+
+    serving = AttritionPredictor(cache_size=0)
+    serving.load_model(registry.version_path('v3'))
+    monkeypatch.setattr(api_server, 'registry', registry)
+    monkeypatch.setattr(api_server, 'predictor', serving)
+    monkeypatch.setattr(api_server, 'WARMUP_ROWS', 4)
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    return TestClient(api_server.app)
+
+
+def _serving():
+    return api_server.predictor.model_version
+
+
+def test_promote_swaps_the_live_model(client, registry):
+    response = client.post('/model/promote/v1')
+    assert response.status_code == 200, response.text
+    assert _serving() == 'v1' and registry.current_version() == 'v1'
+    assert client.post('/model/promote/missing').status_code == 404
+
+
+def test_rollback_swaps_the_live_model(client, registry):
+    response = client.post('/model/rollback')
+    assert response.status_code == 200, response.text
+    assert response.json()['version'] == 'v2'
+    assert _serving() == 'v2' and registry.current_version() == 'v2'
+
+
+def test_broken_artifact_keeps_the_old_model(client, registry):
+    assert client.post('/model/promote/v4_broken').status_code == 500
+    assert _serving() == 'v3' and registry.current_version() == 'v3'
+
+
+def test_rollback_conflict_serves_the_registry_version(client, registry, monkeypatch):
+    rollback = registry.rollback
+
+    def promote_then_rollback(expected=None):
+        # Another process promotes v1 while this one loads v2
+        registry.promote('v1')
+        return rollback(expected)
+
+    monkeypatch.setattr(registry, 'rollback', promote_then_rollback)
+    assert client.post('/model/rollback').status_code == 409
+    assert registry.current_version() == 'v1' and _serving() == 'v1'
+
+
+def test_watcher_reloads_a_version_promoted_elsewhere(registry, monkeypatch):
+    monkeypatch.setattr(api_server, 'MODEL_WATCH_INTERVAL', 0.05)
+    stop = threading.Event()
+    watcher = threading.Thread(target=api_server._watch_registry, args=(stop,))
+    watcher.start()
+    try:
+        time.sleep(0.1)
+        registry.promote('v1')
+        deadline = time.monotonic() + 10
+        while _serving() != 'v1' and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        watcher.join()
+    assert _serving() == 'v1'
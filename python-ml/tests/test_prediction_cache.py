@@ -0,0 +1,69 @@
+import prediction_cache
+from attrition_model import AttritionPredictor
+from prediction_cache import PredictionCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['size'] == 2
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(prediction_cache.time, 'monotonic', clock)
+    cache = PredictionCache(max_size=10, ttl_seconds=5)
+    cache.put('a', 1)
+
+    clock.now += 4.9
+    assert cache.get('a') == 1
+    clock.now += 0.2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1 and cache.stats()['size'] == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(max_size=0)
+    cache.put('a', 1)
+    assert not cache.enabled and cache.get('a') is None
+
+
+def test_keys_depend_on_namespace_and_payload():
+    key = PredictionCache.key_for('predict:10', b'row')
+    assert key == PredictionCache.key_for('predict:10', b'row')
+    assert key != PredictionCache.key_for('predict:5', b'row')
+    assert key != PredictionCache.key_for('predict:10', b'other')
+
+
+def test_predictor_serves_repeats_and_clears_on_model_load(saved_model_dir, records):
+    predictor = AttritionPredictor(cache_size=100)
+    predictor.load_model(saved_model_dir, mmap=False)
+    first = predictor.predict(records[:5])
+    assert predictor.cache.stats()['misses'] == 5
+
+    assert predictor.predict(records[:5]) == first
+    stats = predictor.cache.stats()
+    assert stats['hits'] == 5 and stats['size'] == 5 and stats['model_version'] == predictor.model_version
+
+    # Loading a model, even the same version, drops every cached result
+    predictor.load_model(saved_model_dir, mmap=False)
+    assert predictor.cache.stats()['size'] == 0
+    assert predictor.cache.stats()['invalidations'] == 2
+    predictor.predict(records[:5])
+    assert predictor.cache.stats()['misses'] == 10
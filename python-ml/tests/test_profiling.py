@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import profiling
+from profiling import ProfileSession, ProfilingRoute, run_profiled
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+
+    app = FastAPI()
+    app.router.route_class = ProfilingRoute
+
+    @app.get('/sync')
+    def sync_endpoint():
+        return {'value': _busy(1000)}
+
+    @app.get('/async')
+    async def async_endpoint():
+        return {'value': await run_profiled(_busy, 1000)}
+
+    @app.get('/list')
+    def list_endpoint():
+        return [1, 2, 3]
+
+    @app.get('/stream', response_class=StreamingResponse)
+    def stream_endpoint():
+        return StreamingResponse(iter([b'a', b'b']))
+
+    return TestClient(app)
+
+
+def test_disabled_by_default(monkeypatch, client):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', False)
+    body = client.get('/sync?profile=1').json()
+    assert 'profile' not in body
+
+
+def test_inline_report_covers_threadpool_work(client):
+    for path in ('/sync', '/async'):
+        body = client.get(path, headers={'X-Profile': '1'}).json()
+        assert body['value'] == _busy(1000)
+        functions = [row['function'] for row in body['profile']['hot_functions']]
+        assert any('_busy' in f for f in functions), path
+
+
+def test_non_object_response_writes_file(client, tmp_path):
+    response = client.get('/list?profile=1')
+    assert response.json() == [1, 2, 3]
+    path = response.headers['X-Profile-File']
+    assert os.path.dirname(path) == str(tmp_path) and os.path.getsize(path) > 0
+
+
+def test_streaming_route_rejects_flag(client):
+    assert client.get('/stream?profile=1').status_code == 400
+    assert client.get('/stream').content == b'ab'
+
+
+def test_overlapping_profiles_conflict(client):
+    assert profiling._profile_lock.acquire(blocking=False)
+    try:
+        assert client.get('/sync?profile=1').status_code == 409
+        assert client.get('/sync').status_code == 200
+    finally:
+        profiling._profile_lock.release()
+    assert client.get('/sync?profile=1').status_code == 200
+
+
+def test_dump_keeps_newest_files(tmp_path):
+    paths = []
+    for _ in range(4):
+        session = ProfileSession()
+        session.run(_busy, 10)
+        paths.append(session.dump(str(tmp_path), 'test', max_files=2))
+        time.sleep(0.01)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths[-2:])
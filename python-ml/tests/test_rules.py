@@ -0,0 +1,173 @@
+import itertools
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import api_server
+from rules import LeaveReasonEngine, RetentionStrategyEngine
+
+
+def _legacy_leave_reasons(df):
+    """The per-record if-chain the rule table replaced, kept as the reference"""
+    reasons = []
+
+    def add(category, reason, severity, impact, preventable=True):
+        reasons.append({'category': category, 'reason': reason, 'severity': severity,
+                        'impact': impact, 'preventable': preventable})
+
+    def value(col):
+        return df[col].iloc[0]
+
+    if 'jobSatisfaction' in df.columns and value('jobSatisfaction') <= 2:
+        add('Job Satisfaction', 'Low job satisfaction indicates employee is unhappy with their role',
+            'critical' if value('jobSatisfaction') == 1 else 'major', 85)
+    if 'workLifeBalance' in df.columns and value('workLifeBalance') <= 2:
+        add('Work-Life Balance', 'Poor work-life balance causing stress and burnout', 'critical', 80)
+    if 'overTime' in df.columns and value('overTime') in ['Yes', 1, True]:
+        add('Overtime', 'Frequent overtime leading to exhaustion', 'major', 70)
+    if 'monthlyIncome' in df.columns and value('monthlyIncome') < 6500 * 0.8:
+        add('Compensation', 'Below-market compensation', 'critical', 90)
+    if 'yearsSinceLastPromotion' in df.columns and value('yearsSinceLastPromotion') >= 5:
+        add('Career Growth', 'No career advancement in 5+ years', 'major', 75)
+    if 'distanceFromHome' in df.columns and value('distanceFromHome') > 20:
+        add('Commute', 'Long commute distance causing daily stress', 'moderate', 50, False)
+    if 'environmentSatisfaction' in df.columns and value('environmentSatisfaction') <= 2:
+        add('Work Environment', 'Poor workplace environment satisfaction', 'major', 65)
+    if 'relationshipSatisfaction' in df.columns and value('relationshipSatisfaction') <= 2:
+        add('Relationships', 'Poor workplace relationships', 'moderate', 60)
+    if 'trainingTimesLastYear' in df.columns and value('trainingTimesLastYear') == 0:
+        add('Professional Development', 'No training or skill development opportunities', 'moderate', 55)
+
+    reasons.sort(key=lambda x: x['impact'], reverse=True)
+    return {
+        'total_reasons': len(reasons),
+        'reasons': reasons,
+        'preventability_score': sum(1 for r in reasons if r['preventable']) / max(len(reasons), 1) * 100
+    }
+
+
+EDGE_CASES = [
+    {},
+    {'jobSatisfaction': 1, 'overTime': True, 'monthlyIncome': 5199, 'distanceFromHome': 21},
+    {'jobSatisfaction': 2, 'overTime': 1, 'monthlyIncome': 5200, 'distanceFromHome': 20},
+    {'overTime': 'No', 'trainingTimesLastYear': 0, 'yearsSinceLastPromotion': 5},
+    {'distanceFromHome': 30},
+    {'workLifeBalance': 2.0, 'environmentSatisfaction': 3, 'relationshipSatisfaction': 2}
+]
+
+
+def test_engine_matches_legacy_rules(records):
+    employees = records + EDGE_CASES
+    expected = [_legacy_leave_reasons(pd.DataFrame([e])) for e in employees]
+    assert LeaveReasonEngine().analyze(employees) == expected
+
+
+def test_columns_match_records(records):
+    engine = LeaveReasonEngine()
+    df = pd.DataFrame(records)
+    columns = {col: df[col].to_numpy() for col in df.columns}
+    assert engine.analyze_columns(columns, len(df)) == engine.analyze(records)
+
+
+def test_missing_and_non_numeric_values_never_fire():
+    engine = LeaveReasonEngine()
+    result = engine.analyze([{'jobSatisfaction': None, 'monthlyIncome': 'n/a', 'overTime': None}])[0]
+    assert result == {'total_reasons': 0, 'reasons': [], 'preventability_score': 0.0}
+
+
+def test_predictor_single_and_batch_agree(predictor, records):
+    batch = predictor.analyze_leave_reasons_batch(records[:20])
+    assert batch == [predictor.analyze_leave_reasons(r) for r in records[:20]]
+    assert predictor.analyze_leave_reasons_batch(pd.DataFrame(records[:20])) == batch
+
+
+def _legacy_retention_strategies(employee):
+    """The per-employee if-chain the retention rule table replaced, kept as the reference"""
+    strategies = []
+
+    def add(category, action, timeline, impact, cost, priority):
+        strategies.append({'category': category, 'action': action, 'timeline': timeline,
+                           'impact': impact, 'cost': cost, 'priority': priority})
+
+    if employee.get('monthlyIncome', 0) < 5000:
+        add('Compensation', 'Salary review and adjustment (+10-15% market rate comparison)',
+            'Immediate (1-2 weeks)', 'high', 'high', 1)
+    if employee.get('overTime') == 'Yes' or employee.get('workLifeBalance', 3) <= 2:
+        add('Work-Life Balance', 'Reduce overtime, implement flexible schedule, remote work options',
+            'Short-term (2-4 weeks)', 'high', 'low', 1)
+    if employee.get('trainingTimesLastYear', 1) == 0 or employee.get('yearsAtCompany', 0) >= 5:
+        add('Career Development', 'Create personalized development plan, assign mentor, discuss promotion path',
+            'Medium-term (1-3 months)', 'high', 'medium', 2)
+    if employee.get('jobSatisfaction', 3) <= 2:
+        add('Job Redesign', 'One-on-one discussion, role adjustment, task variety increase',
+            'Short-term (2-4 weeks)', 'high', 'low', 1)
+    if employee.get('performanceRating', 3) >= 3:
+        add('Recognition & Rewards', 'Employee recognition program, spot bonuses, public acknowledgment',
+            'Immediate (1 week)', 'medium', 'low', 2)
+
+    strategies.sort(key=lambda x: (x['priority'], x['impact'] == 'high'), reverse=True)
+    high_impact = sum(1 for s in strategies if s['impact'] == 'high')
+    return {
+        'strategies': strategies[:5],
+        'estimated_effectiveness': min(high_impact * 25 + len(strategies) * 10, 95),
+        'total_strategies': len(strategies)
+    }
+
+
+# Each field missing, or just either side of its threshold
+RETENTION_GRID = {
+    'monthlyIncome': [4999, 5000],
+    'overTime': ['Yes', 'No'],
+    'workLifeBalance': [2, 3],
+    'trainingTimesLastYear': [0, 1],
+    'yearsAtCompany': [4, 5],
+    'jobSatisfaction': [2, 3],
+    'performanceRating': [2, 3]
+}
+
+
+def _retention_grid():
+    missing = object()
+    fields = list(RETENTION_GRID)
+    for values in itertools.product(*([missing] + RETENTION_GRID[f] for f in fields)):
+        yield {f: v for f, v in zip(fields, values) if v is not missing}
+
+
+def test_retention_engine_matches_legacy_rules_on_grid():
+    employees = list(_retention_grid())
+    assert len(employees) == 3 ** len(RETENTION_GRID)
+    expected = [_legacy_retention_strategies(e) for e in employees]
+    assert RetentionStrategyEngine().evaluate(employees) == expected
+
+    # Several priority-1 high-impact strategies tie on the sort key and keep rule order
+    everything = {'monthlyIncome': 1000, 'overTime': 'Yes', 'trainingTimesLastYear': 0,
+                  'jobSatisfaction': 1, 'performanceRating': 4}
+    plan = RetentionStrategyEngine().evaluate([everything])[0]
+    assert [s['category'] for s in plan['strategies']] == [
+        'Career Development', 'Recognition & Rewards', 'Compensation', 'Work-Life Balance', 'Job Redesign'
+    ]
+    assert plan['estimated_effectiveness'] == 95 and plan['total_strategies'] == 5
+
+
+def test_retention_batch_endpoint_matches_legacy(predictor, records, monkeypatch):
+    monkeypatch.setattr(api_server, 'predictor', predictor)
+    client = TestClient(api_server.app)
+    employees = records[:30] + list(itertools.islice(_retention_grid(), 0, None, 97))
+    risk_scores = [float(i * 3 % 100) for i in range(len(employees))]
+
+    response = client.post('/retention/strategies/batch',
+                           json={'employees': employees, 'risk_scores': risk_scores})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body['count'] == len(employees)
+    for plan, employee, risk_score in zip(body['data'], employees, risk_scores):
+        assert plan == {
+            **_legacy_retention_strategies(employee),
+            'risk_score': risk_score,
+            'risk_level': predictor._get_risk_level(risk_score)
+        }
+
+    single = client.post('/retention/strategies', json={'employee': employees[0], 'risk_score': risk_scores[0]})
+    assert single.json()['data'] == body['data'][0]
+    assert client.post('/retention/strategies/batch',
+                       json={'employees': employees, 'risk_scores': [1.0]}).status_code == 400
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from score_offline import plan_csv_shards, score_file
+
+
+def _write_csv(path, n_rows, trailing_newline=True):
+    lines = ['a,b'] + [f'{i},x{i}' for i in range(n_rows)]
+    path.write_bytes(('\n'.join(lines) + ('\n' if trailing_newline else '')).encode())
+    return str(path)
+
+
+@pytest.mark.parametrize('n_rows,shard_size,trailing_newline', [
+    (10, 3, True), (9, 3, True), (10, 3, False), (1, 5, True), (50, 7, True)
+])
+def test_csv_shards_cover_every_row_once(tmp_path, n_rows, shard_size, trailing_newline):
+    path = _write_csv(tmp_path / 'in.csv', n_rows, trailing_newline)
+    # A small block size puts shard boundaries across block edges
+    shards = plan_csv_shards(path, shard_size, block_size=5)
+
+    data = open(path, 'rb').read()
+    rows = []
+    for shard in shards:
+        start, stop = shard['byte_range']
+        lines = data[start:stop].decode().splitlines()
+        assert shard['first_row'] == len(rows)
+        assert len(lines) == shard_size or shard is shards[-1]
+        rows.extend(lines)
+    assert rows == data.decode().splitlines()[1:]
+    assert shards[-1]['byte_range'][1] == len(data)
+
+
+def test_header_only_csv_is_one_empty_shard(tmp_path):
+    path = _write_csv(tmp_path / 'in.csv', 0)
+    assert [s['byte_range'] for s in plan_csv_shards(path, 10)] == [[4, 4]]
+
+
+@pytest.fixture
+def scoring_csv(employee_csv, tmp_path):
+    df = pd.read_csv(employee_csv, nrows=95)
+    df.insert(0, 'employeeNumber', range(1000, 1095))
+    path = tmp_path / 'scoring.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _score(input_path, output_path, model_dir, **kwargs):
+    return score_file(input_path, str(output_path), model_dir, shard_size=20, n_workers=1,
+                      id_columns=['employeeNumber'], **kwargs)
+
+
+def test_resume_matches_full_run(scoring_csv, saved_model_dir, tmp_path):
+    full = tmp_path / 'full.csv'
+    summary = _score(scoring_csv, full, saved_model_dir)
+    assert summary['rows'] == 95 and summary['shards'] == 5
+    expected = pd.read_csv(full)
+    assert expected['row'].tolist() == list(range(95))
+    assert expected['employeeNumber'].tolist() == list(range(1000, 1095))
+
+    # Simulate an interrupted run: the checkpoint is kept but two parts never finished
+    resumed = tmp_path / 'resumed.csv'
+    _score(scoring_csv, resumed, saved_model_dir, keep_parts=True)
+    parts_dir = f'{resumed}.parts'
+    checkpoint_path = os.path.join(parts_dir, 'checkpoint.json')
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    del checkpoint['completed']['1']
+    with open(checkpoint_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.remove(os.path.join(parts_dir, 'part-00003.csv'))
+    os.remove(resumed)
+
+    summary = _score(scoring_csv, resumed, saved_model_dir)
+    assert summary['resumed_shards'] == 3 and summary['rows'] == 95
+    assert not os.path.exists(parts_dir)
+    pd.testing.assert_frame_equal(pd.read_csv(resumed), expected)
+
+
+def test_failed_shard_checkpoints_finished_shards(scoring_csv, saved_model_dir, tmp_path):
+    # An unterminated quote in the last shard fails to parse
+    with open(scoring_csv, 'a') as f:
+        f.write('1,"2,3\n')
+    output = tmp_path / 'out.csv'
+    with pytest.raises(Exception):
+        _score(scoring_csv, output, saved_model_dir)
+
+    with open(f'{output}.parts/checkpoint.json') as f:
+        completed = json.load(f)['completed']
+    assert completed == {'0': 20, '1': 20, '2': 20, '3': 20}
+    assert not os.path.exists(output)
+
+
+def test_header_only_input_writes_header(scoring_csv, saved_model_dir, tmp_path):
+    path = tmp_path / 'empty.csv'
+    with open(scoring_csv) as f:
+        path.write_text(f.readline())
+    output = tmp_path / 'out.csv'
+    summary = _score(str(path), output, saved_model_dir, top_k=2)
+
+    assert summary['rows'] == 0
+    df = pd.read_csv(output)
+    assert df.empty
+    assert list(df.columns) == [
+        'row', 'employeeNumber', 'prediction', 'probability', 'risk_score', 'risk_level',
+        'factor_1', 'factor_1_contribution', 'factor_2', 'factor_2_contribution'
+    ]
+
+
+def test_empty_parquet_input_writes_schema(scoring_csv, saved_model_dir, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'empty.parquet'
+    pd.read_csv(scoring_csv, nrows=0).to_parquet(path, index=False)
+    output = tmp_path / 'out.parquet'
+    summary = _score(str(path), output, saved_model_dir)
+
+    assert summary['rows'] == 0
+    df = pd.read_parquet(output)
+    assert df.empty and 'probability' in df.columns
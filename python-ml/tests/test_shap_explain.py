@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from attrition_model import AttritionPredictor
+from tree_shap import TreeShapExplainer
+
+
+@pytest.fixture(scope='module')
+def boosted_predictor(employee_csv):
+    predictor = AttritionPredictor(cache_size=0)
+    predictor.train(employee_csv, model_family='gradient_boosting', model_params={'n_estimators': 10})
+    return predictor
+
+
+def test_shap_values_add_up_to_probability(predictor, records):
+    X = predictor.encoder.transform(records[:20])
+    explainer = TreeShapExplainer.from_sklearn(predictor.model)
+    total = explainer.expected_value + explainer.shap_values(X).sum(axis=1)
+    assert np.allclose(total, predictor.model.predict_proba(X)[:, 1], atol=1e-9)
+
+
+def test_supported_families(predictor, boosted_predictor):
+    assert predictor.supports_explain('shap') and predictor.supports_explain('importance')
+    assert not boosted_predictor.supports_explain('shap')
+    assert boosted_predictor.supports_explain('importance')
+    assert not predictor.supports_explain('unknown')
+
+
+def test_api_rejects_shap_for_boosted_models(boosted_predictor, records, monkeypatch):
+    monkeypatch.setattr(api_server, 'predictor', boosted_predictor)
+    client = TestClient(api_server.app)
+
+    response = client.post('/predict?explain=shap', json=records[0])
+    assert response.status_code == 400
+    assert 'GradientBoostingClassifier' in response.json()['detail']
+    response = client.post('/predict/batch?explain=shap', json={'employees': records[:3]})
+    assert response.status_code == 400
+
+    response = client.post('/predict/batch', json={'employees': records[:3]})
+    assert response.status_code == 200 and len(response.json()['data']) == 3
+
+
+def test_api_serves_shap_for_forests(predictor, records, monkeypatch):
+    monkeypatch.setattr(api_server, 'predictor', predictor)
+    client = TestClient(api_server.app)
+    response = client.post('/predict/batch?explain=shap', json={'employees': records[:3]})
+    assert response.status_code == 200 and len(response.json()['data']) == 3
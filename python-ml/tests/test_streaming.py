@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import api_server
+from streaming import MalformedRecord, iter_chunks, iter_records
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(aiter):
+    return [item async for item in aiter]
+
+
+def _parse(chunks, fmt):
+    return asyncio.run(_collect(iter_records(_stream(chunks), fmt)))
+
+
+def _split_every(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_ndjson_records_across_chunk_boundaries():
+    body = b'{"age": 30}\r\n\n{"age": 41, "department": "Sales"}\n{"age": 52}'
+    expected = [{'age': 30}, {'age': 41, 'department': 'Sales'}, {'age': 52}]
+    assert _parse([body], 'ndjson') == expected
+    assert _parse(_split_every(body, 1), 'ndjson') == expected
+
+
+def test_ndjson_malformed_lines_do_not_stop_the_stream():
+    records = _parse([b'{"age": 30}\nnot json\n[1, 2]\n{"age": 31}\n'], 'ndjson')
+    assert records[0] == {'age': 30} and records[3] == {'age': 31}
+    assert isinstance(records[1], MalformedRecord) and 'Invalid JSON' in records[1].error
+    assert isinstance(records[2], MalformedRecord)
+
+
+def test_csv_with_bom_split_across_chunks():
+    body = b'\xef\xbb\xbfage, department\r\n30,Sales\r\n41,\r\n'
+    expected = [{'age': '30', 'department': 'Sales'}, {'age': '41', 'department': None}]
+    assert _parse([body], 'csv') == expected
+    assert _parse(_split_every(body, 2), 'csv') == expected
+
+
+def test_ndjson_with_bom_only_chunk():
+    assert _parse([b'\xef\xbb\xbf', b'{"age": 30}\n'], 'ndjson') == [{'age': 30}]
+    assert _parse([b'\xef\xbb', b'\xbf{"age": 30}'], 'ndjson') == [{'age': 30}]
+
+
+def test_csv_quoted_fields_with_newlines_and_blank_rows():
+    body = b'name,note\n"Doe, Jane","line one\nline two"\n,\n"Roe","says ""hi"""\n'
+    assert _parse([body], 'csv') == [
+        {'name': 'Doe, Jane', 'note': 'line one\nline two'},
+        {'name': 'Roe', 'note': 'says "hi"'}
+    ]
+
+
+def test_chunks_grow_from_first_size_to_max_size():
+    chunks = asyncio.run(_collect(iter_chunks(_stream(range(20)), max_size=8, first_size=2)))
+    assert [len(c) for c in chunks] == [2, 4, 8, 6]
+    assert [r for c in chunks for r in c] == list(range(20))
+
+
+class _StubPredictor:
+    """Scores a record as its age, fails on records flagged bad and swaps in another model"""
+
+    is_loaded = True
+
+    def __init__(self, version, swap_to=None):
+        self.version = version
+        self.swap_to = swap_to
+
+    def predict(self, records, explain='importance'):
+        if self.swap_to is not None:
+            api_server.predictor = self.swap_to
+        if isinstance(records, dict):
+            return self.predict([records])[0]
+        if any(r.get('bad') for r in records):
+            raise ValueError('bad record')
+        return [{'age': r['age'], 'version': self.version} for r in records]
+
+
+def test_stream_scores_failed_chunk_row_by_row_with_one_model(monkeypatch):
+    monkeypatch.setattr(api_server, 'STREAM_CHUNK_SIZE', 2)
+    monkeypatch.setattr(api_server, 'predictor', _StubPredictor('old', swap_to=_StubPredictor('new')))
+    body = b'{"age": 1}\n{"age": 2, "bad": true}\nnot json\n{"age": 4}\n{"age": 5}\n'
+    response = TestClient(api_server.app).post('/predict/stream', content=body)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['row'] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[0] == {'row': 0, 'age': 1, 'version': 'old'}
+    assert lines[1] == {'row': 1, 'error': 'bad record'}
+    assert 'error' in lines[2]
+    # The predictor swapped in after the first chunk does not score the rest of the stream
+    assert [lines[i]['version'] for i in (3, 4)] == ['old', 'old']
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+TOP_KS = [0, 1, 3, 25, 40]
+
+
+def _baseline_order(contributions, top_k):
+    """The per-row sort the vectorized selection replaced: stable, so ties keep feature order"""
+    return sorted(range(len(contributions)), key=lambda i: abs(contributions[i]), reverse=True)[:top_k]
+
+
+@pytest.mark.parametrize('top_k', TOP_KS)
+def test_top_factors_match_sorted_with_ties(predictor, top_k):
+    rng = np.random.default_rng(5)
+    # Small integers give many ties in magnitude, including between signs
+    contributions = rng.integers(-3, 4, size=(60, 25)).astype(np.float64)
+    top_idx, top_contrib = predictor._top_factors(contributions, top_k)
+
+    assert top_idx.shape == (60, min(top_k, 25))
+    for row, idx, contrib in zip(contributions, top_idx, top_contrib):
+        expected = _baseline_order(row.tolist(), top_k)
+        assert idx.tolist() == expected
+        assert contrib.tolist() == [row[i] for i in expected]
+
+
+@pytest.mark.parametrize('top_k', TOP_KS)
+def test_predict_top_factors_in_both_formats(predictor, records, top_k):
+    employees = records[:20]
+    dicts = predictor.predict(employees, top_k=top_k)
+    arrays = predictor.predict(employees, top_k=top_k, factors_format='arrays')
+
+    X = predictor.encoder.transform(employees).astype(np.float64)
+    names = predictor.feature_names
+    for x, as_dicts, as_arrays in zip(X, dicts, arrays):
+        contributions = [
+            float(value * predictor.feature_importance.get(name, 0)) for name, value in zip(names, x)
+        ]
+        expected = [names[i] for i in _baseline_order(contributions, top_k)]
+        assert [f['factor'] for f in as_dicts['top_factors']] == expected
+        assert as_arrays['top_factors']['factor'] == expected
+        assert as_arrays['top_factors']['contribution'] == pytest.approx(
+            [f['contribution'] for f in as_dicts['top_factors']]
+        )
+        assert as_arrays['top_factors']['importance'] == [f['importance'] for f in as_dicts['top_factors']]
@@ -0,0 +1,99 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from model_registry import ModelRegistry
+from synthetic_data import generate_employees
+from training_jobs import TrainingJobManager
+
+
+@pytest.fixture(scope='module')
+def small_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp('train') / 'employees.csv'
+    generate_employees(300, seed=3).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def registry(predictor, tmp_path, monkeypatch):
+    """A registry serving v1, with a fresh job manager installing into it"""
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    registry.save_predictor(predictor, version='v1')
+    registry.promote('v1')
+    jobs = TrainingJobManager(api_server._install_trained_model, registry)
+    monkeypatch.setattr(api_server, 'registry', registry)
+    monkeypatch.setattr(api_server, 'predictor', predictor)
+    monkeypatch.setattr(api_server, 'training_jobs', jobs)
+    monkeypatch.setattr(api_server, 'WARMUP_ROWS', 4)
+    yield registry
+    jobs.shutdown()
+
+
+@pytest.fixture
+def client(registry):
+    return TestClient(api_server.app)
+
+
+def _start(client, csv_path, **options):
+    response = client.post('/train', json={
+        'csv_path': csv_path, 'model_params': {'n_estimators': 10}, 'use_feature_cache': False, **options
+    })
+    assert response.status_code == 202, response.text
+    return response.json()['data']
+
+
+def _wait(client, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/train/{job_id}').json()['data']
+        if job['status'] in ('succeeded', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f'Training job {job_id} did not finish')
+
+
+def test_successful_job_installs_its_model(client, registry, small_csv):
+    job = _start(client, small_csv)
+    assert job['status'] == 'running' and job['job_id']
+    assert client.post('/train', json={'csv_path': small_csv}).status_code == 409
+
+    job = _wait(client, job['job_id'])
+    assert job['status'] == 'succeeded', job['error']
+    assert job['stage'] == 'done' and job['progress'] == 1.0
+    assert 0 <= job['metrics']['accuracy'] <= 1
+    assert api_server.predictor.model_version == job['version']
+    assert registry.current_version() == job['version']
+    assert [j['job_id'] for j in client.get('/train/jobs').json()['data']] == [job['job_id']]
+
+
+def test_cancel_terminates_the_process_and_drops_the_version(client, registry, small_csv):
+    job = _start(client, small_csv)
+    process = api_server.training_jobs.get(job['job_id']).process
+    assert client.delete(f"/train/{job['job_id']}").status_code == 200
+
+    job = _wait(client, job['job_id'])
+    assert job['status'] == 'cancelled'
+    assert not process.is_alive()
+    assert not os.path.exists(registry.version_path(job['version']))
+    assert client.delete(f"/train/{job['job_id']}").status_code == 409
+    assert api_server.predictor.model_version == 'v1' and registry.current_version() == 'v1'
+
+
+def test_failed_job_keeps_the_serving_model(client, registry, small_csv, tmp_path):
+    broken = tmp_path / 'broken.csv'
+    pd.read_csv(small_csv, usecols=['age']).to_csv(broken, index=False)
+
+    job = _wait(client, _start(client, str(broken))['job_id'])
+    assert job['status'] == 'failed' and job['error']
+    assert not os.path.exists(registry.version_path(job['version']))
+    assert api_server.predictor.model_version == 'v1' and registry.current_version() == 'v1'
+
+
+def test_unknown_job_and_missing_data(client):
+    assert client.get('/train/missing').status_code == 404
+    assert client.delete('/train/missing').status_code == 404
+    assert client.post('/train', json={'csv_path': 'no/such.csv'}).status_code == 404
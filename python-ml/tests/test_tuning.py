@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import tuning
+from tuning import prepare_folds, sample_candidates, tune_hyperparameters
+
+SMALL_SPACES = {
+    'random_forest': {'n_estimators': [5, 10], 'max_depth': [4, 8, None]},
+    'extra_trees': {'n_estimators': [5, 10], 'max_depth': [4, 8, None]},
+    'gradient_boosting': {'n_estimators': [5, 10], 'max_depth': [2, 3]}
+}
+
+
+def test_candidates_are_split_across_families():
+    candidates = sample_candidates(['random_forest', 'extra_trees', 'gradient_boosting'], 8)
+    families = [c['model_family'] for c in candidates]
+    assert families.count('random_forest') == 3
+    assert families.count('extra_trees') == 3
+    assert families.count('gradient_boosting') == 2
+    assert candidates == sample_candidates(['random_forest', 'extra_trees', 'gradient_boosting'], 8)
+
+
+def test_folds_are_scaled_and_exclude_test_rows(employee_csv, tmp_path):
+    n_train = prepare_folds(employee_csv, str(tmp_path), cv=3, test_size=0.2)
+    # 1200 training rows split three ways
+    assert n_train == 800
+    for k in range(3):
+        X_train = np.load(tmp_path / f'fold{k}_X_train.npy')
+        X_valid = np.load(tmp_path / f'fold{k}_X_valid.npy')
+        y_train = np.load(tmp_path / f'fold{k}_y_train.npy')
+        assert X_train.dtype == np.float32 and len(X_train) == len(y_train)
+        assert len(X_train) + len(X_valid) == 1200
+        assert np.allclose(X_train.mean(axis=0), 0, atol=1e-4)
+
+
+def test_successive_halving_narrows_candidates(employee_csv, monkeypatch):
+    monkeypatch.setattr(tuning, 'SEARCH_SPACES', SMALL_SPACES)
+    result = tune_hyperparameters(
+        employee_csv, families=['random_forest', 'gradient_boosting'], n_candidates=4,
+        cv=2, factor=2, min_resources=150, n_workers=1
+    )
+    settings, leaderboard = result['settings'], result['leaderboard']
+    assert settings['n_rungs'] == 3 and settings['max_resources'] == 600
+
+    per_rung = [[e for e in leaderboard if e['rung'] == rung] for rung in range(3)]
+    assert [len(entries) for entries in per_rung] == [4, 2, 1]
+    assert [entries[0]['n_resources'] for entries in per_rung] == [150, 300, 600]
+    assert result['best'] is leaderboard[0] and result['best']['rung'] == 2
+    assert [e['rank'] for e in leaderboard] == list(range(1, 8))
+    assert all(0.5 <= e['mean_roc_auc'] <= 1 for e in leaderboard)
+
+
+def test_unknown_family_is_rejected(employee_csv):
+    with pytest.raises(ValueError):
+        tune_hyperparameters(employee_csv, families=['hist_gradient_boosting'])
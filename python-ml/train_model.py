@@ -1,13 +1,36 @@
 """
 Train the ML model using employee data
 """
-from attrition_model import AttritionPredictor
+from attrition_model import AttritionPredictor, MODEL_FAMILIES
+from model_registry import ModelRegistry
+from feature_cache import FeatureCache
+from tuning import SEARCH_SPACES, BASELINE_FAMILY, tune_and_train, compare_families, print_comparison
+import argparse
 import sys
 import os
 
 def main():
+    parser = argparse.ArgumentParser(description='Train the attrition model')
+    parser.add_argument('--data', default='../data/employee_data.csv', help='Training CSV')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Stream the CSV in chunks of this many rows (for files larger than memory)')
+    parser.add_argument('--no-feature-cache', action='store_true',
+                        help='Always parse and encode the CSV instead of reusing cached encoded data')
+    parser.add_argument('--model-family', default='random_forest', choices=list(MODEL_FAMILIES))
+    parser.add_argument('--compact', action='store_true',
+                        help='Prune trees and subtrees within a held-out accuracy budget and save float32 arrays')
+    parser.add_argument('--tune', action='store_true',
+                        help='Search model families and hyperparameters, then train the best one')
+    parser.add_argument('--compare', action='store_true',
+                        help=f'Also train {BASELINE_FAMILY} and report both side by side')
+    parser.add_argument('--families', nargs='+', choices=list(SEARCH_SPACES),
+                        help='Model families to search (default: all)')
+    parser.add_argument('--candidates', type=int, default=24, help='Number of sampled candidates')
+    parser.add_argument('--workers', type=int, default=None, help='Tuning processes (default: CPU count)')
+    args = parser.parse_args()
+    
     # Check if data file exists
-    data_path = '../data/employee_data.csv'
+    data_path = args.data
     
     if not os.path.exists(data_path):
         print(f"Error: Data file not found at {data_path}")
@@ -21,26 +44,55 @@ def main():
     
     # Initialize predictor
     predictor = AttritionPredictor()
+    registry = ModelRegistry('models')
+    feature_cache = None if args.no_feature_cache else FeatureCache(registry.feature_cache_dir)
     
     # Train model
     try:
-        results = predictor.train(data_path)
+        artifacts = None
+        if args.tune:
+            results, tuning = tune_and_train(
+                predictor, data_path,
+                families=args.families, n_candidates=args.candidates, n_workers=args.workers,
+                feature_cache=feature_cache
+            )
+            artifacts = {'leaderboard.json': tuning}
+        elif args.compare:
+            families = list(dict.fromkeys([args.model_family, BASELINE_FAMILY]))
+            comparison, predictors = compare_families(data_path, families, feature_cache=feature_cache)
+            print_comparison(comparison)
+            predictor = predictors[args.model_family]
+            results = next(r for r in comparison if r['model_family'] == args.model_family)
+            artifacts = {'comparison.json': comparison}
+        else:
+            results = predictor.train(
+                data_path, chunk_size=args.chunk_size, model_family=args.model_family,
+                feature_cache=feature_cache
+            )
         
         print("\n" + "="*60)
         print("Training completed successfully!")
         print("="*60)
         
-        # Save model
-        predictor.save_model('models')
+        # Save model as a new registry version and promote it
+        version = registry.save_predictor(
+            predictor, metrics=results, data_path=data_path, artifacts=artifacts,
+            compact=args.compact
+        )
+        registry.promote(version)
         
-        print("\nModel files saved to 'models/' directory:")
+        print(f"\nModel version {version} saved to '{registry.version_path(version)}/':")
         print("  - attrition_model.pkl")
         print("  - scaler.pkl")
         print("  - label_encoders.pkl")
         print("  - model_info.json")
+        print("  - manifest.json")
+        for name in artifacts or {}:
+            print(f"  - {name}")
         
         print("\nYou can now start the API server using:")
         print("  python api_server.py")
+        print("A running server picks up the new version via POST /model/reload")
         
     except Exception as e:
         print(f"\nError during training: {str(e)}")
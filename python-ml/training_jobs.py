@@ -0,0 +1,224 @@
+"""
+Background training jobs run in a separate process
+"""
+import multiprocessing as mp
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+
+def _train_worker(csv_path, test_size, options, registry_root, version, messages):
+    """Entry point of the training process"""
+    try:
+        from attrition_model import AttritionPredictor
+        from feature_cache import FeatureCache
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(registry_root)
+        predictor = AttritionPredictor(cache_size=0)
+        progress = lambda stage, fraction: messages.put(('progress', stage, fraction))
+        options = dict(options)
+        search = options.pop('tune', None)
+        compare = options.pop('compare', False)
+        compact = options.pop('compact', False)
+        feature_cache = (
+            FeatureCache(registry.feature_cache_dir)
+            if options.pop('use_feature_cache', True) else None
+        )
+        artifacts = None
+        comparison = None
+
+        if search is not None:
+            from tuning import tune_and_train
+            results, tuning = tune_and_train(
+                predictor, csv_path, test_size=test_size, progress=progress,
+                feature_cache=feature_cache, **search
+            )
+            artifacts = {'leaderboard.json': tuning}
+        elif compare:
+            from tuning import BASELINE_FAMILY, compare_families
+            family = options.get('model_family', 'random_forest')
+            progress('comparing', 0.05)
+            comparison, predictors = compare_families(
+                csv_path, list(dict.fromkeys([family, BASELINE_FAMILY])), test_size=test_size,
+                model_params={family: options.get('model_params')}, feature_cache=feature_cache
+            )
+            predictor = predictors[family]
+            results = next(r for r in comparison if r['model_family'] == family)
+            artifacts = {'comparison.json': comparison}
+        else:
+            results = predictor.train(
+                csv_path, test_size=test_size, progress=progress, feature_cache=feature_cache, **options
+            )
+
+        messages.put(('progress', 'saving', 0.95))
+        registry.save_predictor(
+            predictor, version, results, csv_path, artifacts=artifacts, compact=compact
+        )
+        results = predictor.compacted_results(results)
+        messages.put(('done', {
+            'accuracy': results['accuracy'],
+            'roc_auc': results['roc_auc'],
+            'fit_seconds': results['fit_seconds'],
+            'feature_importance': {k: float(v) for k, v in predictor.feature_importance.items()},
+            'comparison': comparison
+        }))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
+
+class TrainingJob:
+    """State of one background training run"""
+
+    def __init__(self, csv_path, test_size, version, output_dir, options=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.csv_path = csv_path
+        self.test_size = test_size
+        # Keyword arguments of AttritionPredictor.train, or 'tune' search settings
+        self.options = options or {}
+        self.version = version
+        self.output_dir = output_dir
+        self.status = 'queued'
+        self.stage = None
+        self.progress = 0.0
+        self.metrics = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.cancel_requested = False
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'version': self.version,
+            'stage': self.stage,
+            'progress': self.progress,
+            'csv_path': self.csv_path,
+            'test_size': self.test_size,
+            **self.options,
+            'metrics': self.metrics,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class TrainingJobManager:
+    """Run training in a child process and hand finished models to on_success"""
+
+    def __init__(self, on_success, registry):
+        # on_success(job) must install the registry version job.version
+        self.on_success = on_success
+        self.registry = registry
+        self.jobs = {}
+        self._lock = threading.Lock()
+        # spawn avoids forking a multi-threaded server process
+        self._context = mp.get_context('spawn')
+
+    @property
+    def active_job(self):
+        with self._lock:
+            return next((job for job in self.jobs.values() if not job.finished), None)
+
+    def submit(self, csv_path, test_size=0.2, **options):
+        """Start a training job, or raise RuntimeError if one is already running"""
+        with self._lock:
+            if any(not job.finished for job in self.jobs.values()):
+                raise RuntimeError('A training job is already running')
+
+            version = self.registry.new_version_id()
+            job = TrainingJob(csv_path, test_size, version, self.registry.version_path(version), options)
+            self.jobs[job.id] = job
+
+        messages = self._context.Queue()
+        job.process = self._context.Process(
+            target=_train_worker,
+            args=(csv_path, test_size, options, self.registry.root, job.version, messages),
+            # Not daemonic, so tuning can start its own worker pool; shutdown() terminates it
+            daemon=False
+        )
+        job.process.start()
+        job.status = 'running'
+        job.started_at = time.time()
+
+        threading.Thread(target=self._monitor, args=(job, messages), daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [job.to_dict() for job in sorted(self.jobs.values(), key=lambda j: j.created_at)]
+
+    def cancel(self, job_id):
+        """Terminate a running job; returns False if it already finished"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_requested = True
+        if job.process is not None and job.process.is_alive():
+            job.process.terminate()
+        return True
+
+    def shutdown(self):
+        """Terminate every running job"""
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+
+    def _monitor(self, job, messages):
+        outcome = None
+        while outcome is None:
+            try:
+                message = messages.get(timeout=0.5)
+            except queue.Empty:
+                if not job.process.is_alive():
+                    # The process may have queued its final message just before exiting
+                    try:
+                        message = messages.get(timeout=0.5)
+                    except queue.Empty:
+                        outcome = ('error', f'Training process exited with code {job.process.exitcode}')
+                        break
+                else:
+                    continue
+
+            if message[0] == 'progress':
+                _, job.stage, job.progress = message
+            else:
+                outcome = message
+
+        job.process.join(timeout=5)
+
+        if job.cancel_requested:
+            self._finish(job, 'cancelled')
+        elif outcome[0] == 'error':
+            job.error = outcome[1]
+            self._finish(job, 'failed')
+        else:
+            job.metrics = outcome[1]
+            job.stage = 'installing'
+            try:
+                self.on_success(job)
+            except Exception as e:
+                job.error = f'Failed to install trained model: {e}'
+                self._finish(job, 'failed')
+                return
+            job.stage = 'done'
+            job.progress = 1.0
+            self._finish(job, 'succeeded')
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        if status != 'succeeded':
+            # Drop the partially written version so it never shows up in the registry
+            shutil.rmtree(job.output_dir, ignore_errors=True)
@@ -0,0 +1,306 @@
+"""
+Model selection: hyperparameter search with successive halving and side-by-side family comparison
+"""
+import itertools
+import math
+import multiprocessing as mp
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from attrition_model import AttritionPredictor, MODEL_FAMILIES
+from data_ingestion import read_employee_csv
+
+# The forest other families are compared against
+BASELINE_FAMILY = 'random_forest'
+
+# Hyperparameter values sampled for each model family; folds are label-encoded and scaled,
+# so families with native categorical handling are not searched
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [8, 12, 15, 20, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', 0.5],
+        'class_weight': [None, 'balanced']
+    },
+    'extra_trees': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [8, 12, 15, 20, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', 0.5],
+        'class_weight': [None, 'balanced']
+    },
+    'gradient_boosting': {
+        'n_estimators': [100, 200, 400],
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'max_depth': [2, 3, 4, 5],
+        'subsample': [0.7, 0.85, 1.0],
+        'min_samples_leaf': [1, 5, 20]
+    }
+}
+
+
+def sample_candidates(families, n_candidates, random_state=42):
+    """Draw up to n_candidates configurations, split evenly across families"""
+    candidates = []
+    for i, family in enumerate(families):
+        # Earlier families take the remainder when n_candidates does not divide evenly
+        n_family = n_candidates // len(families) + (i < n_candidates % len(families))
+        if n_family == 0:
+            continue
+        for params in ParameterSampler(SEARCH_SPACES[family], n_family, random_state=random_state):
+            candidates.append({'model_family': family, 'model_params': params})
+    return candidates
+
+
+def _scale(scaler, X):
+    # Missing values take the mean, like AttritionPredictor.train
+    scaled = scaler.transform(X)
+    return np.where(np.isnan(scaled), 0.0, scaled).astype(np.float32)
+
+
+def prepare_folds(csv_path, cache_dir, cv=3, test_size=0.2, random_state=42, feature_cache=None):
+    """Encode the training split once and write scaled CV folds as .npy files
+
+    The held-out test split matches AttritionPredictor.train, so tuning never
+    sees the rows the final model is evaluated on. Training rows of each fold
+    are stored in random order: the first n rows are a random subsample.
+    Returns the smallest fold's number of training rows.
+    """
+    predictor = AttritionPredictor(cache_size=0)
+    X, y = predictor.load_features(csv_path, 'scaled', feature_cache)
+    X_train, _, y_train, _ = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+
+    rng = np.random.default_rng(random_state)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    sizes = []
+    for k, (train_idx, valid_idx) in enumerate(folds.split(X_train, y_train)):
+        train_idx = rng.permutation(train_idx)
+        scaler = StandardScaler().fit(X_train[train_idx])
+        arrays = {
+            'X_train': _scale(scaler, X_train[train_idx]),
+            'y_train': y_train[train_idx],
+            'X_valid': _scale(scaler, X_train[valid_idx]),
+            'y_valid': y_train[valid_idx]
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(cache_dir, f'fold{k}_{name}.npy'), array)
+        sizes.append(len(train_idx))
+    return min(sizes)
+
+
+def _evaluate(cache_dir, fold, model_family, model_params, n_resources, random_state):
+    """Fit a candidate on the first n_resources rows of a cached fold; returns (roc_auc, seconds)"""
+    def load(name):
+        return np.load(os.path.join(cache_dir, f'fold{fold}_{name}.npy'), mmap_mode='r')
+
+    X_train, y_train = load('X_train')[:n_resources], load('y_train')[:n_resources]
+    if len(np.unique(y_train)) < 2:
+        return float('nan'), 0.0
+
+    model = AttritionPredictor.build_model(model_family, model_params, random_state)
+    # The pool already uses every core
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    score = roc_auc_score(load('y_valid'), model.predict_proba(load('X_valid'))[:, 1])
+    return float(score), seconds
+
+
+def tune_hyperparameters(csv_path, families=None, n_candidates=24, cv=3, factor=3,
+                         min_resources=100, n_workers=None, test_size=0.2, random_state=42,
+                         progress=None, feature_cache=None):
+    """Successive halving over sampled candidates, scored by mean CV ROC-AUC
+
+    Every candidate is first fitted on min_resources training rows per fold.
+    After each rung the best 1/factor of them advance, and each rung fits on
+    factor times more rows. The last rung uses the full folds. Fits of every
+    candidate and fold run in a process pool. Returns the best candidate and a
+    leaderboard of every evaluation.
+    """
+    families = list(families or SEARCH_SPACES)
+    unknown = [f for f in families if f not in SEARCH_SPACES or f not in MODEL_FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown model families: {', '.join(unknown)}")
+    report = progress or (lambda stage, fraction: None)
+
+    candidates = sample_candidates(families, n_candidates, random_state)
+    cache_dir = tempfile.mkdtemp(prefix='attrition-folds-')
+    leaderboard = []
+    try:
+        report('preparing folds', 0.0)
+        max_resources = prepare_folds(csv_path, cache_dir, cv, test_size, random_state, feature_cache)
+        min_resources = min(min_resources, max_resources)
+
+        # Enough rungs to narrow down to one candidate, as far as the data allows
+        n_rungs = 1 + min(
+            math.ceil(math.log(max(len(candidates), 1), factor)),
+            math.floor(math.log(max_resources / min_resources, factor))
+        )
+        total_fits = sum(
+            math.ceil(len(candidates) / factor ** rung) * cv for rung in range(n_rungs)
+        )
+        done = 0
+
+        context = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+            for rung in range(n_rungs):
+                last = rung == n_rungs - 1
+                n_resources = max_resources if last else min_resources * factor ** rung
+
+                futures = {
+                    pool.submit(
+                        _evaluate, cache_dir, fold, c['model_family'], c['model_params'],
+                        n_resources, random_state
+                    ): i
+                    for i, c in enumerate(candidates)
+                    for fold in range(cv)
+                }
+                scores = [[] for _ in candidates]
+                seconds = [0.0] * len(candidates)
+                for future in as_completed(futures):
+                    i = futures[future]
+                    score, fit_seconds = future.result()
+                    scores[i].append(score)
+                    seconds[i] += fit_seconds
+                    done += 1
+                    report(f'tuning rung {rung + 1}/{n_rungs}', done / total_fits)
+
+                entries = []
+                for candidate, fold_scores, fit_seconds in zip(candidates, scores, seconds):
+                    valid = [s for s in fold_scores if not math.isnan(s)]
+                    entries.append({
+                        **candidate,
+                        'rung': rung,
+                        'n_resources': n_resources,
+                        'mean_roc_auc': float(np.mean(valid)) if valid else None,
+                        'std_roc_auc': float(np.std(valid)) if valid else None,
+                        'fit_seconds': fit_seconds
+                    })
+                entries.sort(key=lambda e: -1.0 if e['mean_roc_auc'] is None else e['mean_roc_auc'],
+                             reverse=True)
+                leaderboard.extend(entries)
+
+                print(f"Rung {rung + 1}/{n_rungs}: {len(candidates)} candidates on {n_resources} rows, "
+                      f"best ROC-AUC {entries[0]['mean_roc_auc']}")
+                if not last:
+                    keep = max(1, math.ceil(len(candidates) / factor))
+                    candidates = [
+                        {'model_family': e['model_family'], 'model_params': e['model_params']}
+                        for e in entries[:keep]
+                    ]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # Candidates that went furthest first, then by score
+    leaderboard.sort(key=lambda e: (
+        e['rung'], -1.0 if e['mean_roc_auc'] is None else e['mean_roc_auc']
+    ), reverse=True)
+    for rank, entry in enumerate(leaderboard, 1):
+        entry['rank'] = rank
+
+    return {
+        'best': leaderboard[0],
+        'leaderboard': leaderboard,
+        'settings': {
+            'families': families,
+            'n_candidates': n_candidates,
+            'cv': cv,
+            'factor': factor,
+            'min_resources': min_resources,
+            'max_resources': max_resources,
+            'n_rungs': n_rungs
+        }
+    }
+
+
+def tune_and_train(predictor, csv_path, test_size=0.2, random_state=42, progress=None,
+                   feature_cache=None, **search):
+    """Tune, then train predictor on the full data with the best candidate
+
+    Returns the training results and the tuning summary.
+    """
+    report = progress or (lambda stage, fraction: None)
+    tuning = tune_hyperparameters(
+        csv_path, test_size=test_size, random_state=random_state,
+        progress=lambda stage, fraction: report(stage, 0.6 * fraction),
+        feature_cache=feature_cache, **search
+    )
+    best = tuning['best']
+    print(f"\nBest candidate: {best['model_family']} {best['model_params']} "
+          f"(CV ROC-AUC {best['mean_roc_auc']})")
+
+    results = predictor.train(
+        csv_path, test_size=test_size, random_state=random_state,
+        model_family=best['model_family'], model_params=best['model_params'],
+        progress=lambda stage, fraction: report(stage, 0.6 + 0.35 * fraction),
+        feature_cache=feature_cache
+    )
+    return results, tuning
+
+
+def compare_families(csv_path, families, test_size=0.2, random_state=42, model_params=None,
+                     feature_cache=None, latency_rows=1000, single_calls=200):
+    """Train each family on the same split; accuracy, fit time, model size and latency side by side
+
+    model_params optionally maps a family to its hyperparameter overrides.
+    Returns the report rows and the trained predictors by family.
+    """
+    records = read_employee_csv(csv_path, nrows=latency_rows).to_dict('records')
+    report, predictors = [], {}
+
+    for family in families:
+        predictor = AttritionPredictor(cache_size=0)
+        results = predictor.train(
+            csv_path, test_size=test_size, random_state=random_state,
+            model_family=family, model_params=(model_params or {}).get(family),
+            feature_cache=feature_cache
+        )
+
+        single = []
+        for record in itertools.islice(itertools.cycle(records), single_calls):
+            start = time.perf_counter()
+            predictor.predict(record)
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        predictor.predict(records)
+        batch_seconds = time.perf_counter() - start
+
+        report.append({
+            'model_family': family,
+            'accuracy': results['accuracy'],
+            'roc_auc': results['roc_auc'],
+            'fit_seconds': results['fit_seconds'],
+            'model_size_mb': len(pickle.dumps(predictor.model)) / 2 ** 20,
+            'predict_single_p50_ms': float(np.percentile(single, 50) * 1000),
+            'predict_batch_rows_per_sec': len(records) / batch_seconds
+        })
+        predictors[family] = predictor
+
+    return report, predictors
+
+
+def print_comparison(report):
+    """Print a compare_families report as a table"""
+    print(f"\n{'Model family':<26}{'Accuracy':>10}{'ROC-AUC':>10}{'Fit s':>9}"
+          f"{'Size MiB':>10}{'p50 ms':>9}{'rows/s':>11}")
+    for row in report:
+        print(f"{row['model_family']:<26}{row['accuracy']:>10.4f}{row['roc_auc']:>10.4f}"
+              f"{row['fit_seconds']:>9.2f}{row['model_size_mb']:>10.2f}"
+              f"{row['predict_single_p50_ms']:>9.2f}{row['predict_batch_rows_per_sec']:>11.0f}")